@@ -18,9 +18,13 @@ import os
 import re
 import shutil  # ← ADDED
 
+import tracing
+import vtop_parse  # browser-free normalizers shared with the HTTP fast path
+
 # -------------------------- CONFIG --------------------------
-LOGIN_URL = "https://vtopcc.vit.ac.in/vtop/login"
-ROOT = "https://vtopcc.vit.ac.in"
+# VTOP_ROOT points everything at another host, e.g. bench/mock_vtop.py
+ROOT = os.getenv("VTOP_ROOT", "https://vtopcc.vit.ac.in").rstrip("/")
+LOGIN_URL = os.getenv("VTOP_LOGIN_URL", f"{ROOT}/vtop/login")
 CONTENT_URL = f"{ROOT}/vtop/content"
 
 # Allow up to 3 password attempts
@@ -31,6 +35,12 @@ WAIT_NONE = 10           # no captcha
 WAIT_TEXT = 60           # simple text captcha
 WAIT_IMAGE = 60          # 3x3 image captcha / challenge
 WAIT_RECAPTCHA = 10      # protected by reCAPTCHA badge only
+
+# Upper bound (seconds) for wait_settled(): network idle + DOM quiet after loads / dropdown changes
+SETTLE_TIMEOUT = float(os.getenv("VTOP_SETTLE_TIMEOUT", "3"))
+SETTLE_QUIET_MS = 150
+# Container VTOP loads sections into; section loads / dropdown changes only watch this subtree
+SECTION_ROOT_CSS = "#main-section"
 # -----------------------------------------------------------
 
 
@@ -40,33 +50,147 @@ def wait_ready(driver, timeout=10):
         lambda d: d.execute_script("return document.readyState") == "complete"
     )
 
-def login_success(driver):
-    cur_url = driver.current_url.lower()
-    page_src = driver.page_source.lower()
-    success_markers = [
-        "/vtop/content", "/home", "/dashboard", "logout",
-        "timetable", "attendance"
-    ]
-    return any(m in cur_url for m in success_markers) or any(m in page_src for m in success_markers)
-
-def page_says_wrong_password(driver):
-    txt = driver.page_source.lower()
-    pw_keywords = [
-        "invalid password", "incorrect password", "wrong password",
-        "invalid credentials", "credentials are invalid",
-        "authentication failed", "username or password is incorrect",
-        "invalid username or password", "enter valid credentials"
-    ]
-    return any(k in txt for k in pw_keywords)
-
-def page_says_wrong_captcha(driver):
-    txt = driver.page_source.lower()
-    cap_keywords = [
-        "invalid captcha", "incorrect captcha", "wrong captcha",
-        "captcha mismatch", "captcha did not match", "please enter valid captcha",
-        "captcha is required"
-    ]
-    return any(k in txt for k in cap_keywords)
+# Counts the page's in-flight XHR / fetch requests (idempotent; a reload drops it)
+_NET_TRACKER_JS = r"""
+if (!window.__vtopNet) {
+  const t = window.__vtopNet = {inflight: 0, last: Date.now()};
+  const bump = d => { t.inflight = Math.max(0, t.inflight + d); t.last = Date.now(); };
+  const send = XMLHttpRequest.prototype.send;
+  XMLHttpRequest.prototype.send = function () {
+    bump(1);
+    this.addEventListener('loadend', () => bump(-1), {once: true});
+    try { return send.apply(this, arguments); } catch (e) { bump(-1); throw e; }
+  };
+  if (window.fetch) {
+    const f = window.fetch;
+    window.fetch = function () { bump(1); return f.apply(this, arguments).finally(() => bump(-1)); };
+  }
+}
+"""
+
+# Resolves once nothing is loading (tracker + jQuery.active) and the DOM under the root
+# has not changed for quietMs, then after one painted frame. false on timeout.
+_SETTLE_JS = _NET_TRACKER_JS + r"""
+const rootSel = arguments[0], quietMs = arguments[1], timeoutMs = arguments[2];
+const done = arguments[arguments.length - 1];
+const t = window.__vtopNet;
+const root = (rootSel && document.querySelector(rootSel)) || document.documentElement;
+let last = Date.now(), finished = false;
+const mo = new MutationObserver(() => { last = Date.now(); });
+mo.observe(root, {subtree: true, childList: true, attributes: true, characterData: true});
+const end = Date.now() + timeoutMs;
+function finish(ok) {
+  if (finished) return;
+  finished = true;
+  mo.disconnect();
+  let sent = false;
+  const go = () => { if (!sent) { sent = true; done(ok); } };
+  requestAnimationFrame(() => requestAnimationFrame(go));
+  setTimeout(go, 100);   // rAF does not run in background tabs
+}
+(function poll() {
+  const busy = t.inflight > 0 || (window.jQuery && jQuery.active > 0) || document.readyState !== 'complete';
+  const now = Date.now();
+  if (!busy && now - Math.max(last, t.last) >= quietMs) return finish(true);
+  if (now > end) return finish(false);
+  setTimeout(poll, 25);
+})();
+"""
+
+def track_network(driver):
+    """Start counting requests before an action, so wait_settled() sees ones it fires at once."""
+    try:
+        driver.execute_script(_NET_TRACKER_JS)
+    except Exception:
+        pass
+
+def wait_settled(driver, root_css=None, quiet_ms=SETTLE_QUIET_MS, timeout=None):
+    """
+    Wait until the page is idle: loaded, no XHR/fetch in flight, and no DOM change under
+    root_css (SECTION_ROOT_CSS after section loads / dropdown changes; default and fallback
+    when it isn't on the page: whole document) for quiet_ms. Gives up after timeout (default
+    SETTLE_TIMEOUT) and returns False; True as soon as it settled.
+    """
+    timeout = SETTLE_TIMEOUT if timeout is None else timeout
+    with tracing.span("wait_settled", root=root_css, quiet_ms=quiet_ms) as sp:
+        try:
+            driver.set_script_timeout(timeout + 5)
+            sp["settled"] = bool(driver.execute_async_script(_SETTLE_JS, root_css, quiet_ms, int(timeout * 1000)))
+        except Exception:
+            time.sleep(min(timeout, 0.5))  # page mid-navigation: the old fixed pause
+            sp["settled"] = False
+    return sp["settled"]
+
+# Keyword lists used by the status checks below (matched against lower-cased page HTML)
+LOGIN_SUCCESS_MARKERS = [
+    "/vtop/content", "/home", "/dashboard", "logout",
+    "timetable", "attendance"
+]
+WRONG_PASSWORD_KEYWORDS = [
+    "invalid password", "incorrect password", "wrong password",
+    "invalid credentials", "credentials are invalid",
+    "authentication failed", "username or password is incorrect",
+    "invalid username or password", "enter valid credentials"
+]
+WRONG_CAPTCHA_KEYWORDS = [
+    "invalid captcha", "incorrect captcha", "wrong captcha",
+    "captcha mismatch", "captcha did not match", "please enter valid captcha",
+    "captcha is required"
+]
+
+# One round trip for every status check: the keyword scans run in the page over
+# outerHTML (what driver.page_source would return) and only a small dict comes back.
+_PROBE_JS = r"""
+const kw = arguments[0];
+const root = document.documentElement;
+const html = root ? root.outerHTML.toLowerCase() : "";
+const url = (location.href || "").toLowerCase();
+const has = list => list.some(k => html.includes(k));
+
+let captcha = "none", b64 = null;
+const textImg = document.querySelector("img[src^='data:image']");
+if (document.querySelector("iframe[src*='recaptcha'], .g-recaptcha") || html.includes("recaptcha")) {
+  captcha = (html.includes("select all images") || html.includes("click on all images")) ? "image" : "recaptcha";
+} else if (textImg && document.getElementById("captchaStr")) {
+  captcha = "text";
+  const src = textImg.getAttribute("src") || "";
+  b64 = src.includes(",") ? src.split(",", 2)[1] : null;
+} else if (html.includes("select all images") || html.includes("click each image")) {
+  captcha = "image";
+}
+return {
+  url: url,
+  ready_state: document.readyState,
+  login_success: kw.success.some(m => url.includes(m)) || has(kw.success),
+  wrong_password: has(kw.password),
+  wrong_captcha: has(kw.captcha),
+  captcha_case: captcha,
+  captcha_png_b64: b64,
+  has_login_form: !!document.getElementById("username"),
+  clicked_submit: !!window.__userClickedSubmit
+};
+"""
+
+def probe_page(driver):
+    """
+    Classify the current page in a single execute_script call.
+    Returns dict: url, ready_state, login_success, wrong_password, wrong_captcha,
+    captcha_case ('none'|'text'|'image'|'recaptcha'), captcha_png_b64, has_login_form, clicked_submit.
+    """
+    return driver.execute_script(_PROBE_JS, {
+        "success": LOGIN_SUCCESS_MARKERS,
+        "password": WRONG_PASSWORD_KEYWORDS,
+        "captcha": WRONG_CAPTCHA_KEYWORDS,
+    })
+
+def login_success(driver, probe=None):
+    return (probe or probe_page(driver))["login_success"]
+
+def page_says_wrong_password(driver, probe=None):
+    return (probe or probe_page(driver))["wrong_password"]
+
+def page_says_wrong_captcha(driver, probe=None):
+    return (probe or probe_page(driver))["wrong_captcha"]
 
 def save_cookies(driver, username_val):
     try:
@@ -85,9 +209,9 @@ def save_cookies(driver, username_val):
         os.makedirs("data", exist_ok=True)
         with open(os.path.join("data", "cookies.json"), "w", encoding="utf-8") as f:
             json.dump(cookies, f, indent=2)
-        print("🗂️  Session cookies saved.")
+        tracing.event("cookies_saved", count=len(cookies))
     except Exception as e:
-        print(f"⚠️ Could not save session cookies: {e}")
+        tracing.warn("cookies_save_failed", error=str(e))
 
 def fill_credentials(driver, username_val, password_val):
     user_el = WebDriverWait(driver, 12).until(EC.presence_of_element_located((By.ID, "username")))
@@ -101,6 +225,104 @@ def fill_credentials(driver, username_val, password_val):
 # --------------------------------------------------------
 
 
+# ---------------- LOGIN OUTCOME FROM NETWORK EVENTS ----------------
+# Needs the driver started with goog:loggingPrefs {"performance": "ALL"}; Chrome then
+# buffers CDP Network.* events that we read incrementally (a few KB, not the whole DOM).
+LOGIN_SUCCESS_URL_MARKERS = ["/vtop/content", "/home", "/dashboard"]
+
+def drain_performance_log(driver):
+    """Read and discard buffered CDP events (also keeps chromedriver's buffer from growing)."""
+    try:
+        return driver.get_log("performance")
+    except Exception:
+        return None
+
+def _network_events(entries):
+    for e in entries or []:
+        try:
+            msg = json.loads(e["message"])["message"]
+        except Exception:
+            continue
+        if msg.get("method", "").startswith("Network."):
+            yield msg["method"], msg.get("params", {})
+
+def wait_login_network_outcome(driver, timeout=60, poll=0.05):
+    """
+    Follow the login POST through CDP network events.
+    Returns:
+      'success'    - the POST (or its redirect chain) landed on a logged-in URL
+      'login_page' - a document load came back to the login page (error text is in the DOM)
+      'responded'  - an XHR/fetch login POST got its response (DOM update pending)
+      'failed'     - the login request failed at network level
+      None         - no usable events (performance logging off) or timeout
+    """
+    # the first read doubles as the availability check; it may already hold the POST
+    entries = drain_performance_log(driver)
+    if entries is None:
+        return None
+    login_req = None
+    end = time.time() + timeout
+    while True:
+        for method, p in _network_events(entries):
+            if method == "Network.requestWillBeSent":
+                req = p.get("request", {})
+                url = (req.get("url") or "").lower()
+                if req.get("method") == "POST" and "/login" in url:
+                    login_req = p.get("requestId")
+                # redirects re-use the requestId of the original POST
+                if login_req and p.get("requestId") == login_req and "redirectResponse" in p:
+                    if any(m in url for m in LOGIN_SUCCESS_URL_MARKERS):
+                        return "success"
+            elif method == "Network.responseReceived":
+                url = (p.get("response", {}).get("url") or "").lower()
+                if p.get("type") == "Document":
+                    if any(m in url for m in LOGIN_SUCCESS_URL_MARKERS):
+                        return "success"
+                    if login_req and "/login" in url:
+                        return "login_page"
+                elif login_req and p.get("requestId") == login_req:
+                    return "responded"
+            elif method == "Network.loadingFailed":
+                if login_req and p.get("requestId") == login_req:
+                    return "failed"
+        if time.time() >= end:
+            return None
+        time.sleep(poll)
+        entries = drain_performance_log(driver)
+# --------------------------------------------------------
+
+
+# ---------------- RESOURCE POLICY (CDP URL blocking) ----------------
+# Navigation / table scraping only needs HTML, CSS and VTOP's own JS. Images,
+# fonts, media and third-party trackers are blocked for those stages; screenshot
+# stages get images and fonts back. Set the policy *before* navigating: requests
+# that already failed are not retried. Applies to the current tab only.
+_TRACKER_PATTERNS = [
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*.mp4", "*.webm", "*.mp3",
+]
+_IMAGE_FONT_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.ico", "*.webp", "*.bmp",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*fonts.googleapis.com*", "*fonts.gstatic.com*",
+]
+RESOURCE_POLICIES = {
+    "lean": _TRACKER_PATTERNS + _IMAGE_FONT_PATTERNS,  # navigate + scrape tables
+    "screenshot": _TRACKER_PATTERNS,                   # pages we capture as images
+    "full": [],                                        # login page (captcha images)
+}
+
+def set_resource_policy(driver, policy):
+    """Apply a RESOURCE_POLICIES entry to the current tab. Returns False if CDP refused."""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": RESOURCE_POLICIES[policy]})
+        return True
+    except Exception:
+        return False
+# ---------------------------------------------------------------------
+
+
 # -------------------- DISMISS ALERT MODAL --------------------
 def dismiss_alert_modal(driver):
     """Close the 'important info' popup if it appears."""
@@ -112,45 +334,22 @@ def dismiss_alert_modal(driver):
             close_btn.click()
         except Exception:
             driver.execute_script("document.getElementById('btnClosePopup')?.click();")
-        time.sleep(0.4)
-        print("ℹ️ Alert modal detected and closed.")
+        wait_settled(driver, quiet_ms=100)
+        tracing.event("alert_modal_closed")
     except Exception:
         pass
 # ------------------------------------------------------------
 
 
 # =================== CAPTCHA HANDOFF TO USER ===================
-def detect_captcha_case(driver):
+def detect_captcha_case(driver, probe=None):
     """
     Returns one of: 'none', 'text', 'image', 'recaptcha'
     """
-    src = driver.page_source.lower()
-
-    # reCAPTCHA badge/iframe
-    try:
-        if driver.find_elements(By.CSS_SELECTOR, "iframe[src*='recaptcha']") \
-           or driver.find_elements(By.CSS_SELECTOR, ".g-recaptcha") \
-           or "recaptcha" in src:
-            if "select all images" in src or "click on all images" in src:
-                return "image"
-            return "recaptcha"
-    except Exception:
-        pass
-
-    # text captcha signs: inline base64 image + input box
     try:
-        has_img = driver.find_elements(By.CSS_SELECTOR, "img[src^='data:image']")
-        has_input = driver.find_elements(By.ID, "captchaStr")
-        if has_img and has_input:
-            return "text"
+        return (probe or probe_page(driver))["captcha_case"]
     except Exception:
-        pass
-
-    # Image/grid captcha heuristics (wording based)
-    if "select all images" in src or "click each image" in src:
-        return "image"
-
-    return "none"
+        return "none"
 
 def arm_submit_click_probe(driver):
     """
@@ -203,29 +402,34 @@ def wait_for_user_submit_click_then_result(driver, *, idle_minutes=15, outcome_t
 
     while time.time() < idle_deadline:
         time.sleep(0.5)
+        try:
+            p = probe_page(driver)
+        except Exception:
+            continue  # page is navigating; try again next tick
 
         # Already logged in?
-        if login_success(driver):
+        if p["login_success"]:
             return True
 
         # Explicit server error states
-        if page_says_wrong_password(driver) or page_says_wrong_captcha(driver):
+        if p["wrong_password"] or p["wrong_captcha"]:
             return False
 
         # Did user click submit (or form submit/beforeunload fired)?
-        try:
-            clicked_seen = bool(driver.execute_script("return !!window.__userClickedSubmit;"))
-        except Exception:
-            clicked_seen = False
+        clicked_seen = p["clicked_submit"]
 
         if clicked_seen:
             print("➡️ Submit detected. Processing…")
             end = time.time() + outcome_timeout
             while time.time() < end:
                 time.sleep(0.5)
-                if login_success(driver):
+                try:
+                    p = probe_page(driver)
+                except Exception:
+                    continue
+                if p["login_success"]:
                     return True
-                if page_says_wrong_password(driver) or page_says_wrong_captcha(driver):
+                if p["wrong_password"] or p["wrong_captcha"]:
                     return False
             # If outcome still unclear, keep waiting in the idle loop (page may be slow).
             clicked_seen = False  # in case page reloaded and probe reset
@@ -280,7 +484,7 @@ def dismiss_all_overlays(driver, attempts=3):
         except Exception:
             pass
 
-        time.sleep(0.2)
+        wait_settled(driver, quiet_ms=100)
         # If nothing visible, we are done
         try:
             still = driver.find_elements(By.CSS_SELECTOR, ".modal.show, .modal[style*='display: block'], .modal-backdrop")
@@ -290,6 +494,73 @@ def dismiss_all_overlays(driver, attempts=3):
             return True
     return False
 
+def _kill_overlays_soft(driver):
+    try:
+        driver.execute_script("""
+            document.querySelectorAll('.modal.show, .modal[style*="display: block"]').forEach(m=>{
+                m.style.display='none'; m.classList.remove('show');
+            });
+            document.querySelectorAll('.modal-backdrop, .fade.show').forEach(b=>b.remove());
+            document.body.style.overflow='auto';
+        """)
+    except Exception:
+        pass
+
+# -------------------- SIDEBAR MENU (shared by the navigate_* flows) --------------------
+_ACADEMICS_BTN_XPATH = "//button[contains(@class,'SideBarMenuBtn')][.//i[contains(@class,'fa-graduation-cap')]]"
+_SIDEBAR_DROPDOWN_CSS = "div.SideBarMenuDropDown.dropdown-menu.show"
+
+def _open_academics_menu(driver):
+    """
+    Open the left sidebar graduation-cap (Academics) dropdown.
+    Returns the branch that worked: 'click' / 'js', '+reclick' if the panel needed a
+    second click, '+hidden' if it never showed; 'none' if the button was not found.
+    """
+    try:
+        academics_btn = WebDriverWait(driver, 8).until(
+            EC.element_to_be_clickable((By.XPATH, _ACADEMICS_BTN_XPATH))
+        )
+        academics_btn.click()
+        branch = "click"
+    except Exception:
+        try:
+            driver.execute_script("""
+                const btn = Array.from(document.querySelectorAll("button.SideBarMenuBtn"))
+                  .find(b => b.querySelector(".fa-graduation-cap"));
+                if (btn) btn.click();
+            """)
+            branch = "js"
+        except Exception:
+            return "none"
+
+    # Wait for dropdown panel; if not visible, try clicking again
+    try:
+        WebDriverWait(driver, 6).until(
+            EC.visibility_of_element_located((By.CSS_SELECTOR, _SIDEBAR_DROPDOWN_CSS))
+        )
+    except Exception:
+        try:
+            driver.find_element(By.XPATH, _ACADEMICS_BTN_XPATH).click()
+            WebDriverWait(driver, 4).until(
+                EC.visibility_of_element_located((By.CSS_SELECTOR, _SIDEBAR_DROPDOWN_CSS))
+            )
+            branch += "+reclick"
+        except Exception:
+            branch += "+hidden"
+    return branch
+
+def _click_first(driver, locators, timeout=6):
+    """Click the first locator that becomes clickable. Returns its index, or None."""
+    for i, (how, sel) in enumerate(locators):
+        try:
+            WebDriverWait(driver, timeout).until(EC.element_to_be_clickable((how, sel))).click()
+            return i
+        except Exception:
+            continue
+    return None
+# ---------------------------------------------------------------------------------------
+
+
 # -------------------- NAVIGATE: TIMETABLE (ROBUST) --------------------
 def navigate_to_timetable(driver, max_cycles=3):
     """
@@ -335,93 +606,48 @@ def navigate_to_timetable(driver, max_cycles=3):
         except Exception:
             return False
 
-    for _ in range(max_cycles):
-        # 1) Go to /content and clean overlays
-        driver.get(CONTENT_URL)
-        try: wait_ready(driver, 12)
-        except Exception: pass
-        time.sleep(0.5)
-        dismiss_alert_modal(driver)
-        _kill_overlays()
-        try: driver.execute_script("window.scrollTo(0,0); document.activeElement && document.activeElement.blur();")
-        except Exception: pass
-
-        # 2) Open the left sidebar graduation-cap (Academics)
-        opened = False
-        try:
-            academics_btn = WebDriverWait(driver, 8).until(
-                EC.element_to_be_clickable((
-                    By.XPATH,
-                    "//button[contains(@class,'SideBarMenuBtn')][.//i[contains(@class,'fa-graduation-cap')]]"
-                ))
-            )
-            academics_btn.click()
-            opened = True
-        except Exception:
-            try:
-                driver.execute_script("""
-                    const btn = Array.from(document.querySelectorAll("button.SideBarMenuBtn"))
-                      .find(b => b.querySelector(".fa-graduation-cap"));
-                    if (btn) btn.click();
-                """)
-                opened = True
-            except Exception:
-                pass
-
-        # 3) Wait for dropdown panel; if not visible, try clicking again
-        if opened:
-            try:
-                WebDriverWait(driver, 6).until(
-                    EC.visibility_of_element_located((
-                        By.CSS_SELECTOR, "div.SideBarMenuDropDown.dropdown-menu.show"
-                    ))
-                )
-            except Exception:
+    with tracing.span("navigate", section="timetable") as sp:
+        for cycle in range(1, max_cycles + 1):
+            sp["cycles"] = cycle
+            # 1) Go to /content and clean overlays
+            driver.get(CONTENT_URL)
+            try: wait_ready(driver, 12)
+            except Exception: pass
+            wait_settled(driver)
+            dismiss_alert_modal(driver)
+            _kill_overlays()
+            try: driver.execute_script("window.scrollTo(0,0); document.activeElement && document.activeElement.blur();")
+            except Exception: pass
+
+            # 2-3) Open the left sidebar graduation-cap (Academics)
+            sp["menu"] = _open_academics_menu(driver)
+
+            # 4) Click "Time Table" (multiple strategies)
+            hit = _click_first(driver, [
+                (By.CSS_SELECTOR, "a.systemBtnMenu[data-url*='StudentTimeTableChn']"),
+                (By.XPATH, "//a[contains(@class,'systemBtnMenu') and contains(@data-url,'StudentTimeTableChn')]"),
+                (By.XPATH, "//a[normalize-space()='Time Table' or contains(., 'Time Table')]"),
+            ])
+            sp["link"] = hit if hit is not None else "direct-url"
+            if hit is None:
+                # fallback direct URL
                 try:
-                    driver.find_element(
-                        By.XPATH,
-                        "//button[contains(@class,'SideBarMenuBtn')][.//i[contains(@class,'fa-graduation-cap')]]"
-                    ).click()
-                    WebDriverWait(driver, 4).until(
-                        EC.visibility_of_element_located((
-                            By.CSS_SELECTOR, "div.SideBarMenuDropDown.dropdown-menu.show"
-                        ))
-                    )
+                    driver.get(CONTENT_URL + "?menu=studentTimetableChn")
                 except Exception:
                     pass
 
-        # 4) Click "Time Table" (multiple strategies)
-        clicked_tt = False
-        for how, sel in [
-            (By.CSS_SELECTOR, "a.systemBtnMenu[data-url*='StudentTimeTableChn']"),
-            (By.XPATH, "//a[contains(@class,'systemBtnMenu') and contains(@data-url,'StudentTimeTableChn')]"),
-            (By.XPATH, "//a[normalize-space()='Time Table' or contains(., 'Time Table')]"),
-        ]:
-            try:
-                WebDriverWait(driver, 6).until(EC.element_to_be_clickable((how, sel))).click()
-                clicked_tt = True
-                break
-            except Exception:
-                continue
-
-        if not clicked_tt:
-            # fallback direct URL
-            try:
-                driver.get(CONTENT_URL + "?menu=studentTimetableChn")
-            except Exception:
-                pass
-
-        # 5) Clean overlays again and verify actual UI anchors
-        dismiss_alert_modal(driver)
-        _kill_overlays()
-        if _ui_ready(timeout=12):
-            return  # success
+            # 5) Clean overlays again and verify actual UI anchors
+            dismiss_alert_modal(driver)
+            _kill_overlays()
+            if _ui_ready(timeout=12):
+                return  # success
 
-        # Retry cycle: small pause before trying again
-        time.sleep(0.8)
+            # Retry cycle: small pause before trying again
+            time.sleep(0.8)
 
-    # If we exit the loop, we couldn't confirm the timetable UI
-    print("⚠️ Could not confirm Time Table UI after retries.")
+        # If we exit the loop, we couldn't confirm the timetable UI
+        sp["ok"] = False
+        tracing.warn("timetable_ui_not_confirmed", cycles=max_cycles)
 # ================= END NAVIGATE TIMETABLE ===================
 def select_semester_if_needed(driver, allow_manual_seconds=30):
     """
@@ -494,12 +720,54 @@ def select_semester_if_needed(driver, allow_manual_seconds=30):
     # Shortcut S#
     try:
         i = int(choice.replace("S", "")) - 1
+        track_network(driver)
         options[i].click()
-        time.sleep(1)
+        wait_settled(driver, SECTION_ROOT_CSS)
         return (options[i].text or "").strip()
     except Exception:
         print("⚠️ Invalid choice or click failed; proceeding without explicit semester selection.")
         return None
+# ===================== TABLE EXTRACTION (one round trip) =====================
+# Serializes tables in the page into vtop_parse's table-data shape
+# ({id, headers, thead, rows: [{text, cells: [{text, ps, href, onclick}]}]}),
+# so header mapping / row normalization run in Python on plain data instead of
+# one WebDriver call per row, cell and <p>.
+_TABLE_DATA_JS = r"""
+const txt = el => (el.innerText || "").trim();
+const one = tbl => {
+  const thead = [];
+  for (const sec of tbl.querySelectorAll(":scope > thead"))
+    for (const th of sec.querySelectorAll("th")) { const t = txt(th); if (t) thead.push(t); }
+  const rows = [];
+  for (const tr of tbl.querySelectorAll("tr")) {
+    const tds = Array.from(tr.children).filter(c => c.tagName === "TD");
+    if (!tds.length) continue;
+    rows.push({text: txt(tr), cells: tds.map(td => {
+      const a = td.querySelector("a");
+      return {
+        text: txt(td),
+        ps: Array.from(td.querySelectorAll("p"), txt),
+        href: a && a.getAttribute("href") ? a.href : "",
+        onclick: a ? (a.getAttribute("onclick") || "") : ""
+      };
+    })});
+  }
+  return {id: tbl.id || null, headers: Array.from(tbl.querySelectorAll("th"), txt), thead: thead, rows: rows};
+};
+const only = arguments[0];
+if (only) return one(only);
+return Array.from(document.querySelectorAll("table"))
+  .filter(t => t.querySelector("th"))
+  .map(one);
+"""
+
+def table_data(driver, table=None):
+    """
+    Table-data dict for one WebElement <table>, or (table=None) a list for every
+    <table> on the page that has header cells. Single execute_script call.
+    """
+    return driver.execute_script(_TABLE_DATA_JS, table)
+
 # ===================== REGISTERED COURSES (DOM) =====================
 def parse_registered_courses_dom(driver, out_path=os.path.join("data", "registered_courses.json")):
     """
@@ -508,51 +776,21 @@ def parse_registered_courses_dom(driver, out_path=os.path.join("data", "register
     """
     os.makedirs("data", exist_ok=True)
 
-    cand_tables = driver.find_elements(By.XPATH, "//table[.//th]")
-    target = None
-    header_map = {}
-    for tbl in cand_tables:
-        try:
-            heads = [th.text.strip() for th in tbl.find_elements(By.XPATH, ".//th")]
-            norm = [h.lower().replace(" ", "") for h in heads]
-            if any("course" in h for h in norm) and (any("slot" in h for h in norm) or any("venue" in h for h in norm)):
-                target = tbl
-                header_map = {i: heads[i].strip() for i in range(len(heads))}
-                break
-        except Exception:
-            continue
+    try:
+        cand_tables = table_data(driver) or []
+    except Exception:
+        cand_tables = []
+    target = next((t for t in cand_tables if vtop_parse.is_registered_courses_table(t["headers"])), None)
 
     if target is None:
-        print("⚠️ Registered Courses table not found via DOM.")
+        tracing.warn("registered_courses_not_found", tables=len(cand_tables))
         return []
 
-    rows = target.find_elements(By.XPATH, ".//tr[.//td]")
-    out = []
-
-    for tr in rows:
-        tds = tr.find_elements(By.XPATH, "./td")
-        if not tds:
-            continue
-        rec = {}
-        for i, td in enumerate(tds):
-            key = header_map.get(i, f"Col{i+1}")
-            txt = td.text.strip().replace("\n", " ").replace("\r", " ")
-            txt = re.sub(r"\s+", " ", txt)
-            rec[key] = txt
-        # normalize a few useful fields
-        if "Course" in rec:
-            m = re.search(r"Total\s+Number\s+Of\s+Credits:\s*([0-9]+(?:\.[0-9]+)?)", tr.text, flags=re.I)
-            if m:
-                rec["CourseCode"] = m.group(1)
-        for k in list(rec.keys()):
-            if k.lower().startswith("slot"):
-                rec["Slot"] = rec[k]
-                break
-        out.append(rec)
+    out = vtop_parse.registered_courses_rows(target)
 
     with open(out_path, "w", encoding="utf-8") as f:
         json.dump(out, f, indent=2)
-    print(f"✅ Registered Courses saved to {out_path} (rows: {len(out)})")
+    tracing.event("registered_courses_saved", path=out_path, rows=len(out))
     return out
 
 
@@ -563,102 +801,68 @@ def _screenshot_timetable(driver, out_png="data/timetable_debug.png"):
     Always save a screenshot of the timetable container (#timeTableStyle).
     Returns path to PNG.
     """
+    with tracing.span("screenshot", kind="timetable", path=out_png) as sp:
+        try:
+            tab = WebDriverWait(driver, 15).until(
+                EC.presence_of_element_located((By.ID, "timeTableStyle"))
+            )
+            driver.execute_script("arguments[0].scrollIntoView({block:'center'});", tab)
+            os.makedirs(os.path.dirname(out_png), exist_ok=True)
+            tab.screenshot(out_png)
+            return out_png
+        except Exception as e:
+            sp.update(ok=False, error=str(e))
+            return None
+
+def timetable_grid_html(driver):
+    """outerHTML of #timeTableStyle (for vtop_parse.timetable_grid_from_html), or None."""
     try:
-        tab = WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.ID, "timeTableStyle"))
-        )
-        driver.execute_script("arguments[0].scrollIntoView({block:'center'});", tab)
-        os.makedirs(os.path.dirname(out_png), exist_ok=True)
-        tab.screenshot(out_png)
-        print(f"📸 Timetable screenshot saved: {out_png}")
-        return out_png
-    except Exception as e:
-        print(f"⚠️ Could not screenshot timetable: {e}")
+        return driver.execute_script(
+            "const t = document.getElementById('timeTableStyle'); return t ? t.outerHTML : null;")
+    except Exception:
         return None
 
 # -------------------- NAVIGATE: ATTENDANCE --------------------
 def navigate_to_attendance(driver):
-    driver.get(CONTENT_URL)
-    try:
-        wait_ready(driver, 12)
-    except Exception:
-        pass
-    time.sleep(0.5)
-
-    dismiss_alert_modal(driver)
-
-    # Click the left sidebar graduation-cap (Academics)
-    try:
-        academics_btn = WebDriverWait(driver, 8).until(
-            EC.element_to_be_clickable((
-                By.XPATH,
-                "//button[contains(@class,'SideBarMenuBtn')][.//i[contains(@class,'fa-graduation-cap')]]"
-            ))
-        )
-        academics_btn.click()
-    except Exception:
-        try:
-            driver.execute_script("""
-                const btn = Array.from(document.querySelectorAll("button.SideBarMenuBtn"))
-                  .find(b => b.querySelector(".fa-graduation-cap"));
-                if (btn) btn.click();
-            """)
-        except Exception:
-            pass
-
-    # Wait dropdown
-    try:
-        WebDriverWait(driver, 6).until(
-            EC.visibility_of_element_located((
-                By.CSS_SELECTOR, "div.SideBarMenuDropDown.dropdown-menu.show"
-            ))
-        )
-    except Exception:
+    with tracing.span("navigate", section="attendance") as sp:
+        driver.get(CONTENT_URL)
         try:
-            driver.find_element(
-                By.XPATH,
-                "//button[contains(@class,'SideBarMenuBtn')][.//i[contains(@class,'fa-graduation-cap')]]"
-            ).click()
-            WebDriverWait(driver, 4).until(
-                EC.visibility_of_element_located((
-                    By.CSS_SELECTOR, "div.SideBarMenuDropDown.dropdown-menu.show"
-                ))
-            )
+            wait_ready(driver, 12)
         except Exception:
             pass
+        wait_settled(driver)
 
-    # Click "Class Attendance"
-    clicked_att = False
-    for how, sel in [
-        (By.CSS_SELECTOR, "a.systemBtnMenu[data-url*='StudentAttendance']"),
-        (By.XPATH, "//a[contains(@class,'systemBtnMenu') and contains(@data-url,'StudentAttendance')]"),
-        (By.XPATH, "//a[normalize-space()='Class Attendance' or contains(., 'Class Attendance')]"),
-    ]:
-        try:
-            WebDriverWait(driver, 6).until(EC.element_to_be_clickable((how, sel))).click()
-            clicked_att = True
-            break
-        except Exception:
-            continue
+        dismiss_alert_modal(driver)
 
-    if not clicked_att:
-        try:
-            driver.get(CONTENT_URL + "?menu=StudentAttendance")
-        except Exception:
-            pass
+        # Click the left sidebar graduation-cap (Academics)
+        sp["menu"] = _open_academics_menu(driver)
+
+        # Click "Class Attendance"
+        hit = _click_first(driver, [
+            (By.CSS_SELECTOR, "a.systemBtnMenu[data-url*='StudentAttendance']"),
+            (By.XPATH, "//a[contains(@class,'systemBtnMenu') and contains(@data-url,'StudentAttendance')]"),
+            (By.XPATH, "//a[normalize-space()='Class Attendance' or contains(., 'Class Attendance')]"),
+        ])
+        sp["link"] = hit if hit is not None else "direct-url"
+        if hit is None:
+            try:
+                driver.get(CONTENT_URL + "?menu=StudentAttendance")
+            except Exception:
+                pass
 
-    dismiss_alert_modal(driver)
+        dismiss_alert_modal(driver)
 
-    try:
-        WebDriverWait(driver, 12).until(
-            EC.any_of(
-                EC.presence_of_element_located((By.XPATH, "//div[contains(@class,'table-responsive')]//table")),
-                EC.presence_of_element_located((By.XPATH, "//h5[contains(.,'Attendance')]")),
-                EC.presence_of_element_located((By.ID, "semesterSubId"))
+        try:
+            WebDriverWait(driver, 12).until(
+                EC.any_of(
+                    EC.presence_of_element_located((By.XPATH, "//div[contains(@class,'table-responsive')]//table")),
+                    EC.presence_of_element_located((By.XPATH, "//h5[contains(.,'Attendance')]")),
+                    EC.presence_of_element_located((By.ID, "semesterSubId"))
+                )
             )
-        )
-    except Exception:
-        time.sleep(2)
+        except Exception:
+            sp["anchors"] = False
+            wait_settled(driver, SECTION_ROOT_CSS)
 
 
 def select_attendance_semester_if_needed(driver):
@@ -693,14 +897,15 @@ def select_attendance_semester_if_needed(driver):
     chosen_label = None
     try:
         i = int(choice.replace("S", "")) - 1
+        track_network(driver)
         options[i].click()
         chosen_label = options[i].text
-        time.sleep(0.8)
 
         try:
             driver.execute_script("arguments[0].dispatchEvent(new Event('change', {bubbles:true}));", dropdown)
         except Exception:
             pass
+        wait_settled(driver, SECTION_ROOT_CSS)
 
         for how, sel in [
             (By.XPATH, "//button[contains(.,'Search') or contains(.,'View') or contains(.,'Submit')]"),
@@ -709,7 +914,7 @@ def select_attendance_semester_if_needed(driver):
             try:
                 btn = WebDriverWait(driver, 2).until(EC.element_to_be_clickable((how, sel)))
                 btn.click()
-                time.sleep(0.8)
+                wait_settled(driver, SECTION_ROOT_CSS)
                 break
             except Exception:
                 continue
@@ -744,24 +949,9 @@ def scrape_attendance(
         EC.presence_of_element_located((By.XPATH, "//div[contains(@class,'table-responsive')]//table"))
     )
 
-    # Try to read header so we aren't tied to fixed column indices.
-    # We'll fall back to index positions if header isn't present.
-    header_map = {}
-    try:
-        ths = table.find_elements(By.XPATH, ".//thead//th[normalize-space()]")
-        norm = lambda s: re.sub(r"\s+", " ", s.strip().lower())
-        target_names = {
-            "course_code": {"course code", "course code*"},   # tolerate minor variants
-            "attended": {"attended classes", "attended"},
-            "total": {"total classes", "total"}
-        }
-        for idx, th in enumerate(ths):
-            name = norm(th.text)
-            for key, alts in target_names.items():
-                if name in alts:
-                    header_map[key] = idx
-    except Exception:
-        header_map = {}
+    # Whole table (header, cells, <p> texts, view-link onclick) in one call;
+    # vtop_parse maps headers so we aren't tied to fixed column indices.
+    data = table_data(driver, table)
 
     # Note text (red line)
     note = ""
@@ -771,129 +961,15 @@ def scrape_attendance(
     except Exception:
         pass
 
-    rows_out = []
-    tb = table.find_element(By.TAG_NAME, "tbody")
-    trs = tb.find_elements(By.TAG_NAME, "tr")
-
-    total_credits = None
-
-    def cell(td):
-        try:
-            ps = td.find_elements(By.TAG_NAME, "p")
-            if ps:
-                return " | ".join(p.text.strip() for p in ps if p.text.strip())
-        except Exception:
-            pass
-        return td.text.strip()
-
-    def to_int(x):
-        try:
-            return int(str(x).strip())
-        except:
-            return None
-
-    for tr in trs:
-        tds = tr.find_elements(By.TAG_NAME, "td")
-
-        # Skip the credits / footer rows
-        if len(tds) == 1 or "Total Number Of Credits" in tr.text:
-            try:
-                m = re.search(r"Total\s+Number\s+Of\s+Credits:\s*([0-9]+(?:\.[0-9]+)?)", tr.text, flags=re.I)
-                if m:
-                    total_credits = float(m.group(1))
-            except Exception:
-                pass
-            continue
-
-        if len(tds) < 11:  # need at least up to 'Total Classes'
-            continue
-
-        # -------- Minimal extraction using header first, else index fallback --------
-        if only_counts:
-            # Prefer header positions if found
-            if header_map:
-                i_code = header_map.get("course_code", 1)  # fallback to old index
-                i_attd = header_map.get("attended", 9)
-                i_totl = header_map.get("total", 10)
-            else:
-                # Original fixed indices from your existing parser
-                i_code, i_attd, i_totl = 1, 9, 10
-
-            course_code = cell(tds[i_code])
-            attended    = to_int(cell(tds[i_attd]))
-            total       = to_int(cell(tds[i_totl]))
-
-            # guard: only keep well-formed rows
-            if course_code and (attended is not None) and (total is not None):
-                rows_out.append({
-                    "course_code": course_code,
-                    "attended": attended,
-                    "total": total
-                })
-            continue
-
-        # -------- Full row extraction (your existing logic) --------
-        if len(tds) < 14:
-            continue
-
-        slno                 = cell(tds[0])
-        course_code          = cell(tds[1])
-        course_title         = cell(tds[2])
-        course_type          = cell(tds[3])
-        slot                 = cell(tds[4])
-        faculty              = cell(tds[5])
-        attendance_type      = cell(tds[6])
-        registration_dt      = cell(tds[7])
-        attendance_date      = cell(tds[8])
-        attended             = cell(tds[9])
-        total                = cell(tds[10])
-        percentage           = cell(tds[11])
-        status               = cell(tds[12])
-
-        view_info = {"href": "", "onclick": "", "regid": "", "slot": ""}
-        try:
-            view_a = tds[13].find_element(By.TAG_NAME, "a")
-            view_info["href"] = view_a.get_attribute("href") or ""
-            view_info["onclick"] = view_a.get_attribute("onclick") or ""
-            m = re.search(r"processViewAttendanceDetail\('([^']+)'\s*,\s*'([^']+)'\)", view_info["onclick"])
-            if m:
-                view_info["regid"] = m.group(1)
-                view_info["slot"]  = m.group(2)
-        except Exception:
-            pass
-
-        row = {
-            "slno": to_int(slno),
-            "course_code": course_code,
-            "course_title": course_title,
-            "course_type": course_type,
-            "slot": slot,
-            "faculty": faculty,
-            "attendance_type": attendance_type,
-            "registration_datetime": registration_dt,
-            "attendance_date": attendance_date,
-            "attended": to_int(attended),
-            "total": to_int(total),
-            "percentage": to_int(percentage) if percentage and percentage != "-" else None,
-            "status": status,
-            "view": view_info
-        }
-        rows_out.append(row)
-
-    payload = {
-        "rows": rows_out,
-        "total_credits": total_credits,
-        "note": note
-    }
+    payload = vtop_parse.attendance_payload(data, note=note, only_counts=only_counts)
+    rows_out, total_credits = payload["rows"], payload["total_credits"]
 
     if write_json:
         path = counts_out_path if only_counts else out_path
         with open(path, "w", encoding="utf-8") as f:
             json.dump(payload, f, indent=2, ensure_ascii=False)
-        if only_counts:
-            print(f"✅ Attendance (counts) saved to {path} | Rows: {len(rows_out)}")
-        else:
-            print(f"✅ Attendance (summary) saved to {path} | Rows: {len(rows_out)} | Credits: {total_credits}")
+        tracing.event("attendance_saved", path=path, rows=len(rows_out), only_counts=only_counts,
+                      total_credits=total_credits)
 
     return payload
 
@@ -910,92 +986,187 @@ def navigate_to_academic_calendar(driver):
     Open the Academics (graduation-cap) menu, then click 'Academic Calendar'.
     Robust to different selectors and menu states, similar to timetable nav.
     """
-    # Always reset to /content so the sidebar is present
-    driver.get(CONTENT_URL)
-    try:
-        wait_ready(driver, 12)
-    except Exception:
-        pass
-    time.sleep(0.5)
-
-    dismiss_alert_modal(driver)
-
-    # Click the left sidebar graduation-cap (Academics)
-    try:
-        academics_btn = WebDriverWait(driver, 8).until(
-            EC.element_to_be_clickable((
-                By.XPATH,
-                "//button[contains(@class,'SideBarMenuBtn')][.//i[contains(@class,'fa-graduation-cap')]]"
-            ))
-        )
-        academics_btn.click()
-    except Exception:
+    with tracing.span("navigate", section="calendar") as sp:
+        # Always reset to /content so the sidebar is present
+        driver.get(CONTENT_URL)
         try:
-            driver.execute_script("""
-                const btn = Array.from(document.querySelectorAll("button.SideBarMenuBtn"))
-                  .find(b => b.querySelector(".fa-graduation-cap"));
-                if (btn) btn.click();
-            """)
+            wait_ready(driver, 12)
         except Exception:
             pass
+        wait_settled(driver)
 
-    # Wait for dropdown panel (same pattern as timetable nav)
-    try:
-        WebDriverWait(driver, 6).until(
-            EC.visibility_of_element_located((
-                By.CSS_SELECTOR, "div.SideBarMenuDropDown.dropdown-menu.show"
-            ))
-        )
-    except Exception:
+        dismiss_alert_modal(driver)
+
+        # Click the left sidebar graduation-cap (Academics)
+        sp["menu"] = _open_academics_menu(driver)
+
+        # Click "Academic Calendar"
+        hit = _click_first(driver, [
+            (By.CSS_SELECTOR, "a.systemBtnMenu[data-url*='academics/common/CalendarPreview']"),
+            (By.XPATH, "//a[contains(@class,'systemBtnMenu') and contains(@data-url,'CalendarPreview')]"),
+            (By.XPATH, "//a[normalize-space()='Academic Calendar' or contains(., 'Academic Calendar')]"),
+        ], timeout=8)
+        sp["link"] = hit if hit is not None else "direct-url"
+        if hit is None:
+            # Fallback direct URL attempt (best-effort)
+            try:
+                driver.get(CONTENT_URL + "?menu=academics/common/CalendarPreview")
+            except Exception:
+                pass
+
+        dismiss_alert_modal(driver)
+
+        # Wait for any of the page anchors: semester dropdown, class group, or month buttons / calendar block
         try:
-            driver.find_element(
-                By.XPATH,
-                "//button[contains(@class,'SideBarMenuBtn')][.//i[contains(@class,'fa-graduation-cap')]]"
-            ).click()
-            WebDriverWait(driver, 4).until(
-                EC.visibility_of_element_located((
-                    By.CSS_SELECTOR, "div.SideBarMenuDropDown.dropdown-menu.show"
-                ))
+            WebDriverWait(driver, 12).until(
+                EC.any_of(
+                    EC.presence_of_element_located((By.ID, "semesterSubId")),
+                    EC.presence_of_element_located((By.ID, "classGroupId")),
+                    EC.presence_of_element_located((By.XPATH, "//div[@id='list-wrapper']")),
+                    EC.presence_of_element_located((By.XPATH, "//a[contains(@onclick,'processViewCalendar')]"))
+                )
             )
         except Exception:
-            pass
+            sp["anchors"] = False
+            wait_settled(driver, SECTION_ROOT_CSS)
+# ---------------------------------------------------------------------
 
-    # Click "Academic Calendar"
-    clicked = False
-    for how, sel in [
-        (By.CSS_SELECTOR, "a.systemBtnMenu[data-url*='academics/common/CalendarPreview']"),
-        (By.XPATH, "//a[contains(@class,'systemBtnMenu') and contains(@data-url,'CalendarPreview')]"),
-        (By.XPATH, "//a[normalize-space()='Academic Calendar' or contains(., 'Academic Calendar')]"),
-    ]:
-        try:
-            WebDriverWait(driver, 8).until(EC.element_to_be_clickable((how, sel))).click()
-            clicked = True
-            break
-        except Exception:
-            continue
 
-    if not clicked:
-        # Fallback direct URL attempt (best-effort)
+# -------------------- PARALLEL SECTIONS (one tab per section) --------------------
+# Sidebar menu data-url fragment + CSS anchors that prove the section has rendered
+SECTION_MENUS = {
+    "timetable": "StudentTimeTableChn",
+    "attendance": "StudentAttendance",
+    "calendar": "CalendarPreview",
+}
+SECTION_ANCHORS = {
+    "timetable": "#semesterSubId, #timeTableStyle",
+    "attendance": "div.table-responsive table, #semesterSubId",
+    "calendar": "#semesterSubId, #classGroupId, #list-wrapper, a[onclick*='processViewCalendar']",
+}
+
+# One non-blocking step of the per-tab state machine: load shell -> click menu -> anchors.
+_TAB_STEP_JS = r"""
+const menu = arguments[0], anchors = arguments[1];
+if (document.readyState !== 'complete') return 'loading';
+if (window.__sectionRequested === menu) {
+  return document.querySelector(anchors) ? 'ready' : 'waiting';
+}
+const a = document.querySelector("a.systemBtnMenu[data-url*='" + menu + "']");
+if (!a) return 'no-menu';
+document.querySelectorAll('.modal.show, .modal[style*="display: block"]').forEach(m=>{
+  m.style.display='none'; m.classList.remove('show');
+});
+document.querySelectorAll('.modal-backdrop').forEach(b=>b.remove());
+window.__sectionRequested = menu;
+a.click();   // VTOP's handler loads the section via XHR; we don't wait for it here
+return 'requested';
+"""
+
+def open_section_tabs(driver, sections, timeout=30):
+    """
+    Open one tab per section in the same logged-in browser and let them load at the same time.
+    Returns (handles, ready): {section: window_handle} and the set of sections whose UI rendered.
+    Leaves the driver on the original window.
+    """
+    main = driver.current_window_handle
+    handles = {}
+    for name in sections:
+        driver.switch_to.new_window("tab")
+        handles[name] = driver.current_window_handle
+        # assignment instead of driver.get(): returns immediately, the load runs in the background
+        driver.execute_script("window.location.href = arguments[0];", CONTENT_URL)
+
+    ready, pending = set(), dict(handles)
+    with tracing.span("section_tabs", sections=list(sections)) as sp:
+        end = time.time() + timeout
+        while pending and time.time() < end:
+            for name, h in list(pending.items()):
+                try:
+                    driver.switch_to.window(h)
+                    state = driver.execute_script(_TAB_STEP_JS, SECTION_MENUS[name], SECTION_ANCHORS[name])
+                except Exception:
+                    state = "error"
+                if state == "ready":
+                    ready.add(name)
+                    pending.pop(name)
+            if pending:
+                time.sleep(0.1)
+        sp.update(ready=sorted(ready), pending=sorted(pending), ok=not pending)
+
+    driver.switch_to.window(main)
+    return handles, ready
+
+def close_section_tabs(driver, handles, main_handle):
+    for h in handles.values():
         try:
-            driver.get(CONTENT_URL + "?menu=academics/common/CalendarPreview")
+            driver.switch_to.window(h)
+            driver.close()
         except Exception:
             pass
-
-    dismiss_alert_modal(driver)
-
-    # Wait for any of the page anchors: semester dropdown, class group, or month buttons / calendar block
     try:
-        WebDriverWait(driver, 12).until(
-            EC.any_of(
-                EC.presence_of_element_located((By.ID, "semesterSubId")),
-                EC.presence_of_element_located((By.ID, "classGroupId")),
-                EC.presence_of_element_located((By.XPATH, "//div[@id='list-wrapper']")),
-                EC.presence_of_element_located((By.XPATH, "//a[contains(@onclick,'processViewCalendar')]"))
-            )
-        )
+        driver.switch_to.window(main_handle)
     except Exception:
-        time.sleep(1.5)
-# ---------------------------------------------------------------------
+        pass
+# ---------------------------------------------------------------------------------
+
+
+# -------------------- IN-PLACE SECTION SWITCH --------------------
+# Load a section into the content shell that is already open, the way the sidebar does:
+# fire the a.systemBtnMenu loader for its data-url, then wait (in the page) for fresh anchors.
+# Anchors of the previous section are marked first, since e.g. #semesterSubId exists in all three.
+_SWITCH_SECTION_JS = r"""
+const menu = arguments[0], anchors = arguments[1], timeoutMs = arguments[2];
+const done = arguments[arguments.length - 1];
+const a = document.querySelector("a.systemBtnMenu[data-url*='" + menu + "']");
+if (document.readyState !== 'complete' || !a) return done('no-shell');
+document.querySelectorAll('.modal.show, .modal[style*="display: block"]').forEach(m=>{
+  m.style.display='none'; m.classList.remove('show');
+});
+document.querySelectorAll('.modal-backdrop').forEach(b=>b.remove());
+document.querySelectorAll(anchors).forEach(e => e.setAttribute('data-prev-section', '1'));
+a.click();
+const end = Date.now() + timeoutMs;
+(function poll() {
+  const fresh = Array.from(document.querySelectorAll(anchors)).some(e => !e.hasAttribute('data-prev-section'));
+  if (fresh) return done('ready');
+  if (Date.now() > end) return done('timeout');
+  setTimeout(poll, 50);
+})();
+"""
+
+def switch_section(driver, name, timeout=10):
+    """Switch the open /vtop/content page to a section without reloading it. True if its UI rendered."""
+    with tracing.span("switch_section", section=name) as sp:
+        try:
+            driver.set_script_timeout(timeout + 5)
+            state = driver.execute_async_script(_SWITCH_SECTION_JS, SECTION_MENUS[name], SECTION_ANCHORS[name],
+                                                int(timeout * 1000))
+        except Exception:
+            state = "error"
+        sp.update(state=state, ok=state == "ready")
+    return state == "ready"   # modals were hidden in-page; no dismiss_alert_modal() wait here
+
+_SECTION_NAVIGATORS = {
+    "timetable": navigate_to_timetable,
+    "attendance": navigate_to_attendance,
+    "calendar": navigate_to_academic_calendar,
+}
+
+def goto_section(driver, name, in_place=True, timeout=10):
+    """
+    Open a section: in place through the loaded content shell when possible,
+    otherwise the full navigate_to_* flow (reload /vtop/content, sidebar, retries).
+    Returns 'in-place' or 'reload'.
+    """
+    with tracing.span("goto_section", section=name) as sp:
+        if in_place and switch_section(driver, name, timeout):
+            sp["branch"] = "in-place"
+        else:
+            _SECTION_NAVIGATORS[name](driver)
+            sp["branch"] = "reload"
+    return sp["branch"]
+# ---------------------------------------------------------------------------------
 
 
 def _get_selected_label(select_el):
@@ -1067,7 +1238,7 @@ def select_acad_semester_with_shortcuts(driver, allow_manual_seconds=30):
             try:
                 cur_val = dropdown.get_attribute("value")
                 if cur_val != initial_val:
-                    time.sleep(0.6)  # let the page update dependent UI
+                    wait_settled(driver, SECTION_ROOT_CSS)  # let the page update dependent UI
                     chosen = _get_selected_label(dropdown)
                     print(f"✅ Semester selected (manual): {chosen}")
                     return chosen
@@ -1080,12 +1251,13 @@ def select_acad_semester_with_shortcuts(driver, allow_manual_seconds=30):
     # Shortcut path
     try:
         idx = int(choice.replace("S", "")) - 1
+        track_network(driver)
         options[idx].click()
         try:
             driver.execute_script("arguments[0].dispatchEvent(new Event('change', {bubbles:true}));", dropdown)
         except Exception:
             pass
-        time.sleep(0.8)
+        wait_settled(driver, SECTION_ROOT_CSS)
         chosen = _get_selected_label(dropdown)
         print(f"✅ Semester selected: {chosen}")
         return chosen
@@ -1146,7 +1318,7 @@ def select_acad_class_group_with_shortcuts(driver, allow_manual_seconds=15):
             try:
                 cur_val = dropdown.get_attribute("value")
                 if cur_val != initial_val:
-                    time.sleep(0.6)
+                    wait_settled(driver, SECTION_ROOT_CSS)
                     chosen = _get_selected_label(dropdown)
                     print(f"✅ Class group selected (manual): {chosen}")
                     return chosen
@@ -1158,12 +1330,13 @@ def select_acad_class_group_with_shortcuts(driver, allow_manual_seconds=15):
 
     try:
         idx = int(choice.replace("S", "")) - 1
+        track_network(driver)
         options[idx].click()
         try:
             driver.execute_script("arguments[0].dispatchEvent(new Event('change', {bubbles:true}));", dropdown)
         except Exception:
             pass
-        time.sleep(0.6)
+        wait_settled(driver, SECTION_ROOT_CSS)
         chosen = _get_selected_label(dropdown)
         print(f"✅ Class group selected: {chosen}")
         return chosen
@@ -1211,57 +1384,13 @@ def _fullpage_png(driver):
 
     return base64.b64decode(png_b64)
 # ===== Academic Calendar: click through months and save full-page PNGs =====
-MONTH_NAMES = ["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"]
-
-def _kill_overlays_soft(driver):
-    try:
-        driver.execute_script("""
-            document.querySelectorAll('.modal.show, .modal[style*="display: block"]').forEach(m=>{ 
-                m.style.display='none'; m.classList.remove('show'); 
-            });
-            document.querySelectorAll('.modal-backdrop, .fade.show').forEach(b=>b.remove());
-            document.body.style.overflow='auto';
-        """)
-    except Exception:
-        pass
-
-MONTH_NAMES = ["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"]
-
-def _norm_month_label(label: str):
-    """
-    Normalize various month label shapes into ('Jan', '2025') or ('Jan', '')
-    Accepts: 'JUL-2025', 'July 2025', 'Jul_2025', 'Jul', 'JUL', etc.
-    Returns (mon3, year_str) or (None, None) if not a month.
-    """
-    s = (label or "").strip()
-    if not s:
-        return None, None
-
-    # unify separators and case
-    s = s.replace("_", "-").replace("/", "-").replace("  ", " ")
-    # Try "Mon-YYYY" or "Mon YYYY" or "Month YYYY"
-    m = re.match(r"^\s*([A-Za-z]{3,9})[-\s]?(\d{4})?\s*$", s)
-    if not m:
-        return None, None
-    mon = m.group(1)[:3].title()
-    yr  = (m.group(2) or "").strip()
-    if mon not in MONTH_NAMES:
-        # Try mapping long month names -> short
-        long_to_short = {
-            "January":"Jan","February":"Feb","March":"Mar","April":"Apr","May":"May","June":"Jun",
-            "July":"Jul","August":"Aug","September":"Sep","October":"Oct","November":"Nov","December":"Dec"
-        }
-        mon = long_to_short.get(m.group(1).title(), mon)
-    if mon not in MONTH_NAMES:
-        return None, None
-    return mon, yr
-
+MONTH_NAMES = vtop_parse.MONTH_NAMES
 def _find_month_controls(driver):
     """
     Return a list of tuples: [(label, element, onclick_js), ...]
     Label is normalized like 'Jul 2025' (year optional).
     """
-    controls, seen = [], set()
+    raw = []   # (label as shown, element, onclick_js); vtop_parse normalizes / dedupes / sorts
     candidates = []
 
     # Common clickable candidates
@@ -1269,21 +1398,11 @@ def _find_month_controls(driver):
     candidates += driver.find_elements(By.XPATH, "//div[@id='list-wrapper']//a | //ul//a | //a")
     candidates += driver.find_elements(By.XPATH, "//button[normalize-space()]")
 
-    def push(lbl, el, js):
-        mon, yr = _norm_month_label(lbl)
-        if not mon: 
-            return
-        label = f"{mon} {yr}".strip()
-        if label in seen:
-            return
-        seen.add(label)
-        controls.append((label, el, js))
-
     for el in candidates:
         try:
             lbl = (el.text or "").strip() or (el.get_attribute("title") or "").strip() or (el.get_attribute("data-month") or "").strip()
             if lbl:
-                push(lbl, el, None)
+                raw.append((lbl, el, None))
             # If it has explicit onclick, keep as JS fallback too
             js = el.get_attribute("onclick") or ""
             if "processViewCalendar" in js and not lbl:
@@ -1291,23 +1410,11 @@ def _find_month_controls(driver):
                 m1 = re.search(r"processViewCalendar\('([A-Za-z]{3,9})'", js)
                 y1 = re.search(r"processViewCalendar\('[A-Za-z]{3,9}'\s*,\s*'(\d{4})'", js)
                 if m1:
-                    push(f"{m1.group(1)} {y1.group(1) if y1 else ''}", None, js)
+                    raw.append((f"{m1.group(1)} {y1.group(1) if y1 else ''}", None, js))
         except Exception:
             continue
 
-    # Sort safely; if parsing fails for some, keep original order
-    def month_key(lbl):
-        mon, yr = _norm_month_label(lbl)
-        m = MONTH_NAMES.index(mon) if mon in MONTH_NAMES else 99
-        y = int(yr) if (yr and yr.isdigit()) else 0
-        return (y, m)
-
-    try:
-        controls.sort(key=lambda t: month_key(t[0]))
-    except Exception:
-        # keep DOM order if any unexpected label sneaks in
-        pass
-    return controls
+    return vtop_parse.month_controls(raw)
 def _wait_calendar_render(driver, timeout=8):
     """
     Wait until the academic calendar page has some visible content 
@@ -1322,7 +1429,7 @@ def _wait_calendar_render(driver, timeout=8):
             )
         )
     except Exception:
-        time.sleep(1)
+        wait_settled(driver, SECTION_ROOT_CSS)
 def _boost_dpi(driver, scale=2):
     """Increase deviceScaleFactor for crisp text (no visual zoom for user)."""
     try:
@@ -1357,14 +1464,11 @@ def _hide_chrome_chrome(driver):
     except Exception:
         pass
 
+_CALENDAR_SELECTORS = ["#list-wrapper", "div[id*='calendar']", "div.calendar, div.Calendar"]
+
 def _find_calendar_container(driver):
     """Return the scrollable calendar grid element."""
-    selectors = [
-        "#list-wrapper",                      # common on VTOP
-        "div[id*='calendar']",
-        "div.calendar, div.Calendar"
-    ]
-    for sel in selectors:
+    for sel in _CALENDAR_SELECTORS:  # #list-wrapper is the usual one on VTOP
         try:
             el = driver.find_element(By.CSS_SELECTOR, sel)
             if el and el.size["height"] > 0 and el.is_displayed():
@@ -1405,7 +1509,7 @@ def _element_scroll_slices(driver, el, out_dir, base_name, overlap_px=80):
     i = 1
     while True:
         driver.execute_script("arguments[0].scrollTop = arguments[1];", el, y)
-        time.sleep(0.35)  # allow repaint
+        wait_settled(driver, quiet_ms=50)  # lazy content + repaint
         path = os.path.join(out_dir, f"{base_name}_part{i:02d}.png")
         el.screenshot(path)     # captures only the visible slice of the element
         paths.append(path)
@@ -1415,7 +1519,92 @@ def _element_scroll_slices(driver, el, out_dir, base_name, overlap_px=80):
         y = min(y + step, scroll_h - view_h)
     return paths
 
-def screenshot_academic_calendar_months(driver, out_dir=os.path.join("data", "academic_calendar")):
+# Unclip the container (no inner scrolling), report its page rect, and stash the
+# old inline styles so _restore_container can put them back.
+_EXPAND_CONTAINER_JS = r"""
+const el = arguments[0];
+el.__vtopStyle = el.getAttribute("style");
+el.style.maxHeight = "none";
+el.style.height = el.scrollHeight + "px";
+el.style.overflow = "visible";
+const r = el.getBoundingClientRect();
+return {x: r.left + window.scrollX, y: r.top + window.scrollY,
+        width: Math.max(r.width, el.scrollWidth), height: Math.max(r.height, el.scrollHeight)};
+"""
+_RESTORE_CONTAINER_JS = r"""
+const el = arguments[0];
+if (el.__vtopStyle === null) el.removeAttribute("style"); else el.setAttribute("style", el.__vtopStyle);
+"""
+
+def _clip_screenshot(driver, el, path):
+    """
+    Whole element (including what it would scroll) in one Page.captureScreenshot
+    with a clip rect + captureBeyondViewport. Uses the current deviceScaleFactor.
+    """
+    rect = driver.execute_script(_EXPAND_CONTAINER_JS, el)
+    try:
+        data = driver.execute_cdp_cmd("Page.captureScreenshot", {
+            "format": "png",
+            "fromSurface": True,
+            "captureBeyondViewport": True,
+            "clip": {"x": rect["x"], "y": rect["y"], "width": rect["width"],
+                     "height": rect["height"], "scale": 1},
+        })["data"]
+    finally:
+        try:
+            driver.execute_script(_RESTORE_CONTAINER_JS, el)
+        except Exception:
+            pass
+    with open(path, "wb") as f:
+        f.write(base64.b64decode(data))
+    return path
+
+# Month switch without fixed sleeps: tag the calendar container and observe its whole
+# subtree, then wait until VTOP's AJAX replaces the container or changes anything below
+# it (the month's table / tbody is swapped a few levels down, not as a direct child).
+_MARK_CALENDAR_JS = r"""
+if (window.__vtopCalObs) window.__vtopCalObs.disconnect();
+for (const sel of arguments[0]) {
+  const el = document.querySelector(sel);
+  if (!el) continue;
+  el.__vtopStale = true;
+  window.__vtopCalSwapped = false;
+  window.__vtopCalObs = new MutationObserver(() => { window.__vtopCalSwapped = true; });
+  window.__vtopCalObs.observe(el, {subtree: true, childList: true, characterData: true});
+  return true;
+}
+return false;
+"""
+_CALENDAR_SWAPPED_JS = r"""
+for (const sel of arguments[0]) {
+  const el = document.querySelector(sel);
+  if (!el) continue;
+  const swapped = !el.__vtopStale || window.__vtopCalSwapped === true;  // replaced / new content inside
+  if (swapped && window.__vtopCalObs) { window.__vtopCalObs.disconnect(); window.__vtopCalObs = null; }
+  return swapped;
+}
+return false;
+"""
+
+def _wait_calendar_swap(driver, timeout=6):
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+            lambda d: d.execute_script(_CALENDAR_SWAPPED_JS, _CALENDAR_SELECTORS)
+        )
+        return True
+    except Exception:
+        return False
+
+def screenshot_academic_calendar_months(driver, out_dir=os.path.join("data", "academic_calendar"), mode="clip",
+                                        save_html=True):
+    """
+    One PNG per month in out_dir (plus the month's grid HTML with save_html, for
+    vtop_parse.calendar_events_from_html).
+    mode="clip":   each month's container in a single clipped CDP screenshot,
+                   month switches detected from the DOM instead of sleeps.
+    mode="slices": scroll the container and save overlapping _partNN.png slices
+                   (also the per-month fallback if a clipped capture fails).
+    """
     # ====== RESET OUTPUT FOLDER EACH RUN (ADDED) ======
     if os.path.exists(out_dir):
         try:
@@ -1432,24 +1621,31 @@ def screenshot_academic_calendar_months(driver, out_dir=os.path.join("data", "ac
 
     controls = _find_month_controls(driver)
     if not controls:
-        print("⚠️ Month controls not found; saving current calendar area.")
+        tracing.warn("calendar_month_controls_not_found")
         cont = _find_calendar_container(driver)
         if cont:
             p = os.path.join(out_dir, "calendar_part01.png")
-            cont.screenshot(p)
-            print(f"✅ Saved: {p}")
+            with tracing.span("screenshot", kind="calendar", branch="container", path=p):
+                cont.screenshot(p)
             _reset_dpi(driver)
             return 1
         else:
-            png = _fullpage_png(driver)
             p = os.path.join(out_dir, "calendar.png")
-            with open(p, "wb") as f: f.write(png)
-            print(f"✅ Saved: {p}")
+            with tracing.span("screenshot", kind="calendar", branch="fullpage", path=p):
+                png = _fullpage_png(driver)
+                with open(p, "wb") as f: f.write(png)
             _reset_dpi(driver)
             return 1
 
     saved = 0
     for idx, (label, el, js) in enumerate(controls, 1):
+        marked = False
+        if mode == "clip":
+            try:
+                marked = driver.execute_script(_MARK_CALENDAR_JS, _CALENDAR_SELECTORS)
+            except Exception:
+                pass
+
         # click month button/link
         try:
             if el and el.is_displayed():
@@ -1463,34 +1659,55 @@ def screenshot_academic_calendar_months(driver, out_dir=os.path.join("data", "ac
         except Exception:
             pass
 
-        time.sleep(0.8)
+        with tracing.span("calendar_month_switch", month=label, branch="swap" if marked else "settle"):
+            if marked:
+                _wait_calendar_swap(driver)
+            else:
+                wait_settled(driver, SECTION_ROOT_CSS)
         _kill_overlays_soft(driver)
         _wait_calendar_render(driver)
 
         # find the scrollable calendar grid
         cont = _find_calendar_container(driver)
+        base = f"{idx:02d}_{label.replace(' ','_').replace('/','-')}"
         if not cont:
-            print(f"⚠️ Calendar container not found for {label}; falling back to full-page capture.")
-            png = _fullpage_png(driver)
             fp = os.path.join(out_dir, f"{idx:02d}_{label.replace(' ','_')}.png")
-            with open(fp, "wb") as f: f.write(png)
-            print(f"🖼️  Saved month (fullpage): {fp}")
+            with tracing.span("screenshot", kind="calendar", month=label, branch="fullpage", path=fp):
+                png = _fullpage_png(driver)
+                with open(fp, "wb") as f: f.write(png)
             saved += 1
             continue
 
+        if save_html:
+            try:
+                with open(os.path.join(out_dir, f"{base}.html"), "w", encoding="utf-8") as f:
+                    f.write(cont.get_attribute("outerHTML") or "")
+            except Exception:
+                pass
+
+        if mode == "clip":
+            try:
+                with tracing.span("screenshot", kind="calendar", month=label, branch="clip"):
+                    _clip_screenshot(driver, cont, os.path.join(out_dir, f"{base}.png"))
+                saved += 1
+                continue
+            except Exception as e:
+                tracing.warn("calendar_clip_failed", month=label, error=str(e))
+
         # slice screenshots down the month
-        base = f"{idx:02d}_{label.replace(' ','_').replace('/','-')}"
-        parts = _element_scroll_slices(driver, cont, out_dir, base_name=base, overlap_px=100)
-        print(f"🖼️  Saved {len(parts)} slices for {label}:")
-        for p in parts:
-            print(f"     - {p}")
+        with tracing.span("screenshot", kind="calendar", month=label, branch="slices") as sp:
+            parts = _element_scroll_slices(driver, cont, out_dir, base_name=base, overlap_px=100)
+            sp["files"] = len(parts)
         saved += len(parts)
 
-    print(f"✅ Academic Calendar screenshots saved ({saved} files) → {out_dir}")
+    _reset_dpi(driver)
+    tracing.event("calendar_screenshots_saved", files=saved, out_dir=out_dir)
+    return saved
+
 
-    
 # --------------------------- MAIN ---------------------------
 def main():
+    tracing.setup()  # helper events as JSONL on stderr (or TRACE_FILE); prompts stay on stdout
     # ---- Credentials in terminal ----
     username_val = input("Enter your VTOP username (e.g., Reg No): ").strip()
     password_val = getpass.getpass("Enter your VTOP password: ")
@@ -1598,14 +1815,15 @@ def main():
         return
 
         # If not ok, check specific failure reasons
-        if page_says_wrong_password(driver):
+        p = probe_page(driver)
+        if page_says_wrong_password(driver, p):
             print("❌ The page indicates the password/credentials are invalid.")
             if pwd_try < MAX_PASSWORD_ATTEMPTS:
                 continue
             else:
                 print("❌ Maximum password attempts reached.")
                 break
-        elif page_says_wrong_captcha(driver):
+        elif page_says_wrong_captcha(driver, p):
             print("❌ CAPTCHA seems incorrect. Please try again on the page.")
             continue
         else:
@@ -0,0 +1,189 @@
+# admission.py
+"""
+Admission control for Chrome sessions.
+Every live webdriver holds a Slot. New slots are granted only while we are under
+`max_drivers` and the host/container still has `min_free_mem_mb` available.
+Waiters queue per lane: 'interactive' (/start) always goes before 'background'
+(pool refills, background refreshes), and background work may never take the last
+`interactive_reserve` slots. One client may hold at most `per_client_max` slots.
+"""
+import threading
+import time
+from typing import Dict, List, Optional
+
+LANES = ("interactive", "background")
+
+
+class AdmissionRejected(Exception):
+    """No capacity right now; API layer turns this into 429 + Retry-After."""
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Slot:
+    def __init__(self, ctl: "AdmissionController", lane: str, client: Optional[str]):
+        self._ctl = ctl
+        self.lane = lane
+        self.client = client
+        self.granted_at = time.time()
+        self.released = False
+
+    def release(self):
+        self._ctl.release(self)
+
+
+# ---------------------- memory probes ----------------------
+def _read_int(path: str) -> Optional[int]:
+    try:
+        with open(path) as f:
+            raw = f.read().strip()
+        return None if raw == "max" else int(raw)
+    except Exception:
+        return None
+
+def available_memory_mb() -> Optional[float]:
+    """min(host MemAvailable, cgroup limit - usage) in MB; None if unknown."""
+    candidates = []
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    candidates.append(int(line.split()[1]) / 1024)
+                    break
+    except Exception:
+        pass
+    # cgroup v2, then v1 (containers get OOM-killed at the cgroup limit, not host RAM)
+    for limit_p, usage_p in [
+        ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory.current"),
+        ("/sys/fs/cgroup/memory/memory.limit_in_bytes", "/sys/fs/cgroup/memory/memory.usage_in_bytes"),
+    ]:
+        limit, usage = _read_int(limit_p), _read_int(usage_p)
+        if limit and usage is not None and limit < (1 << 60):
+            candidates.append((limit - usage) / (1024 * 1024))
+            break
+    return min(candidates) if candidates else None
+
+
+# ---------------------- controller ----------------------
+class AdmissionController:
+    def __init__(
+        self,
+        *,
+        max_drivers: int = 8,
+        min_free_mem_mb: float = 400,
+        per_client_max: int = 2,
+        interactive_reserve: int = 1,
+        queue_timeout: float = 15,
+        max_queue: int = 32,
+        retry_after_sec: int = 10,
+        poll_sec: float = 0.5,
+    ):
+        self.max_drivers = max(1, max_drivers)
+        self.min_free_mem_mb = min_free_mem_mb
+        self.per_client_max = per_client_max
+        self.interactive_reserve = min(max(0, interactive_reserve), self.max_drivers - 1)
+        self.queue_timeout = queue_timeout
+        self.max_queue = max_queue
+        self.retry_after_sec = retry_after_sec
+        self.poll_sec = poll_sec
+
+        self._cond = threading.Condition()
+        self._live: Dict[str, int] = {lane: 0 for lane in LANES}
+        self._per_client: Dict[str, int] = {}
+        self._waiting: Dict[str, List[object]] = {lane: [] for lane in LANES}
+
+    # ---------------- public ----------------
+    def check_client(self, client: Optional[str]):
+        """Fail fast if this client already holds its share of slots."""
+        with self._cond:
+            self._check_client_locked(client)
+
+    def acquire(self, lane: str = "interactive", client: Optional[str] = None,
+                timeout: Optional[float] = None) -> Slot:
+        """Block (up to timeout) until a slot is free, else raise AdmissionRejected."""
+        if lane not in LANES:
+            raise ValueError(f"unknown lane {lane!r}")
+        timeout = self.queue_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._check_client_locked(client)
+            if len(self._waiting[lane]) >= self.max_queue:
+                raise AdmissionRejected("Admission queue is full", self.retry_after_sec)
+            ticket = object()
+            self._waiting[lane].append(ticket)
+            try:
+                while not self._can_admit_locked(lane, ticket):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise AdmissionRejected("Server is at capacity", self.retry_after_sec)
+                    # wake periodically: free memory changes without anyone notifying us
+                    self._cond.wait(min(remaining, self.poll_sec))
+                slot = Slot(self, lane, client)
+                self._live[lane] += 1
+                if client:
+                    self._per_client[client] = self._per_client.get(client, 0) + 1
+                return slot
+            finally:
+                self._waiting[lane].remove(ticket)
+                self._cond.notify_all()
+
+    def assign(self, slot: Slot, lane: str, client: Optional[str]):
+        """Hand an existing slot (e.g. a warm pooled driver) to a new owner."""
+        with self._cond:
+            if slot.released:
+                return
+            self._live[slot.lane] -= 1
+            self._live[lane] += 1
+            self._dec_client_locked(slot.client)
+            if client:
+                self._per_client[client] = self._per_client.get(client, 0) + 1
+            slot.lane, slot.client = lane, client
+            self._cond.notify_all()
+
+    def release(self, slot: Slot):
+        with self._cond:
+            if slot.released:
+                return
+            slot.released = True
+            self._live[slot.lane] -= 1
+            self._dec_client_locked(slot.client)
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, object]:
+        with self._cond:
+            return {
+                "live": dict(self._live),
+                "waiting": {lane: len(q) for lane, q in self._waiting.items()},
+                "max_drivers": self.max_drivers,
+                "available_mem_mb": available_memory_mb(),
+            }
+
+    # ---------------- internals ----------------
+    def _check_client_locked(self, client: Optional[str]):
+        if client and self.per_client_max and self._per_client.get(client, 0) >= self.per_client_max:
+            raise AdmissionRejected("Too many active sessions for this client", self.retry_after_sec)
+
+    def _dec_client_locked(self, client: Optional[str]):
+        if not client:
+            return
+        n = self._per_client.get(client, 0) - 1
+        if n > 0:
+            self._per_client[client] = n
+        else:
+            self._per_client.pop(client, None)
+
+    def _can_admit_locked(self, lane: str, ticket: object) -> bool:
+        # FIFO inside a lane; interactive waiters block the background lane entirely
+        if self._waiting[lane][0] is not ticket:
+            return False
+        if lane == "background" and self._waiting["interactive"]:
+            return False
+        cap = self.max_drivers
+        if lane == "background":
+            cap -= self.interactive_reserve
+        if sum(self._live.values()) >= cap:
+            return False
+        free = available_memory_mb()
+        return free is None or free >= self.min_free_mem_mb
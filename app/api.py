@@ -1,13 +1,15 @@
 # api.py
-import os, re, time, uuid, shutil
+import os, re, json, time, uuid, shutil, asyncio, threading, mimetypes
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
 from pathlib import Path
-from typing import List, Optional, Dict
+from typing import Any, Callable, List, Literal, Optional, Dict
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from fastapi import FastAPI, HTTPException, Query
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import FileResponse, JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
@@ -20,6 +22,16 @@ from selenium.webdriver.support import expected_conditions as EC
 
 # import your helpers
 import Login  # <- your file in the same folder
+import admission
+import asset_store
+import driver_pool
+import images
+import jobs
+import metrics
+import results_cache
+import tracing
+import vtop_http
+import vtop_parse
 
 APP_ROOT       = Path(__file__).parent.resolve()
 SESSIONS_ROOT  = APP_ROOT / "sessions"
@@ -28,8 +40,87 @@ SESSIONS_ROOT.mkdir(parents=True, exist_ok=True)
 ALLOWED_ORIGIN = os.getenv("ALLOWED_ORIGIN", "*")
 HEADLESS       = os.getenv("HEADLESS", "1") == "1"
 
+# Warm driver pool (POOL_MAX_SIZE=0 disables it)
+POOL_MIN_SIZE    = int(os.getenv("POOL_MIN_SIZE", "1"))
+POOL_MAX_SIZE    = int(os.getenv("POOL_MAX_SIZE", "3"))
+POOL_MAX_AGE_SEC = float(os.getenv("POOL_MAX_AGE_SEC", "240"))
+
+# Admission control: live Chrome cap, free-memory floor, per-client share
+MAX_DRIVERS         = int(os.getenv("MAX_DRIVERS", "8"))
+MIN_FREE_MEM_MB     = float(os.getenv("MIN_FREE_MEM_MB", "400"))
+PER_CLIENT_MAX      = int(os.getenv("PER_CLIENT_MAX", "2"))
+INTERACTIVE_RESERVE = int(os.getenv("INTERACTIVE_RESERVE", "1"))
+ADMISSION_QUEUE_SEC = float(os.getenv("ADMISSION_QUEUE_SEC", "15"))
+# Proxies in front of us that append to X-Forwarded-For (Railway: 1); 0 ignores the header
+TRUSTED_PROXY_HOPS  = int(os.getenv("TRUSTED_PROXY_HOPS", "1"))
+
+# Cookie-backed HTTP fast path: after Chrome logs in, fetch sections over plain HTTP.
+# With RELEASE_BROWSER the Chrome instance is closed once a run succeeded entirely over HTTP.
+HTTP_FAST_PATH                 = os.getenv("HTTP_FAST_PATH", "0") == "1"
+HTTP_FAST_PATH_RELEASE_BROWSER = os.getenv("HTTP_FAST_PATH_RELEASE_BROWSER", "0") == "1"
+
+# Parallel mode: timetable / attendance / calendar load side by side in their own tabs
+PARALLEL_TABS = os.getenv("PARALLEL_TABS", "0") == "1"
+
+# Switch sections inside the loaded /vtop/content shell (sidebar data-url loader) instead of
+# reloading it per section; the full navigate_to_* flow remains the fallback
+IN_PLACE_NAV         = os.getenv("IN_PLACE_NAV", "1") == "1"
+IN_PLACE_NAV_TIMEOUT = float(os.getenv("IN_PLACE_NAV_TIMEOUT", "10"))
+
+# Calendar capture: "clip" = one clipped CDP screenshot per month, "slices" = scrolled parts
+CALENDAR_CAPTURE = os.getenv("CALENDAR_CAPTURE", "clip")
+
+# Screenshot re-encoding (optimized PNG in place + WebP/AVIF siblings) in worker processes
+IMAGE_WORKERS        = int(os.getenv("IMAGE_WORKERS", "2"))
+IMAGE_FORMATS        = [f.strip() for f in os.getenv("IMAGE_FORMATS", "webp").split(",") if f.strip()]
+IMAGE_ENCODE_TIMEOUT = float(os.getenv("IMAGE_ENCODE_TIMEOUT", "30"))
+
+# Weekly timetable: the grid is always parsed to JSON; TIMETABLE_PNG=0 skips the screenshot
+# whenever the grid yields at least one class
+TIMETABLE_PNG = os.getenv("TIMETABLE_PNG", "1") == "1"
+
+# Results cache per regno + selection: fresh entries are served as is, stale ones are
+# served while a background refresh runs; RESULT_FRESH_SEC=0 disables it
+RESULT_FRESH_SEC       = float(os.getenv("RESULT_FRESH_SEC", "300"))
+RESULT_STALE_SEC       = float(os.getenv("RESULT_STALE_SEC", str(60 * 60)))
+RESULT_FLIGHT_WAIT_SEC = float(os.getenv("RESULT_FLIGHT_WAIT_SEC", "300"))
+
+# Block images / fonts / trackers (CDP) while navigating to table-only sections
+RESOURCE_BLOCKING = os.getenv("RESOURCE_BLOCKING", "1") == "1"
+
+# Save every scraped VTOP page (raw HTML) here to grow the vtop_parse fixture corpus.
+# Pages contain student data: only point this at a private directory.
+VTOP_CAPTURE_DIR = os.getenv("VTOP_CAPTURE_DIR", "")
+
+# Structured JSONL trace events (tracing.py): TRACE_FILE path, or stderr when empty
+TRACE_FILE  = os.getenv("TRACE_FILE", "")
+TRACE_LEVEL = os.getenv("TRACE_LEVEL", "INFO")
+
+# Session reaper: idle TTL, LRU eviction under memory pressure, orphan dir GC
+SESSION_IDLE_TTL_SEC = float(os.getenv("SESSION_IDLE_TTL_SEC", str(20 * 60)))
+REAPER_INTERVAL_SEC  = float(os.getenv("REAPER_INTERVAL_SEC", "15"))
+REAPER_MIN_IDLE_SEC  = float(os.getenv("REAPER_MIN_IDLE_SEC", "60"))
+REAPER_LOW_MEM_MB    = float(os.getenv("REAPER_LOW_MEM_MB", str(MIN_FREE_MEM_MB)))
+ORPHAN_GRACE_SEC     = float(os.getenv("ORPHAN_GRACE_SEC", str(10 * 60)))
+
+# Background job mode for /jobs/run and /jobs/resync
+JOB_KEEP_SEC = float(os.getenv("JOB_KEEP_SEC", str(15 * 60)))
+
 # ---------------------- FastAPI ----------------------
-app = FastAPI(title="ForeSync Backend", version="1.0.0")
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    POOL.start()
+    reaper = asyncio.create_task(_reaper_loop())
+    try:
+        yield
+    finally:
+        reaper.cancel()
+        POOL.stop()
+        ENCODER.shutdown()
+        tracing.shutdown()
+        LAUNCHER.shutdown(wait=False, cancel_futures=True)
+
+app = FastAPI(title="ForeSync Backend", version="1.0.0", lifespan=_lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[ALLOWED_ORIGIN] if ALLOWED_ORIGIN != "*" else ["*"],
@@ -40,40 +131,148 @@ app.add_middleware(
 
 # ---------------------- Session store ----------------------
 class Session:
-    def __init__(self, sid: str, driver: webdriver.Chrome, root: Path):
+    def __init__(self, sid: str, driver: webdriver.Chrome, root: Path, slot: Optional[admission.Slot] = None):
         self.id = sid
         self.driver = driver
         self.root = root
+        self.slot = slot
+        self.http: Optional[vtop_http.VtopHttp] = None  # set after login in fast-path mode
+        self.regno: Optional[str] = None   # set by a VTOP login or a password-checked cache hit
+        self.logged_in = False             # browser/HTTP session is authenticated on VTOP
+        self.cache_only = False            # /run answered from the results cache; VTOP login still pending
+        self.last_selection: Dict[str, tuple] = {}  # section -> semester/class-group picks it last ran with
+        self.last_assets: Optional["AssetsOut"] = None
         self.created_at = time.time()
+        self.last_active = self.created_at
+        self.busy = 0
+        self._lock = threading.Lock()
+        # one thread per session: browser commands run strictly one after another,
+        # and long Selenium work never occupies Starlette's shared threadpool
+        self.worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"session-{sid[:8]}")
+
+    def touch(self):
+        self.last_active = time.time()
+
+    def _done(self):
+        with self._lock:
+            self.busy -= 1
+        self.touch()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Queue fn on this session's worker. Queued/running work counts as busy,
+           so the reaper never evicts the session meanwhile."""
+        with self._lock:
+            self.busy += 1
+        self.touch()
+
+        def _call():
+            try:
+                with tracing.session(self.id):
+                    return fn(*args, **kwargs)
+            finally:
+                self._done()
+        try:
+            return self.worker.submit(_call)
+        except Exception:
+            self._done()
+            raise
+
+    async def call(self, fn: Callable, *args, **kwargs):
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def idle_for(self, now: Optional[float] = None) -> float:
+        return (now or time.time()) - self.last_active
 
 SESSIONS: Dict[str, Session] = {}
 
-def _new_session() -> Session:
+def _new_session(driver: webdriver.Chrome, slot: Optional[admission.Slot] = None) -> Session:
     sid = uuid.uuid4().hex
     root = SESSIONS_ROOT / sid
     root.mkdir(parents=True, exist_ok=True)
-    driver = _make_driver()
-    return Session(sid, driver, root)
+    return Session(sid, driver, root, slot)
 
 def _get_session(sid: str) -> Session:
     s = SESSIONS.get(sid)
     if not s:
         raise HTTPException(status_code=404, detail="Invalid or expired session_id")
+    s.touch()
     return s
 
-def _cleanup_if_needed(max_age_sec: int = 45 * 60):
+def _close_session(sid: str):
+    s = SESSIONS.pop(sid, None)
+    if not s:
+        return
+    s.worker.shutdown(wait=False, cancel_futures=True)
+    _release_browser(s)
+    try:
+        shutil.rmtree(s.root, ignore_errors=True)
+    except Exception:
+        pass
+
+def _release_browser(s: Session):
+    """Quit Chrome and hand its admission slot back (the session may live on over HTTP)."""
+    d, s.driver = s.driver, None
+    if d is not None:
+        try:
+            d.quit()
+        except Exception:
+            pass
+    if s.slot:
+        s.slot.release()
+        s.slot = None
+
+# ---------------------- Reaper ----------------------
+_SESSION_DIR_RE = re.compile(r"^[0-9a-f]{32}$")
+
+def _reap_once():
     now = time.time()
-    to_drop = [sid for sid, s in SESSIONS.items() if now - s.created_at > max_age_sec]
-    for sid in to_drop:
+    live = list(SESSIONS.values())
+
+    # 1) idle TTL (busy sessions are never touched)
+    for s in live:
+        if not s.busy and s.idle_for(now) > SESSION_IDLE_TTL_SEC:
+            _close_session(s.id)
+
+    # 2) memory pressure: give back warm pool drivers first, then the least recently used idle session
+    free = admission.available_memory_mb()
+    if free is not None and free < REAPER_LOW_MEM_MB:
+        if not POOL.drain(1):
+            idle = [s for s in SESSIONS.values() if not s.busy and s.idle_for(now) > REAPER_MIN_IDLE_SEC]
+            if idle:
+                _close_session(min(idle, key=lambda s: s.last_active).id)
+
+    # 3) session folders left behind by crashed / restarted processes
+    for p in SESSIONS_ROOT.iterdir():
+        if not p.is_dir() or not _SESSION_DIR_RE.match(p.name) or p.name in SESSIONS:
+            continue
         try:
-            SESSIONS[sid].driver.quit()
+            if now - p.stat().st_mtime > ORPHAN_GRACE_SEC:
+                shutil.rmtree(p, ignore_errors=True)
         except Exception:
             pass
+
+    # 4) content-addressed blobs no session links to anymore
+    STORE.gc(ORPHAN_GRACE_SEC)
+
+async def _reaper_loop():
+    while True:
+        await asyncio.sleep(REAPER_INTERVAL_SEC)
         try:
-            shutil.rmtree(SESSIONS[sid].root, ignore_errors=True)
+            await asyncio.to_thread(_reap_once)
         except Exception:
             pass
-        SESSIONS.pop(sid, None)
+
+def _client_id(request: Request) -> str:
+    # Behind Railway's proxy the peer is the proxy. Only the hops our own proxies appended
+    # are trustworthy (the client can send any X-Forwarded-For), so count from the right.
+    peer = request.client.host if request.client else "unknown"
+    hops = [h.strip() for h in request.headers.get("x-forwarded-for", "").split(",") if h.strip()]
+    if TRUSTED_PROXY_HOPS <= 0 or len(hops) < TRUSTED_PROXY_HOPS:
+        return peer
+    return hops[-TRUSTED_PROXY_HOPS]
+
+def _too_busy(e: admission.AdmissionRejected) -> HTTPException:
+    return HTTPException(status_code=429, detail=e.reason, headers={"Retry-After": str(e.retry_after)})
 
 # ---------------------- Chrome builder ----------------------
 def _make_driver() -> webdriver.Chrome:
@@ -88,11 +287,93 @@ def _make_driver() -> webdriver.Chrome:
     opts.add_argument("--disable-blink-features=AutomationControlled")
     # optional: quieter logs
     opts.add_argument("--log-level=3")
+    # CDP network events for event-driven login detection (network only, no page/timeline noise)
+    opts.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    opts.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
 
     driver = webdriver.Chrome(options=opts)
     driver.set_page_load_timeout(60)
     return driver
 
+def _open_login_page(d) -> tuple:
+    """Load VTOP login, pick the Student role and detect the captcha.
+       Returns (captcha_case, captcha_png_b64)."""
+    with _stage(None, "login_page"):
+        _use_resources(d, "full")  # the captcha is an image
+        d.get(Login.LOGIN_URL)
+        d.maximize_window()
+        _wait_ready(d)
+
+        # pick student role (same strategy as your login.py)
+        for how, sel in [
+            (By.XPATH, "//button[contains(., 'Student')]"),
+            (By.XPATH, "//a[contains(., 'Student')]"),
+            (By.CSS_SELECTOR, "button#student, a#student, button[data-role='student']"),
+        ]:
+            try:
+                WebDriverWait(d, 2).until(EC.element_to_be_clickable((how, sel))).click()
+                break
+            except Exception:
+                pass
+
+    # captcha kind + inline text-captcha image in one probe round trip
+    with _stage(None, "captcha_detect"):
+        p = Login.probe_page(d)
+    return p["captcha_case"], p["captcha_png_b64"]
+
+# ---------------------- Warm pool ----------------------
+def _make_warm_driver() -> driver_pool.WarmDriver:
+    with _stage(None, "driver_launch"):
+        d = _make_driver()
+    try:
+        cap, b64 = _open_login_page(d)
+    except Exception:
+        try: d.quit()
+        except Exception: pass
+        raise
+    return driver_pool.WarmDriver(d, cap, b64)
+
+def _make_pooled_driver() -> driver_pool.WarmDriver:
+    # pool refills are background work: never queue, never take the interactive reserve
+    slot = ADMISSION.acquire("background", timeout=0)
+    try:
+        w = _make_warm_driver()
+    except Exception:
+        slot.release()
+        raise
+    w.slot = slot
+    return w
+
+def _warm_driver_healthy(w: driver_pool.WarmDriver) -> bool:
+    """Browser still responds and is still parked on the login form."""
+    p = Login.probe_page(w.driver)
+    return p["ready_state"] == "complete" and "/login" in p["url"] and p["has_login_form"]
+
+ADMISSION = admission.AdmissionController(
+    max_drivers=MAX_DRIVERS, min_free_mem_mb=MIN_FREE_MEM_MB, per_client_max=PER_CLIENT_MAX,
+    interactive_reserve=INTERACTIVE_RESERVE, queue_timeout=ADMISSION_QUEUE_SEC,
+)
+
+POOL = driver_pool.DriverPool(
+    _make_pooled_driver, _warm_driver_healthy,
+    min_size=POOL_MIN_SIZE, max_size=POOL_MAX_SIZE, max_age_sec=POOL_MAX_AGE_SEC,
+)
+
+JOBS = jobs.JobStore(keep_sec=JOB_KEEP_SEC)
+
+tracing.setup(TRACE_FILE, TRACE_LEVEL)  # written by a listener thread, off the request threads
+
+metrics.bind(sessions=lambda: len(SESSIONS), pool_warm=POOL.size,
+             slots=lambda: ADMISSION.stats()["live"])
+
+STORE = asset_store.AssetStore(SESSIONS_ROOT)
+RESULTS = results_cache.ResultCache(SESSIONS_ROOT, fresh_sec=RESULT_FRESH_SEC, stale_sec=RESULT_STALE_SEC,
+                                    flight_timeout=RESULT_FLIGHT_WAIT_SEC)
+ENCODER = images.ImageEncoder(max_workers=IMAGE_WORKERS, formats=IMAGE_FORMATS)
+
+# /start blocks on admission + Chrome launch; keep that off the event loop and Starlette's pool
+LAUNCHER = ThreadPoolExecutor(max_workers=MAX_DRIVERS + 2, thread_name_prefix="launch")
+
 # ---------------------- small DOM helpers ----------------------
 def _wait_ready(driver, timeout=15):
     WebDriverWait(driver, timeout).until(
@@ -109,12 +390,13 @@ def _select_dropdown_by_text(driver, css: str, value_text: Optional[str]) -> boo
         for o in opts:
             t = (o.text or "").strip()
             if t == value_text or (value_text.lower() in t.lower()):
+                Login.track_network(driver)  # the change handler fires its request right away
                 o.click()
                 try:
                     driver.execute_script("arguments[0].dispatchEvent(new Event('change', {bubbles:true}));", el)
                 except Exception:
                     pass
-                time.sleep(0.6)
+                Login.wait_settled(driver, Login.SECTION_ROOT_CSS)
                 return True
     except Exception:
         pass
@@ -141,6 +423,18 @@ def _click_submit_login(driver):
 def _safe_relpath(p: Path) -> str:
     return str(p.relative_to(SESSIONS_ROOT))
 
+def _capture_page(kind: str, html_or_driver):
+    """VTOP_CAPTURE_DIR set: keep the page as <kind>_<time>.html for `vtop_parse parse/verify`."""
+    if not VTOP_CAPTURE_DIR:
+        return
+    try:
+        html = html_or_driver if isinstance(html_or_driver, str) else html_or_driver.page_source
+        os.makedirs(VTOP_CAPTURE_DIR, exist_ok=True)
+        name = f"{kind}_{time.strftime('%Y%m%d-%H%M%S')}_{uuid.uuid4().hex[:6]}.html"
+        Path(VTOP_CAPTURE_DIR, name).write_text(html, encoding="utf-8")
+    except Exception:
+        pass
+
 # ---------------------- Schemas ----------------------
 class StartOut(BaseModel):
     session_id: str
@@ -156,6 +450,9 @@ class RunIn(BaseModel):
     attendance_sem: Optional[str] = None
     calendar_sem: Optional[str] = None
     class_group: Optional[str] = None
+    fast_path: Optional[bool] = None     # None -> HTTP_FAST_PATH env default
+    parallel: Optional[bool] = None      # None -> PARALLEL_TABS env default
+    sections: Optional[List[Literal["timetable", "attendance", "calendar"]]] = None  # None -> all (/resync: changed ones)
 
 class AssetsOut(BaseModel):
     ok: bool
@@ -164,64 +461,100 @@ class AssetsOut(BaseModel):
     attendance_counts_json: Optional[str] = None
     calendar_pngs: List[str] = []
     registered_courses_json: Optional[str] = None
+    timetable_html: Optional[str] = None  # fast path: raw timetable fragment instead of a PNG
+    timetable_json: Optional[str] = None  # slot-by-day grid joined with registered courses
+    calendar_html: List[str] = []         # fast path: one month fragment per file
+    image_variants: Dict[str, Dict[str, str]] = {}  # png path -> {"webp": ..., "avif": ...}
+    calendar_json: Optional[str] = None   # [{date, type, description}] parsed from the month grids
+    calendar_ics: Optional[str] = None    # same events as an iCalendar feed
+    cached: bool = False                  # served from the results cache
+    cached_age_sec: Optional[float] = None
+    refresh_job_id: Optional[str] = None  # stale cache hit: background refresh to poll
     message: Optional[str] = None
 
-# ---------------------- Endpoints ----------------------
-@app.post("/start", response_model=StartOut)
-def start():
-    _cleanup_if_needed()
-    s = _new_session()
-    SESSIONS[s.id] = s
+class JobOut(BaseModel):
+    job_id: str
+    status: str
 
-    d = s.driver
-    d.get(Login.LOGIN_URL)
-    d.maximize_window()
-    _wait_ready(d)
+class StageOut(BaseModel):
+    status: str
+    started_at: float
+    seconds: Optional[float] = None
 
-    # pick student role (same strategy as your login.py)
-    for how, sel in [
-        (By.XPATH, "//button[contains(., 'Student')]"),
-        (By.XPATH, "//a[contains(., 'Student')]"),
-        (By.CSS_SELECTOR, "button#student, a#student, button[data-role='student']"),
-    ]:
-        try:
-            WebDriverWait(d, 2).until(EC.element_to_be_clickable((how, sel))).click()
-            break
-        except Exception:
-            pass
+class JobStatusOut(BaseModel):
+    job_id: str
+    kind: str
+    session_id: str
+    status: str                       # queued | running | done | failed
+    stage: Optional[str] = None       # current / last stage
+    stages: Dict[str, StageOut] = {}  # login, timetable, registered_courses, attendance, calendar
+    partial: Dict[str, Any] = {}      # AssetsOut fields finished so far
+    result: Optional[AssetsOut] = None
+    error: Optional[str] = None
+    created_at: float
+    finished_at: Optional[float] = None
 
-    cap = Login.detect_captcha_case(d)
-    b64 = None
-    if cap == "text":
-        try:
-            img = d.find_element(By.CSS_SELECTOR, "img[src^='data:image']")
-            src = img.get_attribute("src") or ""
-            if "," in src:
-                b64 = src.split(",", 1)[1]
-        except Exception:
-            pass
+# ---------------------- Endpoints ----------------------
+def _claim_or_launch(client: str) -> driver_pool.WarmDriver:
+    try:
+        ADMISSION.check_client(client)
+        # Claim a pre-launched driver already on the login page (it already holds a slot);
+        # cold-start on a miss once the admission queue lets us in
+        w = POOL.claim()
+        if w:
+            ADMISSION.assign(w.slot, "interactive", client)
+        else:
+            slot = ADMISSION.acquire("interactive", client)
+            try:
+                w = _make_warm_driver()
+            except Exception:
+                slot.release()
+                raise
+            w.slot = slot
+    except admission.AdmissionRejected as e:
+        raise _too_busy(e)
+    return w
+
+@app.post("/start", response_model=StartOut)
+async def start(request: Request):
+    client = _client_id(request)
+    w = await asyncio.get_running_loop().run_in_executor(LAUNCHER, _claim_or_launch, client)
+    s = _new_session(w.driver, w.slot)
+    SESSIONS[s.id] = s
 
     # NOTE on 3x3/recaptcha: we cannot “click images” from your frontend.
     # We simply report 'image'/'recaptcha'. The UI should ask user to retry later
     # or continue when VTOP shows a text/no captcha.
-    return StartOut(session_id=s.id, captcha_case=cap, captcha_png_b64=b64)
+    return StartOut(session_id=s.id, captcha_case=w.captcha_case, captcha_png_b64=w.captcha_png_b64)
 
-def _do_login_and_assets(
-    s: Session,
-    username: str,
-    password: str,
-    captcha_text: Optional[str],
-    timetable_sem: Optional[str],
-    attendance_sem: Optional[str],
-    calendar_sem: Optional[str],
-    class_group: Optional[str]
-) -> AssetsOut:
-    d = s.driver
-    root = s.root
-    (root / "data").mkdir(exist_ok=True, parents=True)
-    (root / "academic_calendar").mkdir(exist_ok=True, parents=True)
+# ---------------------- Pipeline ----------------------
+@contextmanager
+def _stage(progress, name: str):
+    """Mark one pipeline stage on `progress` (a jobs.Job, or None for plain requests)
+       and record its duration in metrics. The body may set st["ok"] = False to record
+       a handled failure."""
+    st = {"ok": True}
+    t0 = time.perf_counter()
+    if progress:
+        progress.begin_stage(name)
+    try:
+        yield st
+    except Exception:
+        st["ok"] = False
+        raise
+    finally:
+        seconds = time.perf_counter() - t0
+        metrics.observe_stage(name, seconds, st["ok"])
+        tracing.event("stage", stage=name, duration_ms=round(seconds * 1000, 1), ok=st["ok"])
+        if progress:
+            progress.end_stage(name, ok=st["ok"])
+
+def _publish(progress, **fields):
+    if progress:
+        progress.update(**fields)
 
-    # ---- fill credentials ----
+def _login(d, username: str, password: str, captcha_text: Optional[str]) -> Optional[str]:
+    """Fill the form, submit and wait for the outcome. Returns an error message, or None on success."""
     Login.fill_credentials(d, username, password)
     if captcha_text:
         try:
@@ -231,20 +564,50 @@ def _do_login_and_assets(
         except Exception:
             pass
 
+    Login.drain_performance_log(d)  # only events caused by our submit matter
     _click_submit_login(d)
 
-    # wait for outcome
-    end = time.time() + 60
-    while time.time() < end:
+    with _stage(None, "login_wait") as st:
+        err = _wait_login_outcome(d)
+        st["ok"] = err is None
+    if err:
+        metrics.LOGIN_FAILURES.labels(err).inc()
+    return err
+
+def _wait_login_outcome(d) -> Optional[str]:
+    # react to the login POST / redirect as soon as it arrives
+    outcome = Login.wait_login_network_outcome(d, timeout=60)
+    if outcome == "success":
+        return None
+    if outcome is not None:
+        # back on the login page (or XHR answered): the reason is in the DOM, settle it in a few checks
+        try:
+            _wait_ready(d, 10)
+        except Exception:
+            pass
+        budget = 5
+    else:
+        budget = 60  # no network events available: poll the page like before
+
+    # wait for outcome (one probe round trip per check)
+    end = time.time() + budget
+    while True:
+        try:
+            p = Login.probe_page(d)
+        except Exception:
+            p = None  # mid-navigation; retry
+        if p:
+            if p["login_success"]:
+                return None
+            if p["wrong_password"]:
+                return "Invalid username or password"
+            if p["wrong_captcha"]:
+                return "Invalid captcha"
+        if time.time() >= end:
+            return "Login not confirmed"
         time.sleep(0.5)
-        if Login.login_success(d): break
-        if Login.page_says_wrong_password(d):
-            return AssetsOut(ok=False, session_id=s.id, message="Invalid username or password")
-        if Login.page_says_wrong_captcha(d):
-            return AssetsOut(ok=False, session_id=s.id, message="Invalid captcha")
-    if not Login.login_success(d):
-        return AssetsOut(ok=False, session_id=s.id, message="Login not confirmed")
 
+def _save_session_cookies(d, root: Path, username: str):
     # save session cookies (then copy into this session folder)
     try:
         Login.save_cookies(d, username)
@@ -258,23 +621,39 @@ def _do_login_and_assets(
     except Exception:
         pass
 
-    # -------- TIMETABLE ----------
-    Login.navigate_to_timetable(d)
+def _goto_section(d, name: str) -> str:
+    return Login.goto_section(d, name, in_place=IN_PLACE_NAV, timeout=IN_PLACE_NAV_TIMEOUT)
+
+def _timetable_step(d, root: Path, timetable_sem: Optional[str], navigate: bool = True) -> Optional[Path]:
+    if navigate:
+        _goto_section(d, "timetable")
     if timetable_sem:
         _select_dropdown_by_text(d, "select#semesterSubId", timetable_sem)
-        time.sleep(0.6)
+    _capture_page("timetable", d)
+    grid_file = root / "data" / "timetable_grid.html"
+    grid_file.unlink(missing_ok=True)  # never parse last run's grid
+    grid_html = Login.timetable_grid_html(d)
+    if grid_html:
+        grid_file.write_text(grid_html, encoding="utf-8")
+        # only skip the PNG when timetable.json will have something to show
+        if not TIMETABLE_PNG and vtop_parse.timetable_grid_from_html(grid_html)["classes"]:
+            return None
     timetable_png_path = root / "timetable.png"
     Login._screenshot_timetable(d, out_png=str(timetable_png_path))
+    return timetable_png_path if timetable_png_path.exists() else None
 
+def _registered_courses_step(d, root: Path) -> Optional[Path]:
     # Registered courses (to populate Course Code field in UI)
     reg_json_path = root / "registered_courses.json"
     try:
         Login.parse_registered_courses_dom(d, out_path=str(reg_json_path))
     except Exception:
         pass
+    return reg_json_path if reg_json_path.exists() else None
 
-    # -------- ATTENDANCE ----------
-    Login.navigate_to_attendance(d)
+def _attendance_step(d, root: Path, attendance_sem: Optional[str], navigate: bool = True) -> Path:
+    if navigate:
+        _goto_section(d, "attendance")
     if attendance_sem:
         _select_dropdown_by_text(d, "select#semesterSubId", attendance_sem)
         # trigger search if a button exists
@@ -284,92 +663,566 @@ def _do_login_and_assets(
         ]:
             try:
                 WebDriverWait(d, 2).until(EC.element_to_be_clickable((how, sel))).click()
-                time.sleep(0.6)
+                Login.wait_settled(d, Login.SECTION_ROOT_CSS)
                 break
             except Exception:
                 continue
 
+    _capture_page("attendance", d)
     att_counts_path = root / "attendance_counts.json"
-    payload = Login.scrape_attendance(
+    Login.scrape_attendance(
         d, only_counts=True, write_json=True,
         counts_out_path=str(att_counts_path)
     )
+    return att_counts_path
 
-    # -------- ACADEMIC CALENDAR ----------
-    Login.navigate_to_academic_calendar(d)
+def _calendar_step(d, root: Path, calendar_sem: Optional[str], class_group: Optional[str],
+                   navigate: bool = True) -> List[str]:
+    if navigate:
+        _goto_section(d, "calendar")
     if calendar_sem:
         _select_dropdown_by_text(d, "select#semesterSubId", calendar_sem)
     if class_group:
         _select_dropdown_by_text(d, "select#classGroupId", class_group)
 
+    _capture_page("calendar", d)
     cal_dir = root / "academic_calendar"
-    Login.screenshot_academic_calendar_months(d, out_dir=str(cal_dir))
+    Login.screenshot_academic_calendar_months(d, out_dir=str(cal_dir), mode=CALENDAR_CAPTURE)
 
     # collect calendar images
     cal_pngs = sorted([p for p in cal_dir.glob("*.png")])
-    cal_rel = [ _safe_relpath(p) for p in cal_pngs ]
+    return [ _safe_relpath(p) for p in cal_pngs ]
+
+# ---- HTTP fast path steps (raise VtopHttpError -> caller falls back to Chrome) ----
+def _write_json(path: Path, payload):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False)
+
+def _timetable_http(http: vtop_http.VtopHttp, root: Path, timetable_sem: Optional[str]) -> Path:
+    p = root / "timetable.html"
+    html = http.timetable(timetable_sem)
+    _capture_page("timetable", html)
+    p.write_text(html, encoding="utf-8")
+    return p
+
+def _registered_courses_from_html(root: Path, html_path: Path) -> Optional[Path]:
+    rows = vtop_parse.registered_courses_from_html(html_path.read_text(encoding="utf-8"))
+    if not rows:
+        return None
+    reg_json_path = root / "registered_courses.json"
+    _write_json(reg_json_path, rows)
+    return reg_json_path
 
-    return AssetsOut(
+def _attendance_http(http: vtop_http.VtopHttp, root: Path, attendance_sem: Optional[str]) -> Path:
+    html = http.attendance(attendance_sem)
+    _capture_page("attendance", html)
+    payload = vtop_parse.attendance_from_html(html, only_counts=True)
+    att_counts_path = root / "attendance_counts.json"
+    _write_json(att_counts_path, payload)
+    return att_counts_path
+
+def _calendar_http(http: vtop_http.VtopHttp, root: Path, calendar_sem: Optional[str], class_group: Optional[str]) -> List[str]:
+    months = http.calendar(calendar_sem, class_group)
+    cal_dir = root / "academic_calendar"
+    shutil.rmtree(cal_dir, ignore_errors=True)
+    cal_dir.mkdir(parents=True, exist_ok=True)
+    out = []
+    for idx, (cal_date, html) in enumerate(months, 1):
+        p = cal_dir / f"{idx:02d}_{re.sub(r'[^A-Za-z0-9-]+', '_', cal_date)}.html"
+        p.write_text(html, encoding="utf-8")
+        out.append(_safe_relpath(p))
+    return out
+
+def _encode_images(pending: List[Future]) -> Dict[str, Dict[str, str]]:
+    """Collect ENCODER results as {png relpath: {format: relpath}}; a failed encode keeps the raw PNG."""
+    variants = {}
+    for fut in pending:
+        try:
+            out = fut.result(timeout=IMAGE_ENCODE_TIMEOUT)
+        except Exception:
+            continue
+        png = _safe_relpath(Path(out.pop("png")))
+        variants[png] = {fmt: _safe_relpath(Path(p)) for fmt, p in out.items()}
+    return variants
+
+def _store_assets(out: "AssetsOut"):
+    """Dedupe this run's artifacts into STORE (identical resync output costs no extra disk)."""
+    rels = [out.timetable_png, out.attendance_counts_json, out.registered_courses_json, out.timetable_html,
+            out.timetable_json, out.calendar_json, out.calendar_ics]
+    rels += out.calendar_pngs + out.calendar_html
+    rels += [p for v in out.image_variants.values() for p in v.values()]
+    for rel in rels:
+        if rel:
+            STORE.put(SESSIONS_ROOT / rel)
+
+def _timetable_grid(root: Path, html_path: Optional[Path], reg_json_path: Optional[Path]) -> Optional[Path]:
+    """timetable.json from the timetable fragment (HTTP) or the saved #timeTableStyle (browser)."""
+    src = html_path or (root / "data" / "timetable_grid.html")
+    if not src.exists():
+        return None
+    registered = json.loads(reg_json_path.read_text(encoding="utf-8")) if reg_json_path else []
+    grid = vtop_parse.timetable_grid_from_html(src.read_text(encoding="utf-8"), registered)
+    if not grid["classes"]:
+        return None
+    out = root / "timetable.json"
+    out.write_text(json.dumps(grid, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    return out
+
+def _calendar_events(root: Path) -> tuple:
+    """Parse every saved month grid (browser or HTTP) into calendar.json + calendar.ics.
+       Returns (json_path, ics_path), both None when no events were found."""
+    events = []
+    for p in sorted((root / "academic_calendar").glob("*.html")):
+        events += vtop_parse.calendar_events_from_html(p.read_text(encoding="utf-8"), month_label=p.stem)
+    if not events:
+        return None, None
+    events.sort(key=lambda e: e["date"])
+    json_path, ics_path = root / "calendar.json", root / "calendar.ics"
+    json_path.write_text(json.dumps(events, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    ics_path.write_text(vtop_parse.events_to_ics(events), encoding="utf-8", newline="")
+    return json_path, ics_path
+
+def _need_browser(s: Session, e: Exception):
+    """HTTP step failed: fall back to Chrome if we still have one."""
+    if s.driver is None:
+        raise HTTPException(status_code=410, detail=f"VTOP session expired ({e}); please /start again")
+
+@contextmanager
+def _section_tabs(d, enabled: bool, names: List[str], progress=None):
+    """Parallel mode: one tab per section, all loading at once. Yields None when disabled."""
+    if not enabled or d is None or len(names) < 2:
+        yield None
+        return
+    main = d.current_window_handle
+    with _stage(progress, "open_tabs"):
+        handles, ready = Login.open_section_tabs(d, names)
+    try:
+        yield {"handles": handles, "ready": ready}
+    finally:
+        Login.close_section_tabs(d, handles, main)
+
+def _use_resources(d, policy: str):
+    """Per-stage resource policy ('lean' for table-only pages, 'screenshot' before captures)."""
+    if RESOURCE_BLOCKING and d is not None:
+        Login.set_resource_policy(d, policy)
+
+def _enter_tab(d, tabs: Optional[dict], name: str) -> bool:
+    """Switch to the section's tab (parallel mode). Returns True if it still needs a full navigation."""
+    if not tabs or name not in tabs["handles"]:
+        return True
+    d.switch_to.window(tabs["handles"][name])
+    return name not in tabs["ready"]
+
+# ---- sections: what a (re)sync needs to touch ----
+SECTIONS = ("timetable", "attendance", "calendar")
+_SECTION_FIELDS = {
+    "timetable": ("timetable_png", "timetable_html", "registered_courses_json", "timetable_json"),
+    "attendance": ("attendance_counts_json",),
+    "calendar": ("calendar_pngs", "calendar_html", "calendar_json", "calendar_ics"),
+}
+
+def _selection(timetable_sem, attendance_sem, calendar_sem, class_group) -> Dict[str, tuple]:
+    """What each section's output depends on besides the student."""
+    return {"timetable": (timetable_sem,), "attendance": (attendance_sem,),
+            "calendar": (calendar_sem, class_group)}
+
+def _sections_to_run(s: Session, sel: Dict[str, tuple], sections: Optional[List[str]], resync: bool) -> List[str]:
+    """Explicit `sections` win; a resync otherwise re-runs only sections whose selection changed."""
+    if sections:
+        return [x for x in SECTIONS if x in sections]
+    if not resync or s.last_assets is None:
+        return list(SECTIONS)
+    return [x for x in SECTIONS if s.last_selection.get(x) != sel[x]]
+
+def _merge_previous(s: Session, out: AssetsOut, ran: List[str]) -> AssetsOut:
+    """Carry the last run's fields over for sections this run skipped."""
+    prev = s.last_assets
+    if prev is None:
+        return out
+    for sec in SECTIONS:
+        if sec not in ran:
+            for f in _SECTION_FIELDS[sec]:
+                setattr(out, f, getattr(prev, f))
+    pngs = {out.timetable_png, *out.calendar_pngs}
+    out.image_variants = {**{p: v for p, v in prev.image_variants.items() if p in pngs}, **out.image_variants}
+    return out
+
+def _remember_run(s: Session, sel: Dict[str, tuple], out: AssetsOut, ran=SECTIONS):
+    s.last_selection.update({x: sel[x] for x in ran})
+    s.last_assets = out
+
+def _do_login_and_assets(
+    s: Session,
+    username: str,
+    password: str,
+    captcha_text: Optional[str],
+    timetable_sem: Optional[str],
+    attendance_sem: Optional[str],
+    calendar_sem: Optional[str],
+    class_group: Optional[str],
+    fast_path: Optional[bool] = None,
+    parallel: Optional[bool] = None,
+    sections: Optional[List[str]] = None,
+    resync: bool = False,
+    progress=None
+) -> AssetsOut:
+    """Full pipeline. `progress` (a jobs.Job) receives stage timings and partial fields.
+       With fast_path, Chrome is only used to log in; sections come over HTTP when possible.
+       With parallel, browser sections load side by side in their own tabs.
+       An authenticated session skips the login; `sections` / `resync` limit which sections
+       run, and the rest of the result is carried over from the session's last run."""
+    sel = _selection(timetable_sem, attendance_sem, calendar_sem, class_group)
+    todo = _sections_to_run(s, sel, sections, resync)
+    if not todo:  # nothing changed since the last run: no page to load
+        return s.last_assets.model_copy(update={"refresh_job_id": None})
+    if resync and not s.logged_in:
+        if s.cache_only:  # its login page (and captcha) has gone stale meanwhile
+            return AssetsOut(ok=False, session_id=s.id, message=(
+                "This session was served from the results cache and never signed in to VTOP; "
+                "call /start for a fresh captcha, then /run with the new selection"))
+        return AssetsOut(ok=False, session_id=s.id, message="Session is not logged in yet; call /run first")
+    d = s.driver
+    root = s.root
+    fast = HTTP_FAST_PATH if fast_path is None else fast_path
+    parallel = PARALLEL_TABS if parallel is None else parallel
+    (root / "data").mkdir(exist_ok=True, parents=True)
+    (root / "academic_calendar").mkdir(exist_ok=True, parents=True)
+    STORE.unshare(root)  # last run's files may be shared blobs; steps rewrite them in place
+
+    # ---- login ----
+    if d is not None and not s.logged_in:  # no browser left = logged in, running over HTTP only
+        with _stage(progress, "login") as st:
+            err = _login(d, username, password, captcha_text)
+            if err:
+                st["ok"] = False
+                return AssetsOut(ok=False, session_id=s.id, message=err)
+            _save_session_cookies(d, root, username)
+            if username:
+                s.regno = username
+            s.logged_in = True
+            s.cache_only = False
+    if fast and s.http is None and d is not None:
+        s.http = vtop_http.VtopHttp.from_driver(d, Login.ROOT, regno=s.regno or "")
+    http = s.http if (fast or d is None) else None
+    all_http = http is not None
+
+    timetable_png_path = timetable_html_path = reg_json_path = grid_path = None
+    att_counts_path = cal_json = cal_ics = None
+    encoding: List[Future] = []  # screenshots re-encode while the browser moves on
+    cal_rel, cal_html = None, []
+    with _section_tabs(d, parallel and http is None, todo, progress) as tabs:
+        # -------- TIMETABLE ----------
+        if "timetable" in todo:
+            with _stage(progress, "timetable"):
+                if http:
+                    try:
+                        timetable_html_path = _timetable_http(http, root, timetable_sem)
+                    except vtop_http.VtopHttpError as e:
+                        _need_browser(s, e)
+                        all_http = False
+                if timetable_html_path is None:
+                    nav = _enter_tab(d, tabs, "timetable")
+                    if nav:  # a tab that already loaded keeps whatever it fetched
+                        # screenshotted unless TIMETABLE_PNG=0 (then a PNG is only the fallback
+                        # when the grid has no classes, drawn without web fonts)
+                        _use_resources(d, "screenshot" if TIMETABLE_PNG else "lean")
+                    timetable_png_path = _timetable_step(d, root, timetable_sem, navigate=nav)
+                    if timetable_png_path:
+                        encoding.append(ENCODER.submit(str(timetable_png_path)))
+                _publish(progress,
+                         timetable_png=_safe_relpath(timetable_png_path) if timetable_png_path else None,
+                         timetable_html=_safe_relpath(timetable_html_path) if timetable_html_path else None)
+
+            with _stage(progress, "registered_courses"):
+                if timetable_html_path:
+                    reg_json_path = _registered_courses_from_html(root, timetable_html_path)
+                else:
+                    reg_json_path = _registered_courses_step(d, root)
+                _publish(progress, registered_courses_json=_safe_relpath(reg_json_path) if reg_json_path else None)
+
+            with _stage(progress, "timetable_grid"):
+                grid_path = _timetable_grid(root, timetable_html_path, reg_json_path)
+                _publish(progress, timetable_json=_safe_relpath(grid_path) if grid_path else None)
+
+        # -------- ATTENDANCE ----------
+        if "attendance" in todo:
+            with _stage(progress, "attendance"):
+                if http:
+                    try:
+                        att_counts_path = _attendance_http(http, root, attendance_sem)
+                    except vtop_http.VtopHttpError as e:
+                        _need_browser(s, e)
+                        all_http = False
+                if att_counts_path is None:
+                    nav = _enter_tab(d, tabs, "attendance")
+                    if nav:
+                        _use_resources(d, "lean")  # table only
+                    att_counts_path = _attendance_step(d, root, attendance_sem, navigate=nav)
+                _publish(progress, attendance_counts_json=_safe_relpath(att_counts_path))
+
+        # -------- ACADEMIC CALENDAR ----------
+        if "calendar" in todo:
+            with _stage(progress, "calendar"):
+                if http:
+                    try:
+                        cal_html = _calendar_http(http, root, calendar_sem, class_group)
+                        cal_rel = []
+                    except vtop_http.VtopHttpError as e:
+                        _need_browser(s, e)
+                        all_http = False
+                if cal_rel is None:
+                    nav = _enter_tab(d, tabs, "calendar")
+                    if nav:
+                        _use_resources(d, "screenshot")  # month screenshots
+                    cal_rel = _calendar_step(d, root, calendar_sem, class_group, navigate=nav)
+                    encoding += [ENCODER.submit(str(SESSIONS_ROOT / p)) for p in cal_rel]
+                cal_json, cal_ics = _calendar_events(root)
+                _publish(progress, calendar_pngs=cal_rel, calendar_html=cal_html,
+                         calendar_json=_safe_relpath(cal_json) if cal_json else None,
+                         calendar_ics=_safe_relpath(cal_ics) if cal_ics else None)
+
+    variants = {}
+    if encoding:
+        with _stage(progress, "encode_images"):
+            variants = _encode_images(encoding)
+            _publish(progress, image_variants=variants)
+
+    if all_http and HTTP_FAST_PATH_RELEASE_BROWSER:
+        _release_browser(s)
+    elif s.driver is not None:
+        Login.drain_performance_log(s.driver)  # scraping produced events nobody reads
+
+    out = AssetsOut(
         ok=True,
         session_id=s.id,
-        timetable_png=_safe_relpath(timetable_png_path),
-        attendance_counts_json=_safe_relpath(att_counts_path),
-        calendar_pngs=cal_rel,
-        registered_courses_json=_safe_relpath(reg_json_path) if reg_json_path.exists() else None
+        timetable_png=_safe_relpath(timetable_png_path) if timetable_png_path else None,
+        timetable_html=_safe_relpath(timetable_html_path) if timetable_html_path else None,
+        attendance_counts_json=_safe_relpath(att_counts_path) if att_counts_path else None,
+        calendar_pngs=cal_rel or [],
+        calendar_html=cal_html,
+        registered_courses_json=_safe_relpath(reg_json_path) if reg_json_path else None,
+        image_variants=variants,
+        timetable_json=_safe_relpath(grid_path) if grid_path else None,
+        calendar_json=_safe_relpath(cal_json) if cal_json else None,
+        calendar_ics=_safe_relpath(cal_ics) if cal_ics else None,
     )
+    out = _merge_previous(s, out, todo)
+    _store_assets(out)
+    _remember_run(s, sel, out, todo)
+    return out
+
+# ---- results cache (stale-while-revalidate + single-flight around the pipeline) ----
+_ASSET_PATH_FIELDS = ("timetable_png", "timetable_html", "timetable_json", "attendance_counts_json",
+                      "registered_courses_json", "calendar_json", "calendar_ics")
+_ASSET_LIST_FIELDS = ("calendar_pngs", "calendar_html")
+
+def _results_key(s: Session, args: dict) -> results_cache.Key:
+    # a logged-in session skips the login, so its results are always the session's student
+    regno = s.regno if s.logged_in else (args.get("username") or s.regno)
+    return results_cache.make_key(regno or "", args["timetable_sem"],
+                                  args["attendance_sem"], args["calendar_sem"], args["class_group"])
+
+def _cache_result(s: Session, key, out: AssetsOut, password: Optional[str]):
+    """Snapshot a successful run's files + paths (relative to the session dir) into RESULTS."""
+    prefix = s.id + "/"
+    rel = lambda p: p[len(prefix):] if p and p.startswith(prefix) else p
+    assets = {f: rel(getattr(out, f)) for f in _ASSET_PATH_FIELDS}
+    assets.update({f: [rel(p) for p in getattr(out, f)] for f in _ASSET_LIST_FIELDS})
+    assets["image_variants"] = {rel(png): {k: rel(v) for k, v in vs.items()} for png, vs in out.image_variants.items()}
+    files = [p for f in _ASSET_PATH_FIELDS if (p := assets[f])]
+    files += [p for f in _ASSET_LIST_FIELDS for p in assets[f]]
+    files += [p for vs in assets["image_variants"].values() for p in vs.values()]
+    return RESULTS.put(key, s.root, files, assets, password)
+
+def _from_cache(s: Session, entry: results_cache.ResultEntry) -> AssetsOut:
+    RESULTS.materialize(entry, s.root)
+    prefix = s.id + "/"
+    a = entry.assets
+    fields = {f: (prefix + a[f]) if a[f] else None for f in _ASSET_PATH_FIELDS}
+    fields.update({f: [prefix + p for p in a[f]] for f in _ASSET_LIST_FIELDS})
+    fields["image_variants"] = {prefix + png: {k: prefix + v for k, v in vs.items()}
+                                for png, vs in a["image_variants"].items()}
+    return AssetsOut(ok=True, session_id=s.id, cached=True, cached_age_sec=round(entry.age(), 1), **fields)
+
+def _args_selection(args: dict) -> Dict[str, tuple]:
+    return _selection(args["timetable_sem"], args["attendance_sem"], args["calendar_sem"], args["class_group"])
+
+def _run_and_cache(s: Session, key, args: dict, progress=None, flight: Optional[Future] = None) -> AssetsOut:
+    """Run the pipeline and cache its result. As leader of `flight`, wake anyone waiting on it."""
+    entry = None
+    verified = not s.logged_in  # only a password this run logged in with may guard the entry
+    try:
+        out = _do_login_and_assets(s, progress=progress, **args)
+        # a partial run only caches once every section matches the requested selection
+        if out.ok and s.last_selection == _args_selection(args):
+            entry = _cache_result(s, key, out, args.get("password") if verified and s.logged_in else None)
+        return out
+    finally:
+        if flight is not None:
+            RESULTS.land(key, flight, entry)
+
+def _refresh_in_background(s: Session, key, args: dict) -> Optional[str]:
+    """Stale hit: re-run on this session's worker unless the same refresh is already in flight.
+       The session's browser is accounted to the background admission lane meanwhile."""
+    fut, leader = RESULTS.flight(key)
+    if not leader:
+        return None
+
+    def refresh(job):
+        slot = s.slot
+        if slot:
+            ADMISSION.assign(slot, "background", slot.client)
+        try:
+            return _run_and_cache(s, key, dict(args, sections=list(SECTIONS)), progress=job, flight=fut).model_dump()
+        finally:
+            if slot:
+                ADMISSION.assign(slot, "interactive", slot.client)
+
+    job = JOBS.submit("refresh", s.id, refresh, runner=s.submit)
+    if job.finished:  # could not even be queued (session closed)
+        RESULTS.land(key, fut, None)
+    return job.id
+
+def _assets(s: Session, args: dict, progress=None) -> AssetsOut:
+    """_do_login_and_assets behind the results cache (runs on the session's worker).
+       A /run may read an entry only with the password it was stored with; a session that
+       already authenticated as that regno may read it directly."""
+    regno = args.get("username") or s.regno
+    if s.regno and args.get("username") and results_cache.make_key(args["username"]) != results_cache.make_key(s.regno):
+        return AssetsOut(ok=False, session_id=s.id,
+                         message="This session belongs to another student; call /start for a new one")
+    if not RESULTS.enabled or not regno:
+        return _do_login_and_assets(s, progress=progress, **args)
+    key = _results_key(s, args)
+    if args.get("sections"):  # explicitly asked to re-scrape these: don't answer from the cache
+        return _run_and_cache(s, key, args, progress)
+    authed = bool(s.regno) and results_cache.make_key(s.regno)[0] == key[0]
+    usable = lambda e: e is not None and (authed or e.check_password(args.get("password")))
+
+    entry, state = RESULTS.get(key)
+    if usable(entry):
+        s.regno = s.regno or regno
+        s.cache_only = not s.logged_in
+        out = _from_cache(s, entry)
+        _remember_run(s, _args_selection(args), out)
+        can_refresh = s.logged_in or (s.driver is not None and args.get("password"))
+        if state == "stale" and can_refresh:
+            out.refresh_job_id = _refresh_in_background(s, key, args)
+        _publish(progress, **out.model_dump(exclude={"ok", "session_id"}))
+        return out
+
+    # miss: collapse identical concurrent runs into one browser run
+    fut, leader = RESULTS.flight(key)
+    if leader:
+        return _run_and_cache(s, key, args, progress, flight=fut)
+    try:
+        entry = fut.result(timeout=RESULT_FLIGHT_WAIT_SEC)
+    except Exception:
+        entry = None
+    if usable(entry):
+        s.regno = s.regno or regno
+        s.cache_only = not s.logged_in
+        out = _from_cache(s, entry)
+        _remember_run(s, _args_selection(args), out)
+        return out
+    return _run_and_cache(s, key, args, progress)
+
+def _run_args(body: RunIn) -> dict:
+    return dict(
+        username=body.username, password=body.password, captcha_text=body.captcha_text,
+        timetable_sem=body.timetable_sem, attendance_sem=body.attendance_sem,
+        calendar_sem=body.calendar_sem, class_group=body.class_group,
+        fast_path=body.fast_path, parallel=body.parallel, sections=body.sections,
+    )
+
+def _resync_args(body: RunIn) -> dict:
+    args = _run_args(body)
+    args.update(username="", password="", captcha_text=None, resync=True)  # ignored after login
+    return args
 
 @app.post("/run", response_model=AssetsOut)
-def run(body: RunIn):
+async def run(body: RunIn):
     s = _get_session(body.session_id)
-    return _do_login_and_assets(
-        s,
-        body.username, body.password, body.captcha_text,
-        body.timetable_sem, body.attendance_sem, body.calendar_sem, body.class_group
-    )
+    return await s.call(_assets, s, _run_args(body))
 
 @app.post("/resync", response_model=AssetsOut)
-def resync(body: RunIn):
+async def resync(body: RunIn):
     """Re-run navigations/screenshots using an already logged-in session.
        Username/password are ignored here; only semester/class group picks are used.
+       Only sections whose picks changed since the last run are re-scraped (or exactly
+       `sections`, if given); the others come back unchanged from the last result.
     """
     s = _get_session(body.session_id)
-    return _do_login_and_assets(
-        s,
-        username="", password="", captcha_text=None,  # ignored after login
-        timetable_sem=body.timetable_sem,
-        attendance_sem=body.attendance_sem,
-        calendar_sem=body.calendar_sem,
-        class_group=body.class_group
+    return await s.call(_assets, s, _resync_args(body))
+
+# ---------------------- Jobs (async mode) ----------------------
+def _submit_job(kind: str, s: Session, args: dict) -> JobOut:
+    # a stale-hit refresh is ours, not the user's: their job just queues behind it on s.submit
+    if any(j.kind != "refresh" for j in JOBS.active_for(s.id)):
+        raise HTTPException(status_code=409, detail="A job is already running for this session")
+    job = JOBS.submit(
+        kind, s.id,
+        lambda job: _assets(s, args, progress=job).model_dump(),
+        runner=s.submit,  # runs on the session's own worker, queued behind any /run
     )
+    return JobOut(job_id=job.id, status=job.status)
+
+@app.post("/jobs/run", response_model=JobOut, status_code=202)
+async def run_job(body: RunIn):
+    """Same as /run, but returns a job id immediately; poll GET /jobs/{job_id}."""
+    s = _get_session(body.session_id)
+    return _submit_job("run", s, _run_args(body))
+
+@app.post("/jobs/resync", response_model=JobOut, status_code=202)
+async def resync_job(body: RunIn):
+    s = _get_session(body.session_id)
+    return _submit_job("resync", s, _resync_args(body))
+
+@app.get("/jobs/{job_id}", response_model=JobStatusOut)
+async def job_status(job_id: str):
+    job = JOBS.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Unknown or expired job_id")
+    return job.snapshot()
 
 @app.get("/file")
-def file(path: str = Query(..., description="Relative path under sessions/")):
+async def file(request: Request, path: str = Query(..., description="Relative path under sessions/")):
     # prevent path traversal
     target = (SESSIONS_ROOT / path).resolve()
-    if not str(target).startswith(str(SESSIONS_ROOT.resolve())) or not target.exists():
+    if not str(target).startswith(str(SESSIONS_ROOT.resolve())) or not target.is_file():
         raise HTTPException(status_code=404, detail="File not found")
-    # Disable caching on images/JSON
-    resp = FileResponse(target)
-    resp.headers["Cache-Control"] = "no-store"
-    return resp
+    # Same path can hold new content after a resync: always revalidate, but by ETag
+    # (each content-coding has its own strong ETag; a cached copy in any coding is still current)
+    enc = await asyncio.to_thread(STORE.encoded, target, request.headers.get("accept-encoding", ""))
+    etag = await asyncio.to_thread(STORE.etag, target, enc[1] if enc else None)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Accept-Encoding"}
+    inm = request.headers.get("if-none-match", "")
+    if inm:
+        matched = await asyncio.to_thread(STORE.etag_match, target, inm)
+        if matched:
+            if matched != "*":
+                headers["ETag"] = matched
+            return Response(status_code=304, headers=headers)
+    if enc:
+        body, encoding = enc
+        headers["Content-Encoding"] = encoding
+        return FileResponse(body, headers=headers, media_type=mimetypes.guess_type(target.name)[0])
+    return FileResponse(target, headers=headers)
 
 @app.get("/courses")
-def courses(session_id: str, semester: Optional[str] = None):
+async def courses(session_id: str, semester: Optional[str] = None):
     s = _get_session(session_id)
     reg = s.root / "registered_courses.json"
     if not reg.exists():
         return {"courses": []}
-    import json
     rows = json.loads(reg.read_text(encoding="utf-8"))
-    # Try to extract codes robustly
-    codes = set()
-    for r in rows:
-        # typical keys vary; scan all values
-        vals = " ".join([str(v) for v in r.values() if v]).upper()
-        for m in re.finditer(r"[A-Z]{2,4}\d{3}[A-Z]?", vals):
-            codes.add(m.group(0))
-    return {"courses": sorted(codes)}
+    return {"courses": vtop_parse.course_codes(rows)}
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    body, content_type = await asyncio.to_thread(metrics.render)  # scans /proc for Chrome
+    return Response(body, media_type=content_type)
 
 @app.get("/")
-def root():
+async def root():
     return {"ok": True, "msg": "ForeSync Backend running"}
@@ -0,0 +1,162 @@
+# asset_store.py
+"""
+Content-addressed storage for session artifacts.
+- put(path): hash the file, keep one blob per distinct content under <root>/_cas,
+  and hard-link the session file to it (identical screenshots / JSON across
+  resyncs and sessions take disk once). JSON blobs get .gz (and .br when the
+  brotli module is installed) siblings so /file can serve them pre-compressed.
+- etag(path, encoding): strong ETag per file and content-coding, hashes cached by
+  inode/size/mtime.
+- Session files that are blobs must not be rewritten in place; call unshare()
+  on a session dir before a pipeline run writes into it again.
+"""
+import gzip
+import hashlib
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+COMPRESSIBLE = {".json", ".html", ".ics", ".svg"}
+
+
+class AssetStore:
+    def __init__(self, root: Path):
+        self.root = Path(root) / "_cas"   # not a 32-hex name: the orphan reaper leaves it alone
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._digests: Dict[Tuple[int, int, int, int], str] = {}
+        self._lock = threading.Lock()
+
+    # ---------------- hashing ----------------
+    @staticmethod
+    def _key(st: os.stat_result) -> Tuple[int, int, int, int]:
+        return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def digest(self, path: Path) -> str:
+        st = os.stat(path)
+        key = self._key(st)
+        with self._lock:
+            hit = self._digests.get(key)
+        if hit:
+            return hit
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                h.update(chunk)
+        d = h.hexdigest()
+        self._remember(st, d)
+        return d
+
+    def _remember(self, st: os.stat_result, digest: str):
+        with self._lock:
+            if len(self._digests) > 50_000:
+                self._digests.clear()
+            self._digests[self._key(st)] = digest
+
+    def etag(self, path: Path, encoding: Optional[str] = None) -> str:
+        """Strong ETag; each content-coding of the same file gets its own ("<hash>-gzip")."""
+        d = self.digest(path)
+        return f'"{d}-{encoding}"' if encoding else f'"{d}"'
+
+    def etag_match(self, path: Path, if_none_match: str) -> Optional[str]:
+        """The If-None-Match tag that names any coding of the file's current content, if one does."""
+        d = self.digest(path)
+        for tag in (t.strip() for t in if_none_match.split(",")):
+            if tag == "*" or tag.strip('"').split("-", 1)[0] == d:
+                return tag
+        return None
+
+    # ---------------- store ----------------
+    def blob_path(self, digest: str, suffix: str) -> Path:
+        return self.root / digest[:2] / f"{digest}{suffix}"
+
+    def put(self, path: Path) -> Optional[str]:
+        """Dedupe `path` into the store (hard link). Returns the digest, None if it vanished."""
+        path = Path(path)
+        try:
+            d = self.digest(path)
+        except FileNotFoundError:
+            return None
+        blob = self.blob_path(d, path.suffix.lower())
+        try:
+            if not blob.exists():
+                blob.parent.mkdir(parents=True, exist_ok=True)
+                tmp = blob.with_name(f".{blob.name}.{os.getpid()}.{threading.get_ident()}")
+                os.link(path, tmp)
+                os.replace(tmp, blob)
+            elif not os.path.samefile(blob, path):
+                tmp = path.with_name(f".{path.name}.cas")
+                os.link(blob, tmp)
+                os.replace(tmp, path)   # session file now shares the blob's inode
+            os.utime(blob)              # touch: recently referenced blobs survive gc()
+            self._remember(os.stat(path), d)
+        except OSError:
+            return d  # cross-device / no hard links: keep the private copy, ETag still works
+        if blob.suffix in COMPRESSIBLE:
+            self._precompress(blob)
+        return d
+
+    def _precompress(self, blob: Path):
+        codecs = [(".gz", lambda b: gzip.compress(b, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            codecs.append((".br", lambda b: brotli.compress(b, quality=11)))
+        for ext, compress in codecs:
+            out = blob.with_name(blob.name + ext)
+            if out.exists():
+                continue
+            tmp = out.with_name(f".{out.name}.{os.getpid()}.{threading.get_ident()}")
+            try:
+                tmp.write_bytes(compress(blob.read_bytes()))
+                os.replace(tmp, out)
+            except OSError:
+                tmp.unlink(missing_ok=True)
+
+    def encoded(self, path: Path, accept_encoding: str) -> Optional[Tuple[Path, str]]:
+        """(precompressed sibling, content-encoding) for a stored file, if the client accepts one."""
+        path = Path(path)
+        if path.suffix.lower() not in COMPRESSIBLE:
+            return None
+        try:
+            blob = self.blob_path(self.digest(path), path.suffix.lower())
+        except OSError:
+            return None
+        accept = accept_encoding.lower()
+        for enc, ext in (("br", ".br"), ("gzip", ".gz")):
+            p = blob.with_name(blob.name + ext)
+            if enc in accept and p.exists():
+                return p, enc
+        return None
+
+    def unshare(self, folder: Path):
+        """Give every blob-linked file under `folder` its own inode again, so it can be rewritten."""
+        for p in Path(folder).rglob("*"):
+            try:
+                if p.is_file() and p.stat().st_nlink > 1:
+                    tmp = p.with_name(f".{p.name}.own")
+                    shutil.copy2(p, tmp)
+                    os.replace(tmp, p)
+            except OSError:
+                continue
+
+    def gc(self, min_age_sec: float = 600) -> int:
+        """Drop blobs no session links to anymore (nlink == 1) and not touched for min_age_sec."""
+        now, removed = time.time(), 0
+        for p in self.root.glob("*/*"):
+            try:
+                if p.name.endswith((".gz", ".br")) or p.name.startswith("."):
+                    continue
+                st = p.stat()
+                if st.st_nlink == 1 and now - st.st_mtime > min_age_sec:
+                    for extra in (p, p.with_name(p.name + ".gz"), p.with_name(p.name + ".br")):
+                        extra.unlink(missing_ok=True)
+                    removed += 1
+            except OSError:
+                continue
+        return removed
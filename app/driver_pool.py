@@ -0,0 +1,158 @@
+# driver_pool.py
+"""
+Warm pool of Chrome drivers that are already sitting on the VTOP login page
+(Student role picked, captcha detected), so /start only has to claim one.
+"""
+import threading
+import time
+from typing import Callable, List, Optional
+
+
+class WarmDriver:
+    """A launched driver parked on the login page + what /start needs to answer."""
+    def __init__(self, driver, captcha_case: str, captcha_png_b64: Optional[str] = None):
+        self.driver = driver
+        self.captcha_case = captcha_case
+        self.captcha_png_b64 = captcha_png_b64
+        self.created_at = time.time()
+        self.slot = None  # admission.Slot held while this driver is alive
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+        if self.slot:
+            self.slot.release()
+
+
+class DriverPool:
+    """
+    Keeps between `min_size` and `max_size` warm drivers ready.
+    - claim() never launches Chrome; it returns None on a miss and the caller cold-starts.
+    - A background thread refills the pool, one launch at a time.
+    - Each miss raises the target by one (up to max_size); after `shrink_after_sec`
+      without a claim the target drops back to min_size.
+    - Drivers older than `max_age_sec` are recycled (captcha / login page go stale),
+      and `healthy` is checked right before handing a driver out.
+    """
+    def __init__(
+        self,
+        factory: Callable[[], WarmDriver],
+        healthy: Callable[[WarmDriver], bool],
+        *,
+        min_size: int = 1,
+        max_size: int = 3,
+        max_age_sec: float = 240,
+        shrink_after_sec: float = 300,
+        refill_interval: float = 1.0,
+    ):
+        self.factory = factory
+        self.healthy = healthy
+        self.min_size = max(0, min_size)
+        self.max_size = max(self.min_size, max_size)
+        self.max_age_sec = max_age_sec
+        self.shrink_after_sec = shrink_after_sec
+        self.refill_interval = refill_interval
+
+        self._idle: List[WarmDriver] = []
+        self._target = self.min_size
+        self._last_claim = time.time()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ---------------- lifecycle ----------------
+    def start(self):
+        if self.max_size <= 0 or self._thread:
+            return
+        self._thread = threading.Thread(target=self._refill_loop, name="driver-pool", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=10)
+            self._thread = None
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for w in idle:
+            w.quit()
+
+    # ---------------- claim ----------------
+    def claim(self) -> Optional[WarmDriver]:
+        """Pop the freshest healthy driver, or None if the pool is empty."""
+        while True:
+            with self._lock:
+                self._last_claim = time.time()
+                if not self._idle:
+                    self._target = min(self.max_size, self._target + 1)
+                    self._wake.set()
+                    return None
+                w = self._idle.pop()
+            self._wake.set()
+            if self._expired(w) or not self._safe_healthy(w):
+                w.quit()
+                continue
+            return w
+
+    def drain(self, n: int = 1) -> int:
+        """Quit up to n idle drivers (oldest first) to give memory back. Returns how many."""
+        with self._lock:
+            victims, self._idle = self._idle[:n], self._idle[n:]
+            self._target = self.min_size
+        for w in victims:
+            w.quit()
+        return len(victims)
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._idle)
+
+    # ---------------- internals ----------------
+    def _expired(self, w: WarmDriver) -> bool:
+        return time.time() - w.created_at > self.max_age_sec
+
+    def _safe_healthy(self, w: WarmDriver) -> bool:
+        try:
+            return bool(self.healthy(w))
+        except Exception:
+            return False
+
+    def _recycle_stale(self):
+        with self._lock:
+            stale = [w for w in self._idle if self._expired(w)]
+            self._idle = [w for w in self._idle if w not in stale]
+            if time.time() - self._last_claim > self.shrink_after_sec:
+                self._target = self.min_size
+            extra = self._idle[:max(0, len(self._idle) - self._target)]
+            self._idle = self._idle[len(extra):]
+        for w in stale + extra:
+            w.quit()
+
+    def _refill_loop(self):
+        while not self._stop.is_set():
+            self._recycle_stale()
+            with self._lock:
+                need = len(self._idle) < self._target
+            if need:
+                try:
+                    w = self.factory()
+                except Exception:
+                    # Chrome / VTOP hiccup: back off a little before retrying
+                    self._stop.wait(5)
+                    continue
+                with self._lock:
+                    if self._stop.is_set() or len(self._idle) >= self.max_size:
+                        w_extra = w
+                    else:
+                        # newest at the end; claim() pops from the end
+                        self._idle.append(w)
+                        w_extra = None
+                if w_extra:
+                    w_extra.quit()
+                continue
+            self._wake.wait(self.refill_interval)
+            self._wake.clear()
@@ -0,0 +1,80 @@
+# images.py
+"""
+Post-capture image encoding off the request path.
+Screenshots are written raw by Chrome; a process pool re-encodes them while the
+browser moves on: the PNG is replaced in place by an optimized (palette when it
+fits) version, and WebP / AVIF siblings are written next to it.
+"""
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from PIL import Image
+
+WEBP_QUALITY = 80
+AVIF_QUALITY = 55
+
+
+def supported_formats() -> List[str]:
+    """Variant formats this Pillow build can write ('avif' needs a plugin on Pillow < 11)."""
+    Image.init()
+    return [f for f in ("webp", "avif") if f.upper() in Image.SAVE]
+
+
+def _optimize_png(im: "Image.Image", path: str) -> None:
+    """Rewrite path as an optimized PNG; palette-quantize if that loses no colors."""
+    out = im
+    if im.mode in ("RGB", "RGBA") and im.getcolors(256) is not None:
+        # screenshots of tables/calendars are mostly flat colors; only go to a
+        # palette when every color fits so text stays exactly as rendered
+        out = im.quantize(colors=256, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+    tmp = path + ".tmp"
+    out.save(tmp, format="PNG", optimize=True)
+    if os.path.getsize(tmp) < os.path.getsize(path):
+        os.replace(tmp, path)
+    else:
+        os.remove(tmp)
+
+
+def encode_file(path: str, formats: List[str]) -> Dict[str, str]:
+    """Runs in a worker process. Returns {format: written_path} incl. 'png'."""
+    out = {"png": path}
+    with Image.open(path) as src:
+        src.load()
+        im = src.convert("RGBA") if src.mode not in ("RGB", "RGBA") else src
+        _optimize_png(im, path)
+        stem = os.path.splitext(path)[0]
+        if "webp" in formats:
+            out["webp"] = stem + ".webp"
+            im.save(out["webp"], format="WEBP", quality=WEBP_QUALITY, method=4)
+        if "avif" in formats:
+            out["avif"] = stem + ".avif"
+            im.save(out["avif"], format="AVIF", quality=AVIF_QUALITY)
+    return out
+
+
+class ImageEncoder:
+    """
+    submit(path) -> Future[{format: path}]. With max_workers=0, futures resolve
+    immediately to {'png': path} so callers don't need a special case.
+    """
+    def __init__(self, max_workers: int = 2, formats: Optional[List[str]] = None):
+        wanted = formats if formats is not None else ["webp"]
+        self.formats = [f for f in wanted if f in supported_formats()]
+        self._pool = None
+        if max_workers > 0:
+            # spawn: the API process is full of threads (actors, pool refill, reaper)
+            self._pool = ProcessPoolExecutor(max_workers=max_workers,
+                                             mp_context=multiprocessing.get_context("spawn"))
+
+    def submit(self, path: str) -> Future:
+        if self._pool is None:
+            f: Future = Future()
+            f.set_result({"png": path})
+            return f
+        return self._pool.submit(encode_file, path, self.formats)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,122 @@
+# jobs.py
+"""
+Background jobs for the long login -> timetable -> attendance -> calendar pipeline.
+Submit returns a Job right away; the pipeline reports stages/partial fields into it
+and clients poll its snapshot(). The store only tracks jobs: each one runs on the
+executor its caller passes in (the session's own worker in api.py).
+"""
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+
+class Job:
+    def __init__(self, kind: str, session_id: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.session_id = session_id
+        self.status = "queued"          # queued | running | done | failed
+        self.stage: Optional[str] = None
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.partial: Dict[str, Any] = {}
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    # ---- progress hooks (called from the pipeline thread) ----
+    def begin_stage(self, name: str):
+        with self._lock:
+            self.stage = name
+            self.stages[name] = {"status": "running", "started_at": time.time(), "seconds": None}
+
+    def end_stage(self, name: str, ok: bool = True):
+        with self._lock:
+            st = self.stages.setdefault(name, {"started_at": time.time()})
+            st["seconds"] = round(time.time() - st["started_at"], 3)
+            st["status"] = "done" if ok else "failed"
+
+    def update(self, **fields):
+        """Publish finished AssetsOut fields before the whole run completes."""
+        with self._lock:
+            self.partial.update({k: v for k, v in fields.items() if v is not None})
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "job_id": self.id,
+                "kind": self.kind,
+                "session_id": self.session_id,
+                "status": self.status,
+                "stage": self.stage,
+                "stages": {k: dict(v) for k, v in self.stages.items()},
+                "partial": dict(self.partial),
+                "result": self.result,
+                "error": self.error,
+                "created_at": self.created_at,
+                "finished_at": self.finished_at,
+            }
+
+
+class JobStore:
+    """Tracks jobs while they run and keeps finished ones for `keep_sec`."""
+    def __init__(self, keep_sec: float = 15 * 60):
+        self.keep_sec = keep_sec
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, session_id: str, fn: Callable[[Job], Any],
+               runner: Callable[..., Any]) -> Job:
+        """Run fn(job) in the background; its return value becomes job.result.
+           `runner` schedules the work, executor.submit-style (e.g. a session's own worker)."""
+        self._gc()
+        job = Job(kind, session_id)
+        with self._lock:
+            self._jobs[job.id] = job
+        try:
+            fut = runner(self._run, job, fn)
+        except RuntimeError as e:  # executor already shut down (session closed)
+            self._fail(job, str(e))
+            return job
+        # a queued job whose executor is shut down never runs; don't leave it "queued"
+        fut.add_done_callback(lambda f: f.cancelled() and self._fail(job, "Session closed"))
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def active_for(self, session_id: str) -> List[Job]:
+        with self._lock:
+            return [j for j in self._jobs.values() if j.session_id == session_id and not j.finished]
+
+    def _run(self, job: Job, fn: Callable[[Job], Any]):
+        job.status = "running"
+        try:
+            job.result = fn(job)
+            job.status = "done"
+        except Exception as e:
+            job.error = str(e) or e.__class__.__name__
+            if job.stage and job.stages.get(job.stage, {}).get("seconds") is None:
+                job.end_stage(job.stage, ok=False)
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+
+    def _fail(self, job: Job, error: str):
+        job.error = error
+        job.status = "failed"
+        job.finished_at = time.time()
+
+    def _gc(self):
+        now = time.time()
+        with self._lock:
+            for jid in [jid for jid, j in self._jobs.items()
+                        if j.finished_at and now - j.finished_at > self.keep_sec]:
+                self._jobs.pop(jid, None)
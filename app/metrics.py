@@ -0,0 +1,80 @@
+# metrics.py
+"""
+Prometheus metrics for the backend (served by api.py on GET /metrics).
+- foresync_stage_seconds{stage}: pipeline stages (api._stage) plus driver launch,
+  login page load, captcha detection and the login wait.
+- foresync_stage_failures_total{stage} and foresync_login_failures_total{reason}.
+- Gauges read at scrape time: live sessions, warm pool, Chrome slots, Chrome
+  processes and resident memory (api process / Chrome processes), from /proc.
+"""
+import os
+from typing import Callable, Dict, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+STAGE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+
+STAGE_SECONDS = Histogram("foresync_stage_seconds", "Duration of one pipeline / login stage",
+                          ["stage"], buckets=STAGE_BUCKETS)
+STAGE_FAILURES = Counter("foresync_stage_failures_total", "Stages that raised or reported failure", ["stage"])
+LOGIN_FAILURES = Counter("foresync_login_failures_total", "Failed VTOP logins by reason", ["reason"])
+
+SESSIONS = Gauge("foresync_sessions", "Live API sessions")
+POOL_WARM = Gauge("foresync_pool_warm_drivers", "Pre-launched drivers parked on the login page")
+DRIVER_SLOTS = Gauge("foresync_driver_slots", "Admitted Chrome instances by lane", ["lane"])
+CHROME_PROCESSES = Gauge("foresync_chrome_processes", "Chrome / chromedriver processes on the host")
+RSS_BYTES = Gauge("foresync_rss_bytes", "Resident memory", ["process"])
+
+_PAGE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _proc_rss(pid: str) -> int:
+    with open(f"/proc/{pid}/statm") as f:
+        return int(f.read().split()[1]) * _PAGE
+
+
+def chrome_processes() -> Tuple[int, int]:
+    """(count, total RSS bytes) of chrome*/chromium*/chromedriver processes; (0, 0) without /proc."""
+    n = rss = 0
+    try:
+        pids = [p for p in os.listdir("/proc") if p.isdigit()]
+    except OSError:
+        return 0, 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/comm") as f:
+                name = f.read().strip().lower()
+            if name.startswith(("chrome", "chromium")):
+                n += 1
+                rss += _proc_rss(pid)
+        except (OSError, ValueError, IndexError):
+            continue   # exited meanwhile
+    return n, rss
+
+
+def self_rss() -> int:
+    try:
+        return _proc_rss("self")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def observe_stage(stage: str, seconds: float, ok: bool = True):
+    STAGE_SECONDS.labels(stage).observe(seconds)
+    if not ok:
+        STAGE_FAILURES.labels(stage).inc()
+
+
+def bind(sessions: Callable[[], int], pool_warm: Callable[[], int], slots: Callable[[], Dict[str, int]]):
+    """Hook the gauges up to the API's live state (read on every scrape)."""
+    SESSIONS.set_function(sessions)
+    POOL_WARM.set_function(pool_warm)
+    for lane in ("interactive", "background"):
+        DRIVER_SLOTS.labels(lane).set_function(lambda lane=lane: slots().get(lane, 0))
+    CHROME_PROCESSES.set_function(lambda: chrome_processes()[0])
+    RSS_BYTES.labels("api").set_function(self_rss)
+    RSS_BYTES.labels("chrome").set_function(lambda: chrome_processes()[1])
+
+
+def render() -> Tuple[bytes, str]:
+    return generate_latest(), CONTENT_TYPE_LATEST
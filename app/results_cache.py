@@ -0,0 +1,162 @@
+# results_cache.py
+"""
+Per-student cache of finished pipeline results, keyed by regno + semester /
+class-group selection.
+- Entries keep a hard-linked snapshot of the run's files under <root>/_results,
+  so they outlive the session that produced them and cost no extra disk.
+- Reads are stale-while-revalidate: 'fresh' entries are served as is, 'stale'
+  ones are served while the caller refreshes in the background, older ones miss.
+- A /run may only read an entry if its password matches the salted hash stored
+  with it (a cache hit never reaches VTOP, so this is the only check).
+- flight(key) collapses concurrent identical refreshes into one browser run.
+"""
+import hashlib
+import hmac
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+Key = Tuple[str, ...]
+
+_PBKDF2_ROUNDS = 100_000
+
+
+def make_key(regno: str, *selection: Optional[str]) -> Key:
+    return (regno.strip().upper(),) + tuple((s or "").strip() for s in selection)
+
+
+def _hash_password(password: str, salt: bytes) -> bytes:
+    return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, _PBKDF2_ROUNDS)
+
+
+class ResultEntry:
+    def __init__(self, key: Key, folder: Path, assets: Dict[str, Any], password: Optional[str]):
+        self.key = key
+        self.folder = folder          # hard-link snapshot of the session-relative files
+        self.assets = assets          # AssetsOut fields with paths relative to the session dir
+        self.created_at = time.time()
+        self.salt = os.urandom(16)
+        self.pw_hash = _hash_password(password, self.salt) if password else None
+
+    def age(self) -> float:
+        return time.time() - self.created_at
+
+    def check_password(self, password: Optional[str]) -> bool:
+        if not self.pw_hash or not password:
+            return False
+        return hmac.compare_digest(self.pw_hash, _hash_password(password, self.salt))
+
+
+class ResultCache:
+    def __init__(self, root: Path, *, fresh_sec: float = 300, stale_sec: float = 3600, max_entries: int = 500,
+                 flight_timeout: float = 600):
+        self.root = Path(root) / "_results"   # not a 32-hex name: the orphan reaper leaves it alone
+        shutil.rmtree(self.root, ignore_errors=True)  # snapshots don't survive a restart
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.fresh_sec = fresh_sec
+        self.stale_sec = max(stale_sec, fresh_sec)
+        self.max_entries = max_entries
+        self.flight_timeout = flight_timeout
+        self._entries: "OrderedDict[Key, ResultEntry]" = OrderedDict()
+        self._flights: Dict[Key, Tuple[Future, float]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.fresh_sec > 0
+
+    # ---------------- read ----------------
+    def get(self, key: Key) -> Tuple[Optional[ResultEntry], Optional[str]]:
+        """(entry, 'fresh' | 'stale') or (None, None)."""
+        if not self.enabled:
+            return None, None
+        with self._lock:
+            e = self._entries.get(key)
+            if e is None:
+                return None, None
+            age = e.age()
+            if age > self.stale_sec:
+                self._drop_locked(key)
+                return None, None
+            self._entries.move_to_end(key)
+        return e, ("fresh" if age <= self.fresh_sec else "stale")
+
+    # ---------------- write ----------------
+    def put(self, key: Key, session_root: Path, rel_paths: List[str], assets: Dict[str, Any],
+            password: Optional[str]) -> Optional[ResultEntry]:
+        """Snapshot rel_paths (relative to session_root) and remember assets for key."""
+        if not self.enabled:
+            return None
+        folder = self.root / f"{hashlib.sha1(repr(key).encode()).hexdigest()}-{os.urandom(4).hex()}"
+        for rel in rel_paths:
+            src, dst = Path(session_root) / rel, folder / rel
+            try:
+                dst.parent.mkdir(parents=True, exist_ok=True)
+                try:
+                    os.link(src, dst)
+                except OSError:
+                    shutil.copy2(src, dst)
+            except OSError:
+                continue
+        entry = ResultEntry(key, folder, assets, password)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None and old.pw_hash and entry.pw_hash is None:
+                entry.salt, entry.pw_hash = old.salt, old.pw_hash   # resyncs carry no password
+            self._entries[key] = entry
+            if old is not None:
+                shutil.rmtree(old.folder, ignore_errors=True)
+            while len(self._entries) > self.max_entries:
+                self._drop_locked(next(iter(self._entries)))
+        return entry
+
+    def materialize(self, entry: ResultEntry, session_root: Path):
+        """Link the entry's files into a session dir (same relative layout)."""
+        for src in entry.folder.rglob("*"):
+            if not src.is_file():
+                continue
+            dst = Path(session_root) / src.relative_to(entry.folder)
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            tmp = dst.with_name(f".{dst.name}.res")
+            try:
+                try:
+                    os.link(src, tmp)
+                except OSError:
+                    shutil.copy2(src, tmp)
+                os.replace(tmp, dst)
+            except OSError:   # entry replaced meanwhile; the newer snapshot is served next time
+                continue
+
+    def _drop_locked(self, key: Key):
+        e = self._entries.pop(key, None)
+        if e is not None:
+            shutil.rmtree(e.folder, ignore_errors=True)
+
+    # ---------------- single-flight ----------------
+    def flight(self, key: Key) -> Tuple[Future, bool]:
+        """(future, leader). The leader runs and must call land(); followers wait on the future.
+           A flight older than flight_timeout is treated as abandoned and taken over."""
+        now = time.time()
+        with self._lock:
+            cur = self._flights.get(key)
+            if cur is not None and now - cur[1] < self.flight_timeout:
+                return cur[0], False
+            f = Future()
+            self._flights[key] = (f, now)
+        if cur is not None and not cur[0].done():
+            cur[0].set_result(None)
+        return f, True
+
+    def land(self, key: Key, fut: Future, entry: Optional[ResultEntry]):
+        """Leader of `fut` finished (entry None on failure); wake its followers."""
+        with self._lock:
+            cur = self._flights.get(key)
+            if cur is not None and cur[0] is fut:
+                del self._flights[key]
+        if not fut.done():
+            fut.set_result(entry)
@@ -0,0 +1,112 @@
+# tracing.py
+"""
+Structured JSONL logging and trace spans, correlated by session.
+- One JSON object per line: ts, level, event, session_id, thread + the event's fields.
+  session_id comes from a contextvar that api.Session sets around its worker calls.
+- Records pass through a QueueHandler; a QueueListener thread formats and writes
+  them, so browser-driving threads never block on stdout or disk.
+- span(name, **fields) records duration_ms and ok when it exits; the body may add
+  fields, e.g. sp["branch"] = which fallback won.
+Sink: TRACE_FILE (appended JSONL) or stderr. TRACE_LEVEL filters (default INFO).
+"""
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+SESSION_ID: "contextvars.ContextVar[Optional[str]]" = contextvars.ContextVar("session_id", default=None)
+
+LOGGER = logging.getLogger("foresync")
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_handler: Optional[logging.Handler] = None   # the one handler LOGGER writes through
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        out = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "event": record.getMessage(),
+            "session_id": getattr(record, "session_id", None),
+            "thread": record.threadName,
+        }
+        out.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            out["exc"] = self.formatException(record.exc_info)
+        return json.dumps(out, ensure_ascii=False, default=str)
+
+
+def setup(path: Optional[str] = None, level: Optional[str] = None):
+    """Route 'foresync' records through a queue to the JSONL sink. Safe to call twice."""
+    global _listener
+    if _listener is not None:
+        return
+    path = os.getenv("TRACE_FILE", "") if path is None else path
+    sink = logging.FileHandler(path, encoding="utf-8") if path else logging.StreamHandler(sys.stderr)
+    sink.setFormatter(JsonFormatter())
+    q: "queue.SimpleQueue" = queue.SimpleQueue()
+    _use_handler(logging.handlers.QueueHandler(q))
+    LOGGER.setLevel((level or os.getenv("TRACE_LEVEL", "INFO")).upper())
+    LOGGER.propagate = False
+    _listener = logging.handlers.QueueListener(q, sink)
+    _listener.start()
+
+
+def shutdown():
+    """Flush and stop the writer thread. Records logged afterwards go straight to the sink
+       instead of piling up in a queue nobody drains."""
+    global _listener
+    if _listener is not None:
+        _use_handler(_listener.handlers[0])
+        _listener.stop()
+        _listener = None
+
+
+def _use_handler(h: logging.Handler):
+    global _handler
+    if _handler is not None:
+        LOGGER.removeHandler(_handler)
+        _handler.close()
+    LOGGER.addHandler(h)
+    _handler = h
+
+
+# ---------------- recording ----------------
+def event(name: str, level: int = logging.INFO, **fields):
+    if LOGGER.isEnabledFor(level):
+        LOGGER.log(level, name, extra={"fields": fields, "session_id": SESSION_ID.get()})
+
+
+def warn(name: str, **fields):
+    event(name, logging.WARNING, **fields)
+
+
+@contextmanager
+def span(name: str, **fields):
+    sp = dict(fields)
+    t0 = time.perf_counter()
+    try:
+        yield sp
+    except BaseException:
+        sp["ok"] = False
+        raise
+    finally:
+        sp.setdefault("ok", True)
+        event(name, duration_ms=round((time.perf_counter() - t0) * 1000, 1), **sp)
+
+
+@contextmanager
+def session(session_id: Optional[str]):
+    """Attribute everything recorded in this block (this thread / context) to session_id."""
+    token = SESSION_ID.set(session_id)
+    try:
+        yield
+    finally:
+        SESSION_ID.reset(token)
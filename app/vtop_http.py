@@ -0,0 +1,173 @@
+# vtop_http.py
+"""
+Cookie-backed HTTP client for VTOP: once Chrome has logged in, fetch the section
+fragments the sidebar menu would load (timetable, attendance, academic calendar)
+with plain HTTP requests and parse them on the server via vtop_parse.
+Anything unexpected raises VtopHttpError so callers can fall back to Chrome.
+"""
+import http.cookiejar
+import re
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import Dict, List, Optional, Tuple
+
+import vtop_parse
+
+# Menu loaders (same data-url the sidebar's a.systemBtnMenu links carry) and
+# the form posts VTOP's own JS makes when a dropdown changes.
+MENU_TIMETABLE     = "academics/common/StudentTimeTableChn"
+MENU_ATTENDANCE    = "academics/common/StudentAttendance"
+MENU_CALENDAR      = "academics/common/CalendarPreview"
+VIEW_TIMETABLE     = "processViewTimeTable"
+VIEW_ATTENDANCE    = "processViewStudentAttendance"
+CALENDAR_MONTHS    = "getDateForSemesterPreview"
+VIEW_CALENDAR      = "processViewCalendar"
+
+_LOGIN_MARKERS = ('id="captchastr"', 'name="password"')
+_CAL_DATE_RE = re.compile(r"processViewCalendar\(\s*'([^']+)'")
+
+
+class VtopHttpError(Exception):
+    """Session expired, unexpected page, or network failure."""
+
+
+def _jar_cookie(c: Dict[str, object], host: str) -> http.cookiejar.Cookie:
+    """Selenium get_cookies() entry -> cookiejar Cookie."""
+    domain = str(c.get("domain") or host)
+    # cookiejar matches dotless hosts (localhost, a container name) as "<host>.local", and
+    # stores their Set-Cookie replies that way: do the same or the cookie is never sent
+    if "." not in domain:
+        domain += ".local"
+    expiry = c.get("expiry")
+    return http.cookiejar.Cookie(
+        version=0, name=str(c["name"]), value=str(c["value"]), port=None, port_specified=False,
+        domain=domain, domain_specified=domain.startswith("."), domain_initial_dot=domain.startswith("."),
+        path=str(c.get("path") or "/"), path_specified=True, secure=bool(c.get("secure")),
+        expires=int(expiry) if expiry is not None else None, discard=expiry is None,
+        comment=None, comment_url=None, rest={"HttpOnly": None} if c.get("httpOnly") else {},
+    )
+
+
+class VtopHttp:
+    def __init__(self, root: str, cookies: List[Dict[str, object]], regno: str = "",
+                 user_agent: Optional[str] = None, timeout: float = 20):
+        self.root = root.rstrip("/")
+        self.regno = regno
+        self.timeout = timeout
+        # a jar, so Set-Cookie responses (rotated JSESSIONID / CSRF cookies) carry over
+        self.cookies = http.cookiejar.CookieJar()
+        host = urllib.parse.urlsplit(self.root).hostname or ""
+        for c in cookies:
+            self.cookies.set_cookie(_jar_cookie(c, host))
+        self._opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies))
+        self.user_agent = user_agent or "Mozilla/5.0"
+        self.csrf: Optional[str] = None
+        self.authorized_id: Optional[str] = None
+        self.content_html: Optional[str] = None
+
+    @classmethod
+    def from_driver(cls, driver, root: str, regno: str = "", timeout: float = 20) -> "VtopHttp":
+        try:
+            ua = driver.execute_script("return navigator.userAgent")
+        except Exception:
+            ua = None
+        return cls(root, driver.get_cookies(), regno=regno, user_agent=ua, timeout=timeout)
+
+    # ---------------- transport ----------------
+    def _request(self, path: str, data: Optional[Dict[str, str]] = None) -> str:
+        url = path if path.startswith("http") else f"{self.root}/vtop/{path.lstrip('/')}"
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        req = urllib.request.Request(url, data=body, headers={
+            "User-Agent": self.user_agent,
+            "X-Requested-With": "XMLHttpRequest",
+            "Referer": f"{self.root}/vtop/content",
+        })
+        try:
+            with self._opener.open(req, timeout=self.timeout) as resp:
+                final_url = resp.geturl()
+                html = resp.read().decode(resp.headers.get_content_charset() or "utf-8", "replace")
+        except (urllib.error.URLError, OSError) as e:
+            raise VtopHttpError(f"{path}: {e}")
+        if "/login" in final_url.lower() or any(m in html.lower() for m in _LOGIN_MARKERS):
+            raise VtopHttpError("VTOP session expired")
+        return html
+
+    def _form(self, **extra) -> Dict[str, str]:
+        if not self.csrf:
+            self.content()
+        form = {"_csrf": self.csrf, "authorizedID": self.authorized_id or self.regno,
+                "x": time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime())}
+        form.update({k: v for k, v in extra.items() if v is not None})
+        return form
+
+    # ---------------- pages ----------------
+    def content(self) -> str:
+        """Load the content shell once for the CSRF token, authorizedID and menu urls."""
+        html = self._request("content")
+        root = vtop_parse.parse_html(html)
+        self.csrf = vtop_parse.input_value(root, "_csrf")
+        self.authorized_id = vtop_parse.input_value(root, "authorizedID") or self.regno
+        if not self.csrf:
+            raise VtopHttpError("CSRF token not found on /vtop/content")
+        self.content_html = html
+        return html
+
+    def _menu_url(self, fragment: str) -> str:
+        if self.content_html is None:
+            self.content()
+        for u in vtop_parse.menu_urls(self.content_html or ""):
+            if fragment.split("/")[-1] in u:
+                return u
+        return fragment
+
+    def menu(self, fragment: str) -> str:
+        """POST the sidebar loader, exactly like clicking a.systemBtnMenu."""
+        return self._request(self._menu_url(fragment), self._form(verifyMenu="true", nocache=str(int(time.time() * 1000))))
+
+    def _pick_semester(self, menu_html: str, sem_label: Optional[str], select_id: str = "semesterSubId") -> Optional[str]:
+        opts = vtop_parse.select_options(menu_html, select_id)
+        o = vtop_parse.pick_option(opts, sem_label)
+        if o is None:
+            o = next((x for x in opts if x["selected"] and x["value"]), None) \
+                or next((x for x in opts if x["value"]), None)
+        return str(o["value"]) if o else None
+
+    def timetable(self, sem_label: Optional[str] = None) -> str:
+        """Timetable fragment (registered courses table + #timeTableStyle) for a semester."""
+        page = self.menu(MENU_TIMETABLE)
+        sem = self._pick_semester(page, sem_label)
+        if not sem:
+            return page
+        return self._request(VIEW_TIMETABLE, self._form(semesterSubId=sem))
+
+    def attendance(self, sem_label: Optional[str] = None) -> str:
+        page = self.menu(MENU_ATTENDANCE)
+        sem = self._pick_semester(page, sem_label)
+        if not sem:
+            return page
+        html = self._request(VIEW_ATTENDANCE, self._form(semesterSubId=sem))
+        if "table" not in html.lower():
+            raise VtopHttpError("Attendance table missing in response")
+        return html
+
+    def calendar(self, sem_label: Optional[str] = None, class_group: Optional[str] = None) -> List[Tuple[str, str]]:
+        """[(calDate, month_html), ...] for every month of the chosen semester."""
+        page = self.menu(MENU_CALENDAR)
+        sem = self._pick_semester(page, sem_label)
+        if not sem:
+            raise VtopHttpError("No calendar semester available")
+        months_html = self._request(CALENDAR_MONTHS, self._form(paramReturnId=CALENDAR_MONTHS, semSubId=sem))
+        groups = vtop_parse.select_options(months_html, "classGroupId") or vtop_parse.select_options(page, "classGroupId")
+        grp = vtop_parse.pick_option(groups, class_group) or next((g for g in groups if g["selected"]), None) \
+            or (groups[0] if groups else None)
+        dates = list(dict.fromkeys(_CAL_DATE_RE.findall(months_html)))
+        if not dates:
+            raise VtopHttpError("No calendar months found")
+        out = []
+        for cal_date in dates:
+            html = self._request(VIEW_CALENDAR, self._form(
+                calDate=cal_date, semSubId=sem, classGroupId=str(grp["value"]) if grp else None))
+            out.append((cal_date, html))
+        return out
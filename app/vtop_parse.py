@@ -0,0 +1,789 @@
+# vtop_parse.py
+"""
+Browser-free parsing for VTOP pages.
+- A tiny DOM (stdlib html.parser) good enough for VTOP's server-rendered tables.
+- "Table data" dicts: {"headers": [...], "thead": [...], "rows": [{"text", "cells": [...]}]}
+  where each cell is {"text", "ps", "href", "onclick"}. Login.py builds the same shape
+  from live WebElements, so the normalizers below are shared by both paths.
+- A small CLI to bulk re-parse saved pages and check them against the fixture
+  corpus in fixtures/vtop (`python vtop_parse.py --help`).
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# ---------------------- mini DOM ----------------------
+_VOID = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+         "meta", "param", "source", "track", "wbr"}
+# tags whose open implicitly closes an open sibling of the same family
+_IMPLIED_CLOSE = {
+    "tr": {"tr", "td", "th"}, "td": {"td", "th"}, "th": {"td", "th"},
+    "li": {"li"}, "option": {"option"}, "p": {"p"},
+    "thead": {"thead", "tbody", "tr", "td", "th"}, "tbody": {"thead", "tbody", "tr", "td", "th"},
+}
+_BLOCK = {"p", "div", "tr", "li", "br", "h1", "h2", "h3", "h4", "h5", "h6", "table",
+          "thead", "tbody", "ul", "ol", "section", "form", "option"}
+
+
+class Node:
+    __slots__ = ("tag", "attrs", "children", "parent")
+
+    def __init__(self, tag: str, attrs: Optional[Dict[str, str]] = None, parent: "Node" = None):
+        self.tag = tag
+        self.attrs = attrs or {}
+        self.children: list = []   # Node or str
+        self.parent = parent
+
+    def get(self, name: str, default: str = "") -> str:
+        v = self.attrs.get(name)
+        return default if v is None else v
+
+    @property
+    def classes(self) -> List[str]:
+        return self.get("class").split()
+
+    def iter(self, tag: Optional[str] = None):
+        """Depth-first descendants (excluding self)."""
+        for c in self.children:
+            if isinstance(c, Node):
+                if tag is None or c.tag == tag:
+                    yield c
+                yield from c.iter(tag)
+
+    def find_all(self, tag: Optional[str] = None, **attrs) -> List["Node"]:
+        out = []
+        for n in self.iter(tag):
+            if all(_attr_match(n, k, v) for k, v in attrs.items()):
+                out.append(n)
+        return out
+
+    def find(self, tag: Optional[str] = None, **attrs) -> Optional["Node"]:
+        for n in self.iter(tag):
+            if all(_attr_match(n, k, v) for k, v in attrs.items()):
+                return n
+        return None
+
+    def children_tagged(self, tag: str) -> List["Node"]:
+        return [c for c in self.children if isinstance(c, Node) and c.tag == tag]
+
+    def raw_text(self) -> str:
+        parts = []
+        self._collect(parts)
+        return "".join(parts)
+
+    def _collect(self, parts: list):
+        for c in self.children:
+            if isinstance(c, str):
+                parts.append(c)
+            elif c.tag in ("script", "style"):
+                continue
+            else:
+                if c.tag in _BLOCK:
+                    parts.append("\n")
+                elif c.tag in ("td", "th"):
+                    parts.append(" ")
+                c._collect(parts)
+                if c.tag in _BLOCK:
+                    parts.append("\n")
+
+    @property
+    def text(self) -> str:
+        """Roughly WebElement.text: whitespace collapsed per line, blank lines dropped."""
+        lines = (re.sub(r"[ \t\r\f\v\xa0]+", " ", ln).strip() for ln in self.raw_text().split("\n"))
+        return "\n".join(ln for ln in lines if ln)
+
+
+def _attr_match(n: Node, key: str, want) -> bool:
+    key = key.rstrip("_")           # allow class_=..., id_=...
+    if key == "class":
+        return want in n.classes
+    val = n.attrs.get(key)
+    if want is True:
+        return val is not None
+    if callable(want):
+        return val is not None and bool(want(val))
+    return val == want
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node("#document")
+        self.cur = self.root
+
+    def handle_starttag(self, tag, attrs):
+        closes = _IMPLIED_CLOSE.get(tag)
+        if closes:
+            # close up to the nearest open element of the same family (but never past a table)
+            n = self.cur
+            while n is not self.root and n.tag != "table":
+                if n.tag in closes:
+                    self.cur = n.parent
+                    break
+                n = n.parent
+        node = Node(tag, {k: (v if v is not None else "") for k, v in attrs}, self.cur)
+        self.cur.children.append(node)
+        if tag not in _VOID:
+            self.cur = node
+
+    def handle_startendtag(self, tag, attrs):
+        node = Node(tag, {k: (v if v is not None else "") for k, v in attrs}, self.cur)
+        self.cur.children.append(node)
+
+    def handle_endtag(self, tag):
+        n = self.cur
+        while n is not self.root:
+            if n.tag == tag:
+                self.cur = n.parent
+                return
+            n = n.parent
+        # stray end tag: ignore
+
+    def handle_data(self, data):
+        self.cur.children.append(data)
+
+
+def parse_html(html: str) -> Node:
+    b = _TreeBuilder()
+    b.feed(html or "")
+    b.close()
+    return b.root
+
+
+# ---------------------- table data ----------------------
+def _cell_data(td: Node) -> Dict[str, object]:
+    a = td.find("a")
+    return {
+        "text": td.text,
+        "ps": [p.text for p in td.find_all("p")],
+        "href": a.get("href") if a else "",
+        "onclick": a.get("onclick") if a else "",
+    }
+
+def table_data(tbl: Node) -> Dict[str, object]:
+    """Serialize one <table> into the shared table-data shape."""
+    thead = [th.text for sec in tbl.children_tagged("thead") for th in sec.iter("th") if th.text.strip()]
+    rows = []
+    for tr in tbl.iter("tr"):
+        tds = tr.children_tagged("td")
+        if not tds:
+            continue
+        rows.append({"text": tr.text, "cells": [_cell_data(td) for td in tds]})
+    return {
+        "id": tbl.get("id"),
+        "headers": [th.text.strip() for th in tbl.iter("th")],
+        "thead": thead,
+        "rows": rows,
+    }
+
+def tables(html_or_root) -> List[Dict[str, object]]:
+    root = parse_html(html_or_root) if isinstance(html_or_root, str) else html_or_root
+    return [table_data(t) for t in root.iter("table")]
+
+
+# ---------------------- forms / selects ----------------------
+def input_value(html_or_root, name: str) -> Optional[str]:
+    root = parse_html(html_or_root) if isinstance(html_or_root, str) else html_or_root
+    el = root.find("input", name=name) or root.find("input", id=name)
+    return el.get("value") if el else None
+
+def select_options(html_or_root, select_id: str) -> List[Dict[str, object]]:
+    """[{value, label, selected}] for <select id=...>."""
+    root = parse_html(html_or_root) if isinstance(html_or_root, str) else html_or_root
+    sel = root.find("select", id=select_id)
+    if not sel:
+        return []
+    return [{"value": o.get("value"), "label": o.text.strip(), "selected": "selected" in o.attrs}
+            for o in sel.iter("option")]
+
+def pick_option(options: List[Dict[str, object]], value_text: Optional[str]) -> Optional[Dict[str, object]]:
+    """Same rule as api._select_dropdown_by_text: exact label, else case-insensitive contains."""
+    if not value_text:
+        return None
+    for o in options:
+        t = str(o["label"])
+        if t == value_text or value_text.lower() in t.lower():
+            return o
+    return None
+
+def menu_urls(html_or_root) -> List[str]:
+    """data-url of every sidebar a.systemBtnMenu link."""
+    root = parse_html(html_or_root) if isinstance(html_or_root, str) else html_or_root
+    return [a.get("data-url") for a in root.find_all("a", class_="systemBtnMenu") if a.get("data-url")]
+
+
+# ---------------------- normalizers (shared with Login.py) ----------------------
+_CREDITS_RE = re.compile(r"Total\s+Number\s+Of\s+Credits:\s*([0-9]+(?:\.[0-9]+)?)", re.I)
+_VIEW_ATT_RE = re.compile(r"processViewAttendanceDetail\('([^']+)'\s*,\s*'([^']+)'\)")
+_CODE_IN_TEXT_RE = re.compile(r"[A-Z]{2,4}\d{3}[A-Z]?")
+
+_ATT_TARGET_NAMES = {
+    "course_code": {"course code", "course code*"},   # tolerate minor variants
+    "attended": {"attended classes", "attended"},
+    "total": {"total classes", "total"}
+}
+
+def _to_int(x):
+    try:
+        return int(str(x).strip())
+    except Exception:
+        return None
+
+def _att_cell(c: Dict[str, object]) -> str:
+    ps = [p.strip() for p in c.get("ps") or [] if p.strip()]
+    if ps:
+        return " | ".join(ps)
+    return str(c.get("text") or "").strip()
+
+def attendance_header_map(thead: List[str]) -> Dict[str, int]:
+    norm = lambda s: re.sub(r"\s+", " ", s.strip().lower())
+    header_map = {}
+    for idx, name in enumerate(thead):
+        name = norm(name)
+        for key, alts in _ATT_TARGET_NAMES.items():
+            if name in alts:
+                header_map[key] = idx
+    return header_map
+
+def attendance_payload(table: Dict[str, object], note: str = "", only_counts: bool = False) -> Dict[str, object]:
+    """
+    Rows + total credits from the attendance summary table data.
+    If only_counts=True, just {course_code, attended, total} per course.
+    """
+    header_map = attendance_header_map(table.get("thead") or [])
+    rows_out = []
+    total_credits = None
+
+    for tr in table.get("rows") or []:
+        cells = tr["cells"]
+        tr_text = tr.get("text") or ""
+
+        # Skip the credits / footer rows
+        if len(cells) == 1 or "Total Number Of Credits" in tr_text:
+            m = _CREDITS_RE.search(tr_text)
+            if m:
+                total_credits = float(m.group(1))
+            continue
+
+        if len(cells) < 11:  # need at least up to 'Total Classes'
+            continue
+
+        # -------- Minimal extraction using header first, else index fallback --------
+        if only_counts:
+            i_code = header_map.get("course_code", 1)
+            i_attd = header_map.get("attended", 9)
+            i_totl = header_map.get("total", 10)
+            if max(i_code, i_attd, i_totl) >= len(cells):
+                continue
+            course_code = _att_cell(cells[i_code])
+            attended    = _to_int(_att_cell(cells[i_attd]))
+            total       = _to_int(_att_cell(cells[i_totl]))
+            # guard: only keep well-formed rows
+            if course_code and (attended is not None) and (total is not None):
+                rows_out.append({"course_code": course_code, "attended": attended, "total": total})
+            continue
+
+        # -------- Full row extraction --------
+        if len(cells) < 14:
+            continue
+        v = [_att_cell(c) for c in cells[:13]]
+        view_info = {"href": "", "onclick": "", "regid": "", "slot": ""}
+        view_info["href"] = str(cells[13].get("href") or "")
+        view_info["onclick"] = str(cells[13].get("onclick") or "")
+        m = _VIEW_ATT_RE.search(view_info["onclick"])
+        if m:
+            view_info["regid"] = m.group(1)
+            view_info["slot"] = m.group(2)
+        percentage = v[11]
+        rows_out.append({
+            "slno": _to_int(v[0]),
+            "course_code": v[1],
+            "course_title": v[2],
+            "course_type": v[3],
+            "slot": v[4],
+            "faculty": v[5],
+            "attendance_type": v[6],
+            "registration_datetime": v[7],
+            "attendance_date": v[8],
+            "attended": _to_int(v[9]),
+            "total": _to_int(v[10]),
+            "percentage": _to_int(percentage) if percentage and percentage != "-" else None,
+            "status": v[12],
+            "view": view_info
+        })
+
+    return {"rows": rows_out, "total_credits": total_credits, "note": note}
+
+def is_registered_courses_table(headers: List[str]) -> bool:
+    norm = [h.lower().replace(" ", "") for h in headers]
+    return any("course" in h for h in norm) and (any("slot" in h for h in norm) or any("venue" in h for h in norm))
+
+def registered_courses_rows(table: Dict[str, object]) -> List[Dict[str, str]]:
+    """Header-aware records from the 'Registered & Approved Courses' table data."""
+    heads = table.get("headers") or []
+    header_map = {i: heads[i].strip() for i in range(len(heads))}
+    out = []
+    for tr in table.get("rows") or []:
+        rec = {}
+        for i, c in enumerate(tr["cells"]):
+            key = header_map.get(i, f"Col{i+1}")
+            txt = str(c.get("text") or "").strip().replace("\n", " ").replace("\r", " ")
+            rec[key] = re.sub(r"\s+", " ", txt)
+        # normalize a few useful fields
+        if "Course" in rec:
+            m = _CREDITS_RE.search(tr.get("text") or "")
+            if m:
+                rec["CourseCode"] = m.group(1)
+        for k in list(rec.keys()):
+            if k.lower().startswith("slot"):
+                rec["Slot"] = rec[k]
+                break
+        out.append(rec)
+    return out
+
+def course_codes(rows: List[Dict[str, object]]) -> List[str]:
+    """Sorted unique course codes (BCSE302L, ...) found in any field of the records."""
+    codes = set()
+    for r in rows:
+        # typical keys vary; scan all values
+        vals = " ".join([str(v) for v in r.values() if v]).upper()
+        codes.update(_CODE_IN_TEXT_RE.findall(vals))
+    return sorted(codes)
+
+
+# ---------------------- page-level helpers (HTML in, records out) ----------------------
+def attendance_from_html(html: str, only_counts: bool = False) -> Dict[str, object]:
+    root = parse_html(html)
+    tbl = None
+    for div in root.find_all("div", class_="table-responsive"):
+        tbl = div.find("table")
+        if tbl:
+            break
+    note = ""
+    for div in root.find_all("div", class_="table-responsive"):
+        h5 = div.find("h5")
+        span = h5.find("span") if h5 else None
+        if span:
+            note = span.text.strip()
+            break
+    if tbl is None:
+        return {"rows": [], "total_credits": None, "note": note}
+    return attendance_payload(table_data(tbl), note=note, only_counts=only_counts)
+
+def registered_courses_from_html(html: str) -> List[Dict[str, str]]:
+    for t in tables(html):
+        if t["headers"] and is_registered_courses_table(t["headers"]):
+            return registered_courses_rows(t)
+    return []
+
+
+# ---------------------- weekly timetable grid ----------------------
+_DAYS = ("MON", "TUE", "WED", "THU", "FRI", "SAT", "SUN")
+_TIME_RE = re.compile(r"^\d{1,2}:\d{2}$")
+_COURSE_CODE_RE = re.compile(r"^[A-Z]{2,4}\d{3}[A-Z]?$")
+
+def _expand_grid(tbl: Node) -> List[List[str]]:
+    """Cell texts of a table as a rectangular grid, rowspan/colspan repeated into every covered cell."""
+    grid, carry = [], {}   # carry: col -> [rows_left, text]
+    for tr in tbl.iter("tr"):
+        active, row, col, new = carry, {}, 0, {}
+        for cell in (c for c in tr.children if isinstance(c, Node) and c.tag in ("td", "th")):
+            while col in active:
+                row[col] = active[col][1]
+                col += 1
+            text = cell.text.strip()
+            rs, cs = _to_int(cell.get("rowspan")) or 1, _to_int(cell.get("colspan")) or 1
+            for _ in range(cs):
+                row[col] = text
+                if rs > 1:
+                    new[col] = [rs - 1, text]
+                col += 1
+        for c, (_, text) in active.items():
+            row.setdefault(c, text)
+        carry = {c: [n - 1, t] for c, (n, t) in active.items() if n > 1}
+        carry.update(new)
+        if row:
+            grid.append([row.get(i, "") for i in range(max(row) + 1)])
+    return grid
+
+def _course_cell(text: str) -> Optional[Dict[str, str]]:
+    """'A1-BCSE302L-TH-SJT313-ALL' -> slot, course_code, course_type, venue, class_group."""
+    parts = text.split("-")
+    if len(parts) < 4 or not _COURSE_CODE_RE.match(parts[1]):
+        return None
+    return {"slot": parts[0], "course_code": parts[1], "course_type": parts[2],
+            "venue": "-".join(parts[3:-1]) if len(parts) > 4 else parts[3],
+            "class_group": parts[-1] if len(parts) > 4 else ""}
+
+def _registered_index(registered: List[Dict[str, str]]) -> Dict[Tuple[str, str], Dict[str, str]]:
+    """(course_code, slot) -> {course_title, faculty} from registered_courses_rows records."""
+    idx = {}
+    for rec in registered or []:
+        course = rec.get("Course", "")
+        code, _, title = course.partition(" - ")
+        slots = rec.get("Slot", "").split(" - ")[0]
+        info = {"course_title": title.split(" (")[0].strip(),
+                "faculty": rec.get("Faculty Details", "").split(" - ")[0].strip()}
+        for slot in slots.split("+"):
+            if slot.strip():
+                idx[(code.strip(), slot.strip())] = info
+    return idx
+
+def timetable_grid_from_html(html_or_root, registered: Optional[List[Dict[str, str]]] = None) -> Dict[str, object]:
+    """
+    #timeTableStyle as {"periods": {"theory"|"lab": [{period, start, end}]},
+                        "classes": [{day, kind, period, start, end, slot, course_code, course_type,
+                                     venue, class_group, course_title, faculty}]}.
+    `registered` (registered_courses_rows output) fills course_title / faculty by code + slot.
+    """
+    root = parse_html(html_or_root) if isinstance(html_or_root, str) else html_or_root
+    tbl = root.find("table", id="timeTableStyle")
+    if tbl is None:
+        return {"periods": {}, "classes": []}
+    times: Dict[str, Dict[str, Dict[int, str]]] = {}
+    cells = []   # (day, kind, col, text)
+    kind = day = None
+    for row in _expand_grid(tbl):
+        if len(row) < 3:
+            continue
+        c0, c1 = row[0].upper(), row[1].strip().lower()
+        if c1 in ("start", "end"):
+            kind = c0.lower() if c0 in ("THEORY", "LAB") else kind
+            if kind:
+                for i, v in enumerate(row[2:], 2):
+                    if _TIME_RE.match(v):
+                        times.setdefault(kind, {"start": {}, "end": {}})[c1][i] = v
+            continue
+        if c0[:3] in _DAYS and c1 in ("theory", "lab"):
+            day, kind = c0[:3], c1
+            cells += [(day, kind, i, v) for i, v in enumerate(row[2:], 2)]
+
+    periods, numbering = {}, {}
+    for k, t in times.items():
+        cols = sorted(t["start"])
+        numbering[k] = {c: n for n, c in enumerate(cols, 1)}
+        periods[k] = [{"period": n, "start": t["start"][c], "end": t["end"].get(c, "")}
+                      for n, c in enumerate(cols, 1)]
+
+    reg = _registered_index(registered or [])
+    classes = []
+    for day, k, col, text in cells:
+        info = _course_cell(text)
+        if not info or col not in numbering.get(k, {}):
+            continue
+        classes.append({
+            "day": day, "kind": k, "period": numbering[k][col],
+            "start": times[k]["start"][col], "end": times[k]["end"].get(col, ""),
+            **info,
+            **reg.get((info["course_code"], info["slot"]), {"course_title": "", "faculty": ""}),
+        })
+    return {"periods": periods, "classes": classes}
+
+
+# ---------------------- academic calendar months ----------------------
+MONTH_NAMES = ["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"]
+_LONG_MONTHS = {
+    "January":"Jan","February":"Feb","March":"Mar","April":"Apr","May":"May","June":"Jun",
+    "July":"Jul","August":"Aug","September":"Sep","October":"Oct","November":"Nov","December":"Dec"
+}
+_CAL_ONCLICK_RE = re.compile(r"processViewCalendar\(\s*'([^']+)'(?:\s*,\s*'(\d{4})')?")
+_MONTH_IN_DATE_RE = re.compile(r"([A-Za-z]{3,9})[-\s](\d{4})")
+
+def norm_month_label(label: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Normalize various month label shapes into ('Jan', '2025') or ('Jan', '')
+    Accepts: 'JUL-2025', 'July 2025', 'Jul_2025', 'Jul', 'JUL', etc.
+    Returns (mon3, year_str) or (None, None) if not a month.
+    """
+    s = (label or "").strip()
+    if not s:
+        return None, None
+
+    # unify separators and case
+    s = s.replace("_", "-").replace("/", "-").replace("  ", " ")
+    # Try "Mon-YYYY" or "Mon YYYY" or "Month YYYY"
+    m = re.match(r"^\s*([A-Za-z]{3,9})[-\s]?(\d{4})?\s*$", s)
+    if not m:
+        return None, None
+    mon = m.group(1)[:3].title()
+    yr  = (m.group(2) or "").strip()
+    if mon not in MONTH_NAMES:
+        mon = _LONG_MONTHS.get(m.group(1).title(), mon)
+    if mon not in MONTH_NAMES:
+        return None, None
+    return mon, yr
+
+def month_sort_key(label: str) -> Tuple[int, int]:
+    """(year, month index) for chronological sorting; unknown parts sort last/first."""
+    mon, yr = norm_month_label(label)
+    m = MONTH_NAMES.index(mon) if mon in MONTH_NAMES else 99
+    y = int(yr) if (yr and yr.isdigit()) else 0
+    return (y, m)
+
+def month_controls(items: Iterable[Tuple]) -> List[Tuple]:
+    """
+    (label, *rest) month controls -> same tuples with labels normalized ('Jul 2025'),
+    non-months dropped, first one per month kept, in chronological order.
+    """
+    out, seen = [], set()
+    for lbl, *rest in items:
+        mon, yr = norm_month_label(lbl)
+        if not mon:
+            continue
+        label = f"{mon} {yr}".strip()
+        if label in seen:
+            continue
+        seen.add(label)
+        out.append((label, *rest))
+    out.sort(key=lambda t: month_sort_key(t[0]))
+    return out
+
+def _onclick_month(js: str) -> Optional[str]:
+    """Month label from processViewCalendar('Jul','2025') or processViewCalendar('01-JUL-2025')."""
+    m = _CAL_ONCLICK_RE.search(js or "")
+    if not m:
+        return None
+    first, year = m.group(1), m.group(2)
+    mon, yr = norm_month_label(f"{first} {year or ''}")
+    if not mon:
+        d = _MONTH_IN_DATE_RE.search(first)
+        mon, yr = norm_month_label(f"{d.group(1)} {d.group(2)}") if d else (None, None)
+    return f"{mon} {yr}".strip() if mon else None
+
+def calendar_month_labels(html_or_root) -> List[str]:
+    """
+    Month labels ('Jul 2025', ...) offered by the calendar page, chronologically.
+    Same candidates Login._find_month_controls looks at: link/button text, title,
+    data-month, and processViewCalendar(...) onclicks.
+    """
+    root = parse_html(html_or_root) if isinstance(html_or_root, str) else html_or_root
+    seen, out = set(), []
+    for el in list(root.iter("a")) + list(root.iter("button")):
+        lbl = el.text.strip() or el.get("title").strip() or el.get("data-month").strip()
+        mon, yr = norm_month_label(lbl)
+        label = f"{mon} {yr}".strip() if mon else None
+        if not label and not lbl:
+            label = _onclick_month(el.get("onclick"))
+        if label and label not in seen:
+            seen.add(label)
+            out.append(label)
+    out.sort(key=month_sort_key)
+    return out
+
+
+# ---------------------- academic calendar events ----------------------
+# (type, pattern) checked in order against a day's lower-cased description
+_EVENT_TYPES = [
+    ("no_instruction", re.compile(r"\bno[n\s-]*instructional\b")),
+    ("holiday", re.compile(r"\b(holiday|vacation|break|festival)\b")),
+    ("exam", re.compile(r"\b(cat|fat|exam(ination)?s?|assessment|quiz|test)\b")),
+    ("instructional", re.compile(r"\b(instructional|working) day\b")),
+]
+_DAY_CELL_RE = re.compile(r"^(\d{1,2})\b\s*(.*)$")
+
+def event_type(description: str) -> str:
+    d = description.lower()
+    for kind, rx in _EVENT_TYPES:
+        if rx.search(d):
+            return kind
+    return "other"
+
+def _month_year(label: Optional[str], root: Node) -> Tuple[Optional[int], Optional[int]]:
+    """(year, month 1-12) from the label ('Jul 2025', '01-JUL-2025', 'Jul_2025') or the fragment's heading."""
+    candidates = [label or ""]
+    candidates += [h.text for tag in ("h3", "h4", "h5", "caption", "th") for h in root.iter(tag)]
+    for c in candidates:
+        c = c.replace("_", " ")
+        m = _MONTH_IN_DATE_RE.search(c)
+        mon, yr = norm_month_label(f"{m.group(1)} {m.group(2)}") if m else norm_month_label(c)
+        if mon and yr:
+            return int(yr), MONTH_NAMES.index(mon) + 1
+    return None, None
+
+def calendar_events_from_html(html_or_root, month_label: Optional[str] = None) -> List[Dict[str, str]]:
+    """
+    Day cells of one month's calendar grid as
+    [{"date": "2025-07-01", "type": "instructional|holiday|exam|no_instruction|other", "description"}].
+    Cells without text besides the day number are skipped.
+    """
+    root = parse_html(html_or_root) if isinstance(html_or_root, str) else html_or_root
+    year, month = _month_year(month_label, root)
+    if not year:
+        return []
+    out, seen = [], set()
+    for td in root.iter("td"):
+        lines = td.text.split("\n")
+        m = _DAY_CELL_RE.match(lines[0]) if lines else None
+        if not m:
+            continue
+        desc = "; ".join(x for x in [m.group(2).strip()] + [ln.strip() for ln in lines[1:]] if x)
+        try:
+            day = datetime.date(year, month, int(m.group(1)))
+        except ValueError:
+            continue
+        if not desc or day in seen:
+            continue
+        seen.add(day)
+        out.append({"date": day.isoformat(), "type": event_type(desc), "description": desc})
+    return out
+
+def _ics_text(s: str) -> str:
+    return s.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+def _ics_fold(line: str) -> str:
+    """RFC 5545: lines longer than 75 octets continue on the next line after a space."""
+    raw = line.encode("utf-8")
+    if len(raw) <= 75:
+        return line
+    parts, cur = [], b""
+    for ch in line:
+        b = ch.encode("utf-8")
+        if len(cur) + len(b) > (75 if not parts else 74):
+            parts.append(cur.decode("utf-8"))
+            cur = b""
+        cur += b
+    parts.append(cur.decode("utf-8"))
+    return "\r\n ".join(parts)
+
+def events_to_ics(events: List[Dict[str, str]], name: str = "VTOP Academic Calendar") -> str:
+    """All-day VEVENTs. Deterministic (no wall-clock DTSTAMP) so unchanged calendars stay byte-identical."""
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//ForeSync//VTOP Academic Calendar//EN",
+             "CALSCALE:GREGORIAN", f"X-WR-CALNAME:{_ics_text(name)}"]
+    for ev in events:
+        day = datetime.date.fromisoformat(ev["date"])
+        uid = hashlib.sha1(f"{ev['date']}|{ev['description']}".encode("utf-8")).hexdigest()[:20]
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:{uid}@foresync",
+            f"DTSTAMP:{day:%Y%m%d}T000000Z",
+            f"DTSTART;VALUE=DATE:{day:%Y%m%d}",
+            f"DTEND;VALUE=DATE:{day + datetime.timedelta(days=1):%Y%m%d}",
+            f"SUMMARY:{_ics_text(ev['description'])}",
+            f"CATEGORIES:{ev['type'].upper()}",
+            "TRANSP:TRANSPARENT",
+            "END:VEVENT",
+        ]
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(_ics_fold(ln) for ln in lines) + "\r\n"
+
+
+# ---------------------- bulk re-parse / fixture check ----------------------
+# kind -> parser(html). Saved pages are named "<kind>[_anything].html"; expected
+# output in the corpus sits next to them as "<stem>.<kind>.json".
+PARSERS = {
+    "attendance": lambda html: attendance_from_html(html),
+    "attendance_counts": lambda html: attendance_from_html(html, only_counts=True),
+    "registered_courses": registered_courses_from_html,
+    "timetable_grid": lambda html: timetable_grid_from_html(html, registered_courses_from_html(html)),
+    "calendar_months": calendar_month_labels,
+    "calendar_events": calendar_events_from_html,
+}
+_PAGE_KINDS = {  # filename prefix -> default parser
+    "attendance": "attendance",
+    "timetable": "registered_courses",
+    "calendar_month": "calendar_events",   # one month's grid (label from the filename)
+    "calendar": "calendar_months",
+}
+
+def kind_for(path: str) -> Optional[str]:
+    name = os.path.basename(path).lower()
+    for prefix, kind in _PAGE_KINDS.items():
+        if name.startswith(prefix):
+            return kind
+    return None
+
+def parse_file(path: str, kind: Optional[str] = None):
+    kind = kind or kind_for(path)
+    if kind not in PARSERS:
+        raise ValueError(f"{path}: unknown page kind {kind!r}")
+    with open(path, encoding="utf-8", errors="replace") as f:
+        html = f.read()
+    if kind == "calendar_events":  # month comes from the name, e.g. calendar_month_01-JUL-2025.html
+        return calendar_events_from_html(html, month_label=os.path.basename(path))
+    return PARSERS[kind](html)
+
+def _parse_job(args):
+    path, kind = args
+    try:
+        return path, parse_file(path, kind), None
+    except Exception as e:
+        return path, None, str(e) or e.__class__.__name__
+
+def verify_corpus(corpus_dir: str) -> List[Tuple[str, str, Optional[str]]]:
+    """[(expected_json, kind, error or None)] for every <stem>.<kind>.json in the corpus."""
+    results = []
+    for name in sorted(os.listdir(corpus_dir)):
+        parts = name.rsplit(".", 2)
+        if len(parts) != 3 or parts[2] != "json" or parts[1] not in PARSERS:
+            continue
+        stem, kind = parts[0], parts[1]
+        html_path = os.path.join(corpus_dir, stem + ".html")
+        if not os.path.exists(html_path):
+            results.append((name, kind, f"missing {stem}.html"))
+            continue
+        with open(os.path.join(corpus_dir, name), encoding="utf-8") as f:
+            expected = json.load(f)
+        got = parse_file(html_path, kind)
+        results.append((name, kind, None if got == expected else "output differs"))
+    return results
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="vtop_parse", description="Parse saved VTOP pages without a browser.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p_parse = sub.add_parser("parse", help="parse saved pages (files or directories of *.html)")
+    p_parse.add_argument("paths", nargs="+")
+    p_parse.add_argument("--kind", choices=sorted(PARSERS), help="parser to use (default: from filename)")
+    p_parse.add_argument("--out", help="write <stem>.<kind>.json here instead of JSON lines on stdout")
+    p_parse.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    p_verify = sub.add_parser("verify", help="check parsers against the fixture corpus")
+    p_verify.add_argument("corpus", nargs="?", default=os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), os.pardir, "fixtures", "vtop"))
+    a = ap.parse_args(argv)
+
+    if a.cmd == "verify":
+        results = verify_corpus(a.corpus)
+        for name, kind, err in results:
+            print(f"{'FAIL' if err else 'ok  '} {name}" + (f": {err}" if err else ""))
+        failed = sum(1 for r in results if r[2])
+        print(f"{len(results) - failed}/{len(results)} fixtures match")
+        return 1 if failed or not results else 0
+
+    files = []
+    for p in a.paths:
+        if os.path.isdir(p):
+            files += sorted(os.path.join(p, n) for n in os.listdir(p) if n.endswith(".html"))
+        else:
+            files.append(p)
+    jobs = [(f, a.kind or kind_for(f)) for f in files]
+    if a.out:
+        os.makedirs(a.out, exist_ok=True)
+
+    t0 = time.perf_counter()
+    errors = 0
+    with ProcessPoolExecutor(max_workers=max(1, a.jobs)) as ex:
+        for (path, kind), (_, result, err) in zip(jobs, ex.map(_parse_job, jobs, chunksize=8)):
+            if err:
+                errors += 1
+                print(f"⚠️ {path}: {err}", file=sys.stderr)
+                continue
+            if a.out:
+                stem = os.path.splitext(os.path.basename(path))[0]
+                with open(os.path.join(a.out, f"{stem}.{kind}.json"), "w", encoding="utf-8") as f:
+                    json.dump(result, f, indent=2, ensure_ascii=False)
+            else:
+                print(json.dumps({"path": path, "kind": kind, "result": result}, ensure_ascii=False))
+    print(f"parsed {len(jobs) - errors}/{len(jobs)} pages in {time.perf_counter() - t0:.2f}s",
+          file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
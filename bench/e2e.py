@@ -0,0 +1,225 @@
+# e2e.py
+"""
+End-to-end latency benchmark: /start -> /jobs/run -> /file, against real headless
+Chrome and the local mock VTOP (bench/mock_vtop.py).
+- By default starts the mock in-process and the API (uvicorn api:app, from app/) as a
+  child pointed at it via VTOP_ROOT, with the results cache off so every run hits Chrome.
+  --api / --mock-root use servers that are already running instead (a running API
+  keeps whatever VTOP_ROOT it was started with).
+- Per-stage seconds come from the job's stage progress; 'start', 'run' (job submit
+  to done), 'files' (every artifact fetched) and 'total' are measured by the client.
+- Prints p50 / p95 / max per stage; --json writes every run plus the summary.
+
+    python bench/e2e.py --runs 10 --concurrency 2 --latency-ms 80 --modal
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import mock_vtop
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+
+
+# ---------------------- client ----------------------
+def _call(base: str, method: str, path: str, body: Optional[Dict[str, Any]] = None, timeout: float = 180):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(base + path, data=data, method=method,
+                                 headers={"Content-Type": "application/json"} if data else {})
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        raw = resp.read()
+    return json.loads(raw) if raw[:1] in (b"{", b"[") else raw
+
+
+def _artifacts(result: Dict[str, Any]) -> List[str]:
+    paths = [result.get(k) for k in ("timetable_png", "attendance_counts_json", "registered_courses_json",
+                                     "timetable_html", "timetable_json", "calendar_json", "calendar_ics")]
+    paths += result.get("calendar_pngs") or []
+    paths += result.get("calendar_html") or []
+    return [p for p in paths if p]
+
+
+def one_run(base: str, i: int, args) -> Dict[str, Any]:
+    out: Dict[str, Any] = {"run": i, "ok": False, "stages": {}}
+    t0 = time.perf_counter()
+    try:
+        st = _call(base, "POST", "/start")
+        t1 = time.perf_counter()
+        out["stages"]["start"] = t1 - t0
+        job = _call(base, "POST", "/jobs/run", {
+            "session_id": st["session_id"], "username": f"21MCK{i:04d}", "password": args.password,
+            "captcha_text": args.captcha, "fast_path": args.fast_path, "parallel": args.parallel,
+        })
+        while True:
+            snap = _call(base, "GET", f"/jobs/{job['job_id']}")
+            if snap["status"] in ("done", "failed"):
+                break
+            time.sleep(args.poll)
+        t2 = time.perf_counter()
+        out["stages"]["run"] = t2 - t1
+        for name, stage in (snap.get("stages") or {}).items():
+            if stage.get("seconds") is not None:
+                out["stages"][name] = stage["seconds"]
+        result = snap.get("result") or {}
+        if snap["status"] != "done" or not result.get("ok"):
+            out["error"] = snap.get("error") or result.get("message") or snap["status"]
+            return out
+        files = _artifacts(result)
+        for p in files:
+            _call(base, "GET", "/file?" + urllib.parse.urlencode({"path": p}))
+        t3 = time.perf_counter()
+        out["stages"]["files"] = t3 - t2
+        out["files"] = len(files)
+        out["ok"] = True
+    except (urllib.error.URLError, OSError, KeyError, ValueError) as e:
+        out["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        out["stages"]["total"] = time.perf_counter() - t0
+    return out
+
+
+# ---------------------- report ----------------------
+def _pct(xs: List[float], q: float) -> float:
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, max(0, round(q * (len(xs) - 1))))]
+
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    by_stage: Dict[str, List[float]] = {}
+    for r in runs:
+        if not r["ok"]:
+            continue
+        for name, secs in r["stages"].items():
+            by_stage.setdefault(name, []).append(secs)
+    return {name: {"n": len(xs), "p50": statistics.median(xs), "p95": _pct(xs, 0.95), "max": max(xs)}
+            for name, xs in by_stage.items()}
+
+
+def print_report(summary: Dict[str, Dict[str, float]], runs: List[Dict[str, Any]], wall: float):
+    ok = sum(r["ok"] for r in runs)
+    print(f"\n{ok}/{len(runs)} runs ok in {wall:.1f}s")
+    for r in runs:
+        if not r["ok"]:
+            print(f"  run {r['run']} failed: {r.get('error')}")
+    if not summary:
+        return
+    client = ("start", "run", "files", "total")
+    order = [s for s in summary if s not in client] + [s for s in client if s in summary]
+    print(f"\n{'stage':<22}{'n':>4}{'p50':>9}{'p95':>9}{'max':>9}")
+    for name in order:
+        s = summary[name]
+        print(f"{name:<22}{s['n']:>4}{s['p50']:>9.2f}{s['p95']:>9.2f}{s['max']:>9.2f}")
+
+
+# ---------------------- servers ----------------------
+def _wait_up(base: str, proc: Optional[subprocess.Popen], timeout: float):
+    end = time.time() + timeout
+    while time.time() < end:
+        if proc is not None and proc.poll() is not None:
+            raise RuntimeError(f"API exited with code {proc.returncode}")
+        try:
+            _call(base, "GET", "/", timeout=2)
+            return
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.3)
+    raise RuntimeError(f"API not up at {base} after {timeout:.0f}s")
+
+
+def spawn_api(port: int, vtop_root: str, args) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update({
+        "VTOP_ROOT": vtop_root,
+        "RESULT_FRESH_SEC": "0",        # measure the browser, not the results cache
+        "PER_CLIENT_MAX": str(max(2, args.concurrency)),
+        "MAX_DRIVERS": env.get("MAX_DRIVERS", str(max(8, args.concurrency + 2))),
+    })
+    cmd = [sys.executable, "-m", "uvicorn", "api:app", "--host", "127.0.0.1", "--port", str(port),
+           "--log-level", "warning"]
+    return subprocess.Popen(cmd, cwd=APP_DIR, env=env, stdout=None if args.verbose else subprocess.DEVNULL,
+                            stderr=None if args.verbose else subprocess.DEVNULL)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="End-to-end /start -> /run -> /file benchmark against mock VTOP")
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--concurrency", type=int, default=1)
+    ap.add_argument("--warmup", type=int, default=1, help="runs discarded before measuring")
+    ap.add_argument("--api", default=None, help="use a running API (e.g. http://127.0.0.1:8000) instead of spawning one")
+    ap.add_argument("--api-port", type=int, default=8099)
+    ap.add_argument("--mock-root", default=None, help="use a running mock VTOP instead of starting one")
+    ap.add_argument("--latency-ms", type=float, default=0)
+    ap.add_argument("--jitter-ms", type=float, default=0)
+    ap.add_argument("--modal", action="store_true", help="mock shows the 'important info' popup after login")
+    ap.add_argument("--captcha", default="MOCK42")
+    ap.add_argument("--password", default="mock")
+    ap.add_argument("--fast-path", action=argparse.BooleanOptionalAction, default=None)
+    ap.add_argument("--parallel", action=argparse.BooleanOptionalAction, default=None)
+    ap.add_argument("--poll", type=float, default=0.1, help="job polling interval (s)")
+    ap.add_argument("--startup-timeout", type=float, default=60)
+    ap.add_argument("--json", default=None, help="write runs + summary here")
+    ap.add_argument("-v", "--verbose", action="store_true")
+    args = ap.parse_args(argv)
+
+    mock = proc = None
+    if args.mock_root or args.api:
+        vtop_root = args.mock_root or "(the API's VTOP_ROOT)"
+    else:
+        mock, vtop_root = mock_vtop.serve_in_thread(captcha=args.captcha, password=args.password,
+                                                    latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                                                    modal=args.modal, verbose=args.verbose)
+    base = (args.api or f"http://127.0.0.1:{args.api_port}").rstrip("/")
+    try:
+        if not args.api:
+            proc = spawn_api(args.api_port, vtop_root, args)
+        _wait_up(base, proc, args.startup_timeout)
+        print(f"API {base}  mock VTOP {vtop_root}  runs={args.runs} concurrency={args.concurrency}")
+
+        for i in range(args.warmup):
+            r = one_run(base, -1 - i, args)
+            print(f"warmup {i}: {'ok' if r['ok'] else r.get('error')}  {r['stages']['total']:.2f}s")
+
+        done = threading.Lock()
+        runs: List[Dict[str, Any]] = []
+
+        def job(i):
+            r = one_run(base, i, args)
+            with done:
+                runs.append(r)
+                print(f"run {i}: {'ok' if r['ok'] else 'FAILED'}  {r['stages']['total']:.2f}s")
+            return r
+
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as ex:
+            list(ex.map(job, range(args.runs)))
+        wall = time.perf_counter() - t0
+
+        runs.sort(key=lambda r: r["run"])
+        summary = summarize(runs)
+        print_report(summary, runs, wall)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump({"args": vars(args), "wall_sec": wall, "summary": summary, "runs": runs}, f, indent=2)
+        return 0 if runs and all(r["ok"] for r in runs) else 1
+    finally:
+        if proc is not None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=20)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        if mock is not None:
+            mock.shutdown()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+# micro.py
+"""
+Micro-benchmarks for the pure-Python hot spots (no browser, no network):
+- attendance: vtop_parse.attendance_payload, full rows and only_counts (scrape_attendance)
+- months:     norm_month_label over VTOP's label shapes, and vtop_parse.month_controls
+              (the normalize / dedupe / sort behind Login._find_month_controls)
+- courses:    vtop_parse.course_codes (GET /courses) over registered-course records
+- json:       the payload dumps the API writes (indent=2 attendance, compact grid / events)
+Inputs are synthetic and seeded (--seed), from VTOP-sized up to large tables / calendars.
+Each case reports ops/sec (best of --repeat timeit rounds) and, from tracemalloc, the peak
+bytes allocated during one call and the bytes still held after it (mostly the result).
+
+    python bench/micro.py                     # everything
+    python bench/micro.py -k attendance -k json --repeat 7 --json micro.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+import vtop_parse  # noqa: E402
+
+SIZES = (10, 100, 1000, 10000)
+
+_PREFIXES = ("BCSE", "BMAT", "BPHY", "BECE", "BSTS", "BHUM", "CSE", "MAT", "EEE", "ME")
+_TYPES = ("Theory Only", "Lab Only", "Embedded Theory", "Embedded Lab", "Soft Skill")
+_ATT_HEAD = ["Sl.No.", "Course Code", "Course Title", "Course Type", "Slot", "Faculty Name",
+             "Attendance Type", "Registration Date / Time", "Attendance Date", "Attended Classes",
+             "Total Classes", "Attendance Percentage", "Status", "Attendance View"]
+
+
+# ---------------------- synthetic inputs ----------------------
+def _code(rng: random.Random) -> str:
+    return f"{rng.choice(_PREFIXES)}{rng.randint(100, 599)}{rng.choice('LPE')}"
+
+
+def _cell(text: str, ps: List[str] = (), href: str = "", onclick: str = "") -> Dict[str, Any]:
+    return {"text": text, "ps": list(ps), "href": href, "onclick": onclick}
+
+
+def attendance_table(n: int, rng: random.Random) -> Dict[str, Any]:
+    """Table data (vtop_parse.table_data shape) for an n-course attendance summary + credits footer."""
+    rows = []
+    for i in range(n):
+        code, total = _code(rng), rng.randint(20, 60)
+        attended = rng.randint(0, total)
+        slot = f"{rng.choice('ABCDEFG')}{rng.randint(1, 2)}+T{rng.choice('ABCDEFG')}{rng.randint(1, 2)}"
+        v = [str(i + 1), code, f"Course Title {i}", rng.choice(_TYPES), slot, f"FACULTY {i}",
+             "Regular", "05-Jul-2025 10:15", "29-Oct-2025", str(attended), str(total),
+             str(attended * 100 // total), "Debarred" if attended * 4 < total * 3 else "Eligible"]
+        cells = [_cell(t) if j in (0, 6, 7, 8, 9, 10, 11, 12) else _cell(t, [t]) for j, t in enumerate(v)]
+        cells[5] = _cell(f"FACULTY {i} SCOPE", [f"FACULTY {i}", "SCOPE"])
+        cells.append(_cell("View", href="javascript:void(0);",
+                           onclick=f"javascript:processViewAttendanceDetail('CH2025{i:06d}','{slot}');"))
+        rows.append({"text": " ".join(v) + " View", "cells": cells})
+    credits = f"Total Number Of Credits: {n * 3}"
+    rows.append({"text": credits, "cells": [_cell(credits)]})
+    return {"id": "AttendanceDetailDataTable", "headers": list(_ATT_HEAD), "thead": list(_ATT_HEAD), "rows": rows}
+
+
+def month_labels(n: int, rng: random.Random) -> List[str]:
+    """n calendar link texts in VTOP's (and the fallbacks') shapes, plus non-month noise, shuffled."""
+    out = []
+    for _ in range(n):
+        m, y = rng.randrange(12), rng.randint(2015, 2030)
+        short, long_ = vtop_parse.MONTH_NAMES[m], ("January February March April May June July August "
+                                                   "September October November December").split()[m]
+        out.append(rng.choice((f"{short.upper()}-{y}", f"{long_} {y}", f"{short}_{y}", f"{short} {y}",
+                               short.upper(), f"01-{short.upper()}-{y}", "Back", "Search", "")))
+    return out
+
+
+def registered_rows(n: int, rng: random.Random) -> List[Dict[str, str]]:
+    """n records as registered_courses_rows() writes them to registered_courses.json."""
+    out = []
+    for i in range(n):
+        code = _code(rng)
+        out.append({"Sl.No.": str(i + 1), "Class Group": "General (Semester)",
+                    "Course": f"{code} - Course Title {i} ( {rng.choice(_TYPES)} )",
+                    "LTPJC": "3 0 0 0 3", "Category": "Program Core", "Registration Option": "Regular",
+                    "Class Id": f"CH2025{i:06d}", "Slot - Venue": f"A1+TA1 - AB1-{rng.randint(100, 999)}",
+                    "Faculty Details": f"FACULTY {i} - SCOPE", "Registered Date & Time": "05-Jul-2025 10:15",
+                    "Status": "Registered and Approved", "CourseCode": code, "Slot": "A1+TA1"})
+    return out
+
+
+def calendar_events(n_months: int, rng: random.Random) -> List[Dict[str, str]]:
+    """calendar_events_from_html-shaped events for n_months consecutive months."""
+    out = []
+    for k in range(n_months):
+        y, m = 2020 + k // 12, k % 12 + 1
+        for d in range(1, 29):
+            desc = rng.choice(("Instructional Day", "No Instructional Day", "Holiday - Festival",
+                               "Last Instructional Day for Theory Classes", "Instructional Day"))
+            out.append({"date": f"{y:04d}-{m:02d}-{d:02d}", "type": vtop_parse.event_type(desc),
+                        "description": desc})
+    return out
+
+
+def timetable_grid(n_courses: int, rng: random.Random) -> Dict[str, Any]:
+    """timetable_grid_from_html-shaped grid, n_courses classes spread over the week."""
+    periods = {kind: [{"period": i + 1, "start": f"{8 + i:02d}:00", "end": f"{8 + i:02d}:50"} for i in range(12)]
+               for kind in ("theory", "lab")}
+    classes = []
+    for i in range(n_courses):
+        p = rng.randrange(12)
+        classes.append({"day": rng.choice(("MON", "TUE", "WED", "THU", "FRI")), "kind": rng.choice(("theory", "lab")),
+                        "period": p + 1, "start": f"{8 + p:02d}:00", "end": f"{8 + p:02d}:50", "slot": "A1",
+                        "course_code": _code(rng), "course_type": "TH", "venue": f"SJT{rng.randint(100, 999)}",
+                        "class_group": "ALL", "course_title": f"Course Title {i}", "faculty": f"FACULTY {i}"})
+    return {"periods": periods, "classes": classes}
+
+
+# ---------------------- serializers (as the API calls them) ----------------------
+def _dump_indented(payload) -> str:   # api._write_json / scrape_attendance
+    return json.dumps(payload, indent=2, ensure_ascii=False)
+
+
+def _dump_compact(payload) -> str:    # timetable.json / calendar.json
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+
+def cases(rng: random.Random, sizes=SIZES) -> List[Tuple[str, Callable[[], Any]]]:
+    out = []
+    for n in sizes:
+        tbl = attendance_table(n, rng)
+        out.append((f"attendance.payload[{n}]", lambda t=tbl: vtop_parse.attendance_payload(t, note="Note")))
+        out.append((f"attendance.counts[{n}]", lambda t=tbl: vtop_parse.attendance_payload(t, only_counts=True)))
+    for n in sizes:
+        labels = month_labels(n, rng)
+        out.append((f"months.norm_label[{n}]", lambda ls=labels: [vtop_parse.norm_month_label(x) for x in ls]))
+        raw = [(x, None, None) for x in labels]   # _find_month_controls' (label, element, onclick)
+        out.append((f"months.sort_controls[{n}]", lambda r=raw: vtop_parse.month_controls(r)))
+    for n in sizes:
+        rows = registered_rows(n, rng)
+        out.append((f"courses.codes[{n}]", lambda r=rows: vtop_parse.course_codes(r)))
+    for n in sizes:
+        payload = vtop_parse.attendance_payload(attendance_table(n, rng))
+        out.append((f"json.attendance_indent[{n}]", lambda p=payload: _dump_indented(p)))
+        out.append((f"json.grid_compact[{n}]", lambda g=timetable_grid(n, rng): _dump_compact(g)))
+    for months in (6, 60, 600):
+        ev = calendar_events(months, rng)
+        out.append((f"json.calendar_events[{months}mo]", lambda e=ev: _dump_compact(e)))
+    return out
+
+
+# ---------------------- measuring ----------------------
+def measure(fn: Callable[[], Any], repeat: int, min_time: float) -> Dict[str, float]:
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()          # loops per round so one round takes >= 0.2s
+    number = max(1, int(number * min_time / 0.2))
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+
+    fn()   # warm caches (re, interned strings) before counting allocations
+    tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        result = fn()
+        held, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return {"ops_per_sec": 1 / best, "sec_per_op": best, "loops": number,
+            "peak_alloc_bytes": peak - base, "held_bytes": held - base}
+
+
+def _human(n: float) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(n) < 1024 or unit == "GiB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Micro-benchmarks for parsing / normalization / serialization")
+    ap.add_argument("-k", action="append", default=[], help="only cases whose name contains this (repeatable)")
+    ap.add_argument("--repeat", type=int, default=5, help="timeit rounds; the best one is reported")
+    ap.add_argument("--min-time", type=float, default=0.2, help="seconds per round (approx.)")
+    ap.add_argument("--max-size", type=int, default=max(SIZES), help="skip input sizes above this")
+    ap.add_argument("--seed", type=int, default=1234)
+    ap.add_argument("--json", default=None, help="write results here")
+    ap.add_argument("--list", action="store_true", help="list case names and exit")
+    args = ap.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    todo = [(name, fn) for name, fn in cases(rng, [n for n in SIZES if n <= args.max_size])
+            if not args.k or any(k in name for k in args.k)]
+    if args.list:
+        print("\n".join(name for name, _ in todo))
+        return 0
+
+    print(f"python {sys.version.split()[0]}  seed={args.seed}  repeat={args.repeat}")
+    print(f"{'case':<34}{'ops/sec':>12}{'us/op':>12}{'peak alloc':>13}{'held':>11}")
+    results = {}
+    for name, fn in todo:
+        r = results[name] = measure(fn, args.repeat, args.min_time)
+        print(f"{name:<34}{r['ops_per_sec']:>12,.1f}{r['sec_per_op'] * 1e6:>12,.1f}"
+              f"{_human(r['peak_alloc_bytes']):>13}{_human(r['held_bytes']):>11}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version, "seed": args.seed, "repeat": args.repeat, "results": results},
+                      f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
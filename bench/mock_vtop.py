@@ -0,0 +1,407 @@
+# mock_vtop.py
+"""
+Local stand-in for VTOP, for benchmarks and end-to-end runs without touching
+vtopcc.vit.ac.in. Serves the same shapes the scraper and vtop_http rely on:
+- /vtop/login: Student role button, username / password / text captcha (PNG data URI),
+  POST -> 302 /vtop/content, or the login page again with VTOP's error text.
+- /vtop/content: shell with _csrf / authorizedID, graduation-cap sidebar and
+  a.systemBtnMenu links whose data-url loaders fill #main-section over XHR.
+- Timetable and attendance fragments from fixtures/vtop, the semester dropdown's
+  processView* posts, and an academic calendar with generated month grids.
+Knobs: per-request latency (+ jitter) and the "important info" modal on /vtop/content.
+
+    python bench/mock_vtop.py --port 8765 --latency-ms 120 --modal
+    VTOP_ROOT=http://127.0.0.1:8765 uvicorn api:app     # from app/
+"""
+import argparse
+import base64
+import calendar
+import html
+import io
+import os
+import random
+import re
+import secrets
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image, ImageDraw
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "fixtures", "vtop")
+
+SEMESTERS = [("VL20252601", "Fall Semester 2025-26"), ("VL20242505", "Winter Semester 2024-25")]
+CLASS_GROUPS = [("ALL", "ALL"), ("WEEKEND", "Weekend Intra Semester")]
+# semester -> months shown in the academic calendar
+CALENDAR_MONTHS = {
+    "VL20252601": [(2025, m) for m in (7, 8, 9, 10, 11)],
+    "VL20242505": [(2024, 12)] + [(2025, m) for m in (1, 2, 3, 4)],
+}
+HOLIDAYS = {(8, 15): "Holiday - Independence Day", (10, 2): "Holiday - Gandhi Jayanthi",
+            (1, 26): "Holiday - Republic Day", (1, 14): "Holiday - Pongal"}
+
+_SEM_SELECT_RE = re.compile(r'<select[^>]*id="semesterSubId".*?</select>', re.S)
+
+
+def _fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def _options(items: List[Tuple[str, str]], selected: Optional[str], placeholder: bool = False) -> str:
+    out = ['<option value="">-- Choose Semester --</option>'] if placeholder else []
+    for value, label in items:
+        sel = ' selected="selected"' if value == selected else ""
+        out.append(f'<option value="{value}"{sel}>{html.escape(label)}</option>')
+    return "\n".join(out)
+
+
+def _semester_select(selected: Optional[str]) -> str:
+    return (f'<select class="form-control" id="semesterSubId" name="semesterSubId">\n'
+            f'{_options(SEMESTERS, selected or SEMESTERS[0][0])}\n</select>')
+
+
+def _captcha_png_b64(text: str) -> str:
+    im = Image.new("RGB", (180, 45), "white")
+    d = ImageDraw.Draw(im)
+    for i in range(6):
+        d.line([(0, 7 * i), (180, 45 - 7 * i)], fill=(200, 200, 200))
+    d.text((30, 15), " ".join(text), fill="black")
+    buf = io.BytesIO()
+    im.save(buf, format="PNG")
+    return base64.b64encode(buf.getvalue()).decode()
+
+
+# ---------------------- pages ----------------------
+def login_page(captcha: str, error: Optional[str] = None) -> str:
+    err = f'<div class="alert alert-danger" role="alert">{html.escape(error)}</div>' if error else ""
+    return f"""<!DOCTYPE html>
+<html><head><title>VTOP</title></head>
+<body>
+<div id="roles"><button type="button" class="btn btn-primary" id="stdForm"
+  onclick="document.getElementById('loginForm').style.display='block'">Student</button></div>
+<form id="loginForm" method="post" action="/vtop/login" style="display:{'block' if error else 'none'}">
+  {err}
+  <input type="text" id="username" name="username" autocomplete="off">
+  <input type="password" id="password" name="password">
+  <img alt="captcha" src="data:image/png;base64,{_captcha_png_b64(captcha)}">
+  <input type="text" id="captchaStr" name="captchaStr">
+  <button type="submit" id="submitBtn" class="btn btn-primary">Sign In</button>
+</form>
+</body></html>"""
+
+
+_SHELL_JS = r"""
+function field(name) { const el = document.querySelector('input[name=' + name + ']'); return el ? el.value : ''; }
+function post(url, data, apply) {
+  const body = new URLSearchParams(Object.assign(
+    {_csrf: field('_csrf'), authorizedID: field('authorizedID'), x: new Date().toUTCString()}, data));
+  const xhr = new XMLHttpRequest();
+  xhr.open('POST', url);
+  xhr.setRequestHeader('Content-Type', 'application/x-www-form-urlencoded');
+  xhr.setRequestHeader('X-Requested-With', 'XMLHttpRequest');
+  xhr.onload = () => apply(xhr.responseText);
+  xhr.send(body);
+}
+const into = sel => text => { document.querySelector(sel).innerHTML = text; };
+const val = id => (document.getElementById(id) || {}).value || '';
+function processViewCalendar(calDate) {
+  post('processViewCalendar', {calDate: calDate, semSubId: val('semesterSubId'), classGroupId: val('classGroupId')},
+       text => { document.getElementById('calendarMonth').outerHTML = '<div id="calendarMonth">' + text + '</div>'; });
+}
+document.addEventListener('click', e => {
+  const menuBtn = e.target.closest('button.SideBarMenuBtn');
+  if (menuBtn) { document.querySelector('.SideBarMenuDropDown').classList.toggle('show'); return; }
+  const a = e.target.closest('a.systemBtnMenu');
+  if (a) {
+    e.preventDefault();
+    window.__section = a.dataset.url;
+    document.querySelector('.SideBarMenuDropDown').classList.remove('show');
+    post(a.dataset.url, {verifyMenu: 'true', nocache: Date.now()}, into('#main-section'));
+    return;
+  }
+  if (e.target.id === 'btnClosePopup') {
+    const m = document.getElementById('infoModal');
+    m.classList.remove('show'); m.style.display = 'none';
+    document.querySelectorAll('.modal-backdrop').forEach(b => b.remove());
+  }
+});
+document.addEventListener('change', e => {
+  const id = e.target.id, sec = window.__section || '';
+  if (id === 'semesterSubId' && sec.includes('StudentTimeTableChn')) {
+    post('processViewTimeTable', {semesterSubId: e.target.value}, into('#main-section'));
+  } else if (id === 'semesterSubId' && sec.includes('StudentAttendance')) {
+    post('processViewStudentAttendance', {semesterSubId: e.target.value}, into('#main-section'));
+  } else if ((id === 'semesterSubId' || id === 'classGroupId') && sec.includes('CalendarPreview')) {
+    post('getDateForSemesterPreview', {paramReturnId: 'getDateForSemesterPreview', semSubId: val('semesterSubId'),
+                                       classGroupId: val('classGroupId')}, into('#list-wrapper'));
+  }
+});
+"""
+
+_MENU = [("academics/common/StudentTimeTableChn", "Time Table"),
+         ("academics/common/StudentAttendance", "Class Attendance"),
+         ("academics/common/CalendarPreview", "Academic Calendar")]
+
+
+def content_page(csrf: str, regno: str, modal: bool) -> str:
+    links = "\n".join(f'<a href="javascript:void(0);" class="systemBtnMenu dropdown-item" data-url="{u}">{t}</a>'
+                      for u, t in _MENU)
+    popup = """
+<div class="modal fade show" id="infoModal" style="display:block" role="dialog">
+  <div class="modal-dialog"><div class="modal-content">
+    <div class="modal-body">Important information for students.</div>
+    <div class="modal-footer"><button type="button" id="btnClosePopup" class="btn btn-secondary">Close</button></div>
+  </div></div>
+</div>
+<div class="modal-backdrop fade show"></div>""" if modal else ""
+    return f"""<!DOCTYPE html>
+<html><head><title>VTOP</title>
+<style>.dropdown-menu{{display:none}} .dropdown-menu.show{{display:block}}
+#list-wrapper{{max-height:600px;overflow:auto}}</style></head>
+<body>
+<input type="hidden" name="_csrf" value="{csrf}">
+<input type="hidden" name="authorizedID" id="authorizedID" value="{html.escape(regno)}">
+<nav><a href="/vtop/logout">Logout</a></nav>
+<div id="sidebar">
+  <button type="button" class="btn SideBarMenuBtn"><i class="fa fa-graduation-cap"></i></button>
+  <div class="SideBarMenuDropDown dropdown-menu">
+{links}
+  </div>
+</div>
+<div id="main-section"><h3>Welcome</h3></div>
+{popup}
+<script>{_SHELL_JS}</script>
+</body></html>"""
+
+
+def timetable_fragment(sem: Optional[str]) -> str:
+    return _SEM_SELECT_RE.sub(lambda _: _semester_select(sem), _fixture("timetable.html"), count=1)
+
+
+def attendance_fragment(sem: Optional[str]) -> str:
+    sel = (f'<select class="form-control" id="semesterSubId" name="semesterSubId">\n'
+           f'{_options(SEMESTERS, sem or SEMESTERS[0][0], placeholder=True)}\n</select>')
+    return _SEM_SELECT_RE.sub(lambda _: sel, _fixture("attendance.html"), count=1)
+
+
+def month_links(sem: str) -> str:
+    items = []
+    for y, m in CALENDAR_MONTHS.get(sem, CALENDAR_MONTHS[SEMESTERS[0][0]]):
+        tag = f"01-{calendar.month_abbr[m].upper()}-{y}"
+        items.append(f'<li><a href="javascript:void(0);" onclick="javascript:processViewCalendar(\'{tag}\');">'
+                     f'{calendar.month_abbr[m].upper()}-{y}</a></li>')
+    return '<ul class="list-group">\n' + "\n".join(items) + '\n</ul>\n<div id="calendarMonth"></div>'
+
+
+def calendar_fragment(sem: Optional[str], group: Optional[str]) -> str:
+    sem = sem or SEMESTERS[0][0]
+    return f"""<div id="page-wrapper">
+{_semester_select(sem)}
+<select class="form-control" id="classGroupId" name="classGroupId">
+{_options(CLASS_GROUPS, group or CLASS_GROUPS[0][0])}
+</select>
+<div id="list-wrapper">
+{month_links(sem)}
+</div>
+<button type="button" class="btn btn-primary">Back</button>
+</div>"""
+
+
+def month_grid(cal_date: str) -> str:
+    """Month grid in VTOP's markup: a <span> day number plus one <p> per event."""
+    _, mon, year = cal_date.split("-")
+    y, m = int(year), list(calendar.month_abbr).index(mon.title())
+    rows = []
+    for week in calendar.Calendar(firstweekday=6).monthdayscalendar(y, m):
+        cells = []
+        for i, day in enumerate(week):   # i: 0 = Sunday
+            if not day:
+                cells.append("<td></td>")
+                continue
+            if (m, day) in HOLIDAYS:
+                ev = f'<p style="color:red;">{HOLIDAYS[(m, day)]}</p>'
+            elif i == 6:
+                ev = "<p>No Instructional Day</p>"
+            elif i == 0:
+                ev = ""
+            else:
+                ev = '<p style="color:green;">Instructional Day</p>'
+            cells.append(f"<td><span>{day}</span>{ev}</td>")
+        rows.append("<tr>\n" + "\n".join(cells) + "\n</tr>")
+    head = "".join(f"<th>{d}</th>" for d in ("Sunday", "Monday", "Tuesday", "Wednesday",
+                                              "Thursday", "Friday", "Saturday"))
+    return f"""<div class="col-md-12">
+<h4 style="text-align:center;">{calendar.month_name[m].upper()} {y}</h4>
+<table class="calendar-table table table-bordered">
+<thead>
+<tr>{head}</tr>
+</thead>
+<tbody>
+{chr(10).join(rows)}
+</tbody>
+</table>
+</div>"""
+
+
+# ---------------------- server ----------------------
+class MockVtop:
+    def __init__(self, *, captcha: str = "MOCK42", password: str = "mock", latency_ms: float = 0,
+                 jitter_ms: float = 0, modal: bool = False, seed: Optional[int] = None):
+        self.captcha = captcha
+        self.password = password
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.modal = modal
+        self.sessions: Dict[str, Dict[str, str]] = {}   # JSESSIONID -> {regno, csrf}
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self):
+        with self._lock:
+            self.requests += 1
+            extra = self._rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0
+        if self.latency_ms or extra:
+            time.sleep((self.latency_ms + extra) / 1000)
+
+    def login(self, form: Dict[str, str]) -> Tuple[Optional[str], Optional[str]]:
+        """(new JSESSIONID, None) or (None, VTOP's error text)."""
+        if form.get("captchaStr", "").strip() != self.captcha:
+            return None, "Invalid Captcha"
+        if not form.get("username") or form.get("password") != self.password:
+            return None, "Invalid username or password"
+        sid = secrets.token_hex(16)
+        with self._lock:
+            self.sessions[sid] = {"regno": form["username"].strip().upper(), "csrf": secrets.token_hex(16)}
+        return sid, None
+
+    def session(self, cookie_header: Optional[str]) -> Optional[Dict[str, str]]:
+        for part in (cookie_header or "").split(";"):
+            k, _, v = part.strip().partition("=")
+            if k == "JSESSIONID":
+                return self.sessions.get(v)
+        return None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "MockVTOP/1.0"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def vtop(self) -> MockVtop:
+        return self.server.vtop
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def _send(self, status: int, body: str = "", headers: Optional[Dict[str, str]] = None):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _redirect(self, to: str, headers: Optional[Dict[str, str]] = None):
+        self._send(302, "", dict(headers or {}, Location=to))
+
+    def _form(self) -> Dict[str, str]:
+        n = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(n).decode("utf-8", "replace") if n else ""
+        return {k: v[-1] for k, v in urllib.parse.parse_qs(raw, keep_blank_values=True).items()}
+
+    def do_GET(self):
+        self.vtop.delay()
+        path = urllib.parse.urlsplit(self.path).path.rstrip("/")
+        sess = self.vtop.session(self.headers.get("Cookie"))
+        if path in ("", "/vtop", "/vtop/open/page", "/vtop/login"):
+            if sess and path != "/vtop/login":
+                return self._redirect("/vtop/content")
+            return self._send(200, login_page(self.vtop.captcha))
+        if path == "/vtop/content":
+            if not sess:
+                return self._redirect("/vtop/login")
+            return self._send(200, content_page(sess["csrf"], sess["regno"], self.vtop.modal))
+        if path == "/vtop/logout":
+            return self._redirect("/vtop/login", {"Set-Cookie": "JSESSIONID=; Path=/vtop; Max-Age=0"})
+        self._send(404, "<h1>Not found</h1>")
+
+    def do_POST(self):
+        self.vtop.delay()
+        path = urllib.parse.urlsplit(self.path).path.rstrip("/")
+        form = self._form()
+        if path == "/vtop/login":
+            sid, err = self.vtop.login(form)
+            if err:
+                return self._send(200, login_page(self.vtop.captcha, err))
+            return self._redirect("/vtop/content", {"Set-Cookie": f"JSESSIONID={sid}; Path=/vtop; HttpOnly"})
+
+        sess = self.vtop.session(self.headers.get("Cookie"))
+        if not sess:
+            return self._redirect("/vtop/login")
+        if form.get("_csrf") != sess["csrf"]:
+            return self._send(403, "<h1>Invalid CSRF token</h1>")
+        name = path.rsplit("/", 1)[-1]
+        sem = form.get("semesterSubId") or form.get("semSubId")
+        pages = {
+            "StudentTimeTableChn": lambda: timetable_fragment(None),
+            "processViewTimeTable": lambda: timetable_fragment(sem),
+            "StudentAttendance": lambda: attendance_fragment(None),
+            "processViewStudentAttendance": lambda: attendance_fragment(sem),
+            "CalendarPreview": lambda: calendar_fragment(None, None),
+            "getDateForSemesterPreview": lambda: month_links(sem or SEMESTERS[0][0]),
+            "processViewCalendar": lambda: month_grid(form.get("calDate", "01-JUL-2025")),
+        }
+        if name not in pages:
+            return self._send(404, "<h1>Not found</h1>")
+        self._send(200, pages[name]())
+
+
+def make_server(host: str = "127.0.0.1", port: int = 0, verbose: bool = False, **opts) -> ThreadingHTTPServer:
+    """Bound (not yet serving) mock; port 0 picks a free one (server.server_address[1])."""
+    srv = ThreadingHTTPServer((host, port), _Handler)
+    srv.daemon_threads = True
+    srv.vtop = MockVtop(**opts)
+    srv.verbose = verbose
+    return srv
+
+
+def serve_in_thread(**kwargs) -> Tuple[ThreadingHTTPServer, str]:
+    """Start a mock in a daemon thread. Returns (server, root URL); stop with server.shutdown()."""
+    srv = make_server(**kwargs)
+    threading.Thread(target=srv.serve_forever, name="mock-vtop", daemon=True).start()
+    host, port = srv.server_address[:2]
+    return srv, f"http://{host}:{port}"
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Local mock of VTOP for benchmarks")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--captcha", default="MOCK42", help="text drawn in (and accepted for) the captcha")
+    ap.add_argument("--password", default="mock", help="password accepted for any username")
+    ap.add_argument("--latency-ms", type=float, default=0, help="added to every request")
+    ap.add_argument("--jitter-ms", type=float, default=0, help="random extra latency, 0..N ms")
+    ap.add_argument("--modal", action="store_true", help="show the 'important info' popup on /vtop/content")
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("-v", "--verbose", action="store_true")
+    args = ap.parse_args(argv)
+    srv = make_server(args.host, args.port, verbose=args.verbose, captcha=args.captcha, password=args.password,
+                      latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, modal=args.modal, seed=args.seed)
+    print(f"mock VTOP on http://{args.host}:{srv.server_address[1]}  (VTOP_ROOT for the API)")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.server_close()
+
+
+if __name__ == "__main__":
+    main()
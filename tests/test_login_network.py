@@ -0,0 +1,65 @@
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+import Login  # noqa: E402
+
+
+def _entry(method, **params):
+    return {"message": json.dumps({"message": {"method": method, "params": params}})}
+
+
+class StubDriver:
+    """get_log('performance') hands out one queued batch per call, like chromedriver's drained buffer."""
+
+    def __init__(self, *batches, available=True):
+        self.batches = list(batches)
+        self.available = available
+        self.calls = 0
+
+    def get_log(self, kind):
+        assert kind == "performance"
+        self.calls += 1
+        if not self.available:
+            raise RuntimeError("performance logging not enabled")
+        return self.batches.pop(0) if self.batches else []
+
+
+POST = _entry("Network.requestWillBeSent", requestId="1",
+              request={"method": "POST", "url": "https://vtop.example/vtop/login"})
+
+
+class WaitLoginNetworkOutcomeTest(unittest.TestCase):
+    def test_events_in_first_read_are_not_dropped(self):
+        redirect = _entry("Network.requestWillBeSent", requestId="1", redirectResponse={},
+                          request={"method": "GET", "url": "https://vtop.example/vtop/content"})
+        d = StubDriver([POST, redirect])
+        self.assertEqual(Login.wait_login_network_outcome(d, timeout=1, poll=0), "success")
+        self.assertEqual(d.calls, 1)
+
+    def test_wrong_password_document_in_first_read(self):
+        page = _entry("Network.responseReceived", requestId="2", type="Document",
+                      response={"url": "https://vtop.example/vtop/login/error"})
+        d = StubDriver([POST, page])
+        self.assertEqual(Login.wait_login_network_outcome(d, timeout=1, poll=0), "login_page")
+
+    def test_events_split_across_reads(self):
+        failed = _entry("Network.loadingFailed", requestId="1")
+        d = StubDriver([POST], [], [failed])
+        self.assertEqual(Login.wait_login_network_outcome(d, timeout=1, poll=0), "failed")
+        self.assertEqual(d.calls, 3)
+
+    def test_no_performance_log(self):
+        d = StubDriver(available=False)
+        self.assertIsNone(Login.wait_login_network_outcome(d, timeout=1, poll=0))
+        self.assertEqual(d.calls, 1)
+
+    def test_timeout(self):
+        d = StubDriver([POST])
+        self.assertIsNone(Login.wait_login_network_outcome(d, timeout=0.05, poll=0.01))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import http.client
+import os
+import sys
+import unittest
+import urllib.parse
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.join(HERE, "..", "app"), os.path.join(HERE, "..", "bench")]
+import mock_vtop  # noqa: E402
+import vtop_http  # noqa: E402
+
+
+class LocalhostCookieTest(unittest.TestCase):
+    """Host-only cookies on a dotless host (localhost, a container name) must still be sent."""
+
+    def setUp(self):
+        self.srv, _ = mock_vtop.serve_in_thread(host="localhost")
+        self.port = self.srv.server_address[1]
+        self.root = f"http://localhost:{self.port}"
+        c = http.client.HTTPConnection("localhost", self.port, timeout=10)
+        c.request("POST", "/vtop/login",
+                  urllib.parse.urlencode({"username": "21ABC0001", "password": "mock", "captchaStr": "MOCK42"}),
+                  {"Content-Type": "application/x-www-form-urlencoded"})
+        r = c.getresponse()
+        r.read()
+        self.sid = r.getheader("Set-Cookie").split(";")[0].split("=", 1)[1]
+        c.close()
+
+    def tearDown(self):
+        self.srv.shutdown()
+        self.srv.server_close()
+
+    def _client(self, **cookie):
+        return vtop_http.VtopHttp(self.root, [dict(name="JSESSIONID", value=self.sid, **cookie)], regno="21ABC0001")
+
+    def test_selenium_host_only_cookie(self):
+        # what Chrome reports for a cookie set by http://localhost without a Domain attribute
+        h = self._client(domain="localhost", path="/vtop", httpOnly=True, secure=False)
+        h.content()
+        self.assertTrue(h.csrf)
+        self.assertIn("timeTableStyle", h.timetable())
+
+    def test_cookie_without_domain(self):
+        self.assertTrue(self._client().content())
+
+    def test_jar_cookie_domain(self):
+        self.assertEqual(vtop_http._jar_cookie({"name": "a", "value": "b"}, "localhost").domain, "localhost.local")
+        self.assertEqual(vtop_http._jar_cookie({"name": "a", "value": "b", "domain": "vtop.vit.ac.in"}, "x").domain,
+                         "vtop.vit.ac.in")
+
+
+if __name__ == "__main__":
+    unittest.main()